@@ -0,0 +1,120 @@
+"""
+Author memory for crawler user-history expansion.
+
+For every author whose submitted.json was fetched, keeps when it was last
+expanded and how many new subs it led to. expand_subreddit uses this to pick
+which of a page's authors to expand: authors expanded within the recheck
+window are skipped, the rest are ranked by yield (new subs per expansion,
+smoothed so unseen authors start with an optimistic score).
+
+Entries are persisted to a local SQLite file in batches, like the negative
+cache in rejected_subs.py.
+"""
+import logging
+import os
+import sqlite3
+import time
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Smoothing: an author is scored as if it had already yielded PRIOR_YIELD new
+# subs in one extra expansion, so unseen authors are tried before proven duds.
+PRIOR_YIELD = 1.0
+
+
+class AuthorCache:
+    """name -> [last_expanded, expansions, new_subs] with yield-based ranking."""
+
+    def __init__(self, path: Optional[str] = None, recheck_seconds: float = 0):
+        self.path = path
+        self.recheck_seconds = recheck_seconds
+        self.entries: dict[str, list] = {}
+        self._dirty: set[str] = set()
+        self.stats = {"expanded": 0, "skipped_recent": 0, "credited": 0}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def score(self, name: str) -> float:
+        entry = self.entries.get(name.lower())
+        expansions, new_subs = (entry[1], entry[2]) if entry else (0, 0)
+        return (new_subs + PRIOR_YIELD) / (expansions + 1)
+
+    def recently_expanded(self, name: str, now: Optional[float] = None) -> bool:
+        entry = self.entries.get(name.lower())
+        return bool(entry) and (now or time.time()) - entry[0] < self.recheck_seconds
+
+    def rank(self, authors: Iterable[str]) -> List[str]:
+        """Authors worth expanding: not recently expanded, highest yield first."""
+        now = time.time()
+        candidates = []
+        for name in authors:
+            if self.recently_expanded(name, now):
+                self.stats["skipped_recent"] += 1
+            else:
+                candidates.append(name)
+        candidates.sort(key=self.score, reverse=True)
+        return candidates
+
+    def expanded(self, name: str):
+        """Record an expansion (called when the author's history is fetched)."""
+        name = name.lower()
+        entry = self.entries.setdefault(name, [0.0, 0, 0])
+        entry[0] = time.time()
+        entry[1] += 1
+        self._dirty.add(name)
+        self.stats["expanded"] += 1
+
+    def credit(self, name: str, new_subs: int = 1):
+        """Attribute newly discovered subs to the author that led to them."""
+        name = name.lower()
+        entry = self.entries.get(name)
+        if entry is None:
+            return
+        entry[2] += new_subs
+        self._dirty.add(name)
+        self.stats["credited"] += new_subs
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS authors ("
+            "author TEXT PRIMARY KEY, last_expanded REAL NOT NULL, "
+            "expansions INTEGER NOT NULL, new_subs INTEGER NOT NULL)"
+        )
+        return conn
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            conn = self._connect()
+            for name, last_expanded, expansions, new_subs in conn.execute(
+                "SELECT author, last_expanded, expansions, new_subs FROM authors"
+            ):
+                self.entries[name] = [last_expanded, expansions, new_subs]
+            conn.close()
+            logger.info(f"Loaded {len(self.entries):,} known authors")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read author cache {self.path}: {e}")
+
+    def save(self):
+        """Write authors changed since the last save."""
+        if not self.path or not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        rows = [(name, *self.entries[name]) for name in dirty]
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO authors (author, last_expanded, expansions, new_subs) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            conn.close()
+        except sqlite3.Error as e:
+            self._dirty |= dirty
+            logger.warning(f"Could not write author cache {self.path}: {e}")
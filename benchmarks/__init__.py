@@ -0,0 +1,36 @@
+"""
+Local benchmarks for the Hetzner workers.
+
+Run from the repo root, e.g.:
+    python -m benchmarks.bench_supabase_async
+
+config.py refuses to import without credentials, so placeholder values are
+set here. Benchmarks only talk to local stub servers, never to real services.
+"""
+import os
+
+for _key, _value in {
+    "SUPABASE_URL": "http://127.0.0.1:1",
+    "SUPABASE_ANON_KEY": "bench.anon.key",
+    "ADSPOWER_PROFILE_IDS": "bench-profile",
+    "PROXIDIZE_ROTATION_URL": "http://127.0.0.1:1/rotate",
+    "PROXYEMPIRE_HOST": "127.0.0.1",
+    "PROXYEMPIRE_USERNAME": "bench",
+    "PROXYEMPIRE_PASSWORD": "bench",
+    "OPENAI_API_KEY": "sk-bench",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+
+def detach_file_logs():
+    """
+    Worker modules log to logs/*.log on import. Drop those handlers so
+    benchmark runs don't end up in the production logs.
+    """
+    import logging
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.FileHandler):
+            root.removeHandler(handler)
+            handler.close()
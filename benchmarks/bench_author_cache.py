@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: author sampling vs the author cache.
+
+The mock Reddit runs with author_skew: a few prolific users appear in every
+sub's new posts but only post in the same handful of popular subs. Each mode
+runs two discovery sessions with a restart in between (known subs carry
+over; the author cache carries over in the "cache" mode).
+
+"sample" replays the previous expand_subreddit: the first
+CRAWLER_AUTHORS_PER_SUB authors of the page, whether or not they were
+expanded before. "cache" is the current yield-ranked selection.
+
+Reports discovered subs per request.
+
+Usage: python -m benchmarks.bench_author_cache [seconds_per_session] [page_delay_seconds]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+
+from benchmarks import detach_file_logs
+from benchmarks.bench_crawler_frontier import MemoryQueue
+from benchmarks.mock_reddit import MockReddit
+
+import crawler_llm
+from author_cache import AuthorCache
+from crawler_llm import CrawlerLLM
+from config import CRAWLER_AUTHORS_PER_SUB
+from crawl_frontier import USER_HISTORY
+from known_subs import KnownSubreddits
+from proxy_pool import Proxy, ProxyPool
+from rate_limiter import AdaptiveRateLimiter
+from reddit_http import reddit_http
+
+detach_file_logs()
+logging.getLogger("crawler_llm").setLevel(logging.WARNING)
+logging.getLogger("author_cache").setLevel(logging.WARNING)
+
+RATE = 20.0
+
+
+class SeedQueue(MemoryQueue):
+    """Seeds rotate through the subs discovered so far, like the real queue."""
+
+    def __init__(self, rows: dict):
+        super().__init__()
+        self.rows = rows  # Shared across sessions, like the DB
+        self.offset = 0
+
+    async def get_pending_intel_scrapes(self, limit: int = 50, **kwargs) -> list[dict]:
+        names = list(self.rows) or [f"seedsub{i}" for i in range(limit)]
+        seeds = [names[(self.offset + i) % len(names)] for i in range(limit)]
+        self.offset += limit
+        return [{"subreddit_name": name} for name in seeds]
+
+
+def sampled_expand(crawler: CrawlerLLM):
+    """The pre-cache expand_subreddit, verbatim apart from the logging."""
+    async def expand_subreddit(subreddit_name: str):
+        posts_data = await crawler.fetch_with_retry(f"{crawler_llm.REDDIT_BASE_URL}/r/{subreddit_name}/new.json?limit=25")
+        if not posts_data:
+            return
+        authors = set()
+        for post in posts_data.get("data", {}).get("children", []):
+            author = post.get("data", {}).get("author")
+            if author and author != "[deleted]":
+                authors.add(author)
+        for author in list(authors)[:CRAWLER_AUTHORS_PER_SUB]:
+            crawler.frontier.push(USER_HISTORY, author)
+    return expand_subreddit
+
+
+async def session(mock: MockReddit, queue: SeedQueue, known: KnownSubreddits, authors: AuthorCache,
+                  cache: bool, seconds: float) -> dict:
+    crawler_llm.REDDIT_BASE_URL = mock.url
+    crawler = CrawlerLLM()
+    crawler.supabase = queue
+    crawler.proxy_pool = ProxyPool([Proxy("direct", None)])
+    crawler.existing_subs = known
+    crawler.existing_subs.sync = lambda supabase: asyncio.sleep(0)  # No DB to sync from
+    crawler.existing_subs_loaded = True
+    crawler.rejected_subs.path = None
+    crawler.authors = authors
+    if not cache:
+        crawler.expand_subreddit = sampled_expand(crawler)
+    reddit_http.limiters[None] = AdaptiveRateLimiter(RATE, min_rate=RATE, max_rate=RATE, burst=RATE)
+
+    task = asyncio.create_task(crawler.discover_subreddits())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    await reddit_http.close()
+    authors.save()
+    return {
+        "discovered": crawler.crawler_stats["discovered"],
+        "requests": crawler.crawler_stats["requests"],
+        "histories": mock.paths.get("submitted.json", 0),
+    }
+
+
+async def run(cache: bool, seconds: float, delay: float, tmp: str) -> list[dict]:
+    path = os.path.join(tmp, f"authors_{cache}.sqlite3")
+    known = KnownSubreddits()
+    queue = SeedQueue({})
+    results = []
+    with MockReddit(delay=delay, author_skew=True) as mock:
+        for _ in range(2):
+            authors = AuthorCache(path, recheck_seconds=86400)
+            authors.load()
+            before = mock.paths.get("submitted.json", 0)
+            stats = await session(mock, queue, known, authors, cache, seconds)
+            stats["histories"] -= before
+            results.append(stats)
+    return results
+
+
+async def main(seconds: float, delay: float):
+    print("=" * 78)
+    print(f"AUTHOR SELECTION: 2 x {seconds:.0f}s sessions, {delay * 1000:.0f}ms per request, {RATE:.0f} req/s cap")
+    print("=" * 78)
+    with tempfile.TemporaryDirectory() as tmp:
+        for cache in (False, True):
+            label = "cache" if cache else "sample"
+            for number, stats in enumerate(await run(cache, seconds, delay, tmp), 1):
+                print(
+                    f"  {label:<7} session {number}: {stats['discovered']:4d} discovered | "
+                    f"{stats['requests']:4d} requests ({stats['histories']:3d} histories) | "
+                    f"{stats['discovered'] / max(stats['requests'], 1):.3f} new/request"
+                )
+
+
+if __name__ == "__main__":
+    session_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    page_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    asyncio.run(main(session_seconds, page_delay))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: crawl frontier vs the old sequential discovery loop.
+
+Both run for a fixed time against the local mock Reddit, with queue writes
+going to an in-memory stand-in for Supabase. Reports discovered subs/hour
+and requests/second.
+
+"sequential" replays the previous discover_subreddits loop: one request at a
+time, 0.5s sleep after each candidate, CRAWLER_DELAY_BETWEEN_BATCHES between
+seed subs. "frontier" is the current CrawlerLLM.discover_subreddits.
+
+Usage: python -m benchmarks.bench_crawler_frontier [seconds] [page_delay_seconds]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.mock_reddit import MockReddit
+
+import crawler_llm
+from crawler_llm import CrawlerLLM
+from config import CRAWLER_DELAY_BETWEEN_BATCHES
+from known_subs import KnownSubreddits
+from proxy_pool import Proxy, ProxyPool
+from rate_limiter import AdaptiveRateLimiter
+from reddit_http import reddit_http
+
+detach_file_logs()
+logging.getLogger("crawler_llm").setLevel(logging.WARNING)
+logging.getLogger("llm_analyzer").setLevel(logging.WARNING)
+
+
+class MemoryQueue:
+    """Just the SupabaseClient calls discovery makes."""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def get_pending_intel_scrapes(self, limit: int = 50, **kwargs) -> list[dict]:
+        return [{"subreddit_name": f"seedsub{i}"} for i in range(limit)]
+
+    async def add_subreddit_to_queue(self, subreddit_name: str, subscribers: int = 0) -> bool:
+        self.rows[subreddit_name] = subscribers
+        return True
+
+
+async def sequential_discover(crawler: CrawlerLLM):
+    """The pre-frontier loop, verbatim apart from the bookkeeping."""
+    while True:
+        for sub in await crawler.supabase.get_pending_intel_scrapes(limit=10):
+            posts_data = await crawler.fetch_with_retry(
+                f"{crawler_llm.REDDIT_BASE_URL}/r/{sub['subreddit_name']}/new.json?limit=25"
+            )
+            if not posts_data:
+                continue
+            authors = {p["data"]["author"] for p in posts_data["data"]["children"] if p["data"].get("author")}
+            for author in list(authors)[:5]:
+                for new_sub in await crawler.discover_from_user(author):
+                    if new_sub in crawler.existing_subs:
+                        continue
+                    sub_info = await crawler.discover_subreddit_info(new_sub)
+                    if sub_info and await crawler.supabase.add_subreddit_to_queue(
+                        sub_info["subreddit_name"], sub_info["subscribers"]
+                    ):
+                        crawler.existing_subs.add(new_sub)
+                        crawler.crawler_stats["discovered"] += 1
+                    await asyncio.sleep(0.5)
+            await asyncio.sleep(CRAWLER_DELAY_BETWEEN_BATCHES)
+
+
+async def run_once(name: str, mock_url: str, seconds: float, rate: float) -> dict:
+    crawler_llm.REDDIT_BASE_URL = mock_url
+    crawler = CrawlerLLM()
+    crawler.supabase = MemoryQueue()
+    crawler.proxy_pool = ProxyPool([Proxy("direct", None)])
+    crawler.existing_subs = KnownSubreddits()
+    crawler.existing_subs.sync = lambda supabase: asyncio.sleep(0)  # No DB to sync from
+    crawler.existing_subs_loaded = True
+    crawler.rejected_subs.path = None  # Keep the crawler caches in memory
+    crawler.authors.path = None
+    reddit_http.limiters[None] = AdaptiveRateLimiter(rate, min_rate=rate, max_rate=rate, burst=max(rate, 1))
+
+    loop = sequential_discover(crawler) if name == "sequential" else crawler.discover_subreddits()
+    start = time.perf_counter()
+    task = asyncio.create_task(loop)
+    await asyncio.sleep(seconds)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    elapsed = time.perf_counter() - start
+    await reddit_http.close()
+    return {
+        "discovered": crawler.crawler_stats["discovered"],
+        "requests": crawler.crawler_stats["requests"],
+        "elapsed": elapsed,
+    }
+
+
+async def main(seconds: float, delay: float):
+    print("=" * 78)
+    print(f"DISCOVERY: {seconds:.0f}s per run, {delay * 1000:.0f}ms per Reddit request")
+    print("=" * 78)
+    runs = [("sequential", 1000.0), ("frontier", 4.0), ("frontier", 20.0)]
+    for name, rate in runs:
+        with MockReddit(delay=delay) as mock:
+            stats = await run_once(name, mock.url, seconds, rate)
+        label = f"{name} @ {rate:.0f} req/s cap" if name == "frontier" else name
+        print(
+            f"  {label:<26} {stats['discovered'] / stats['elapsed'] * 3600:>8,.0f} subs/hour | "
+            f"{stats['requests'] / stats['elapsed']:5.1f} req/s | "
+            f"{stats['discovered']} discovered, {stats['requests']} requests"
+        )
+
+
+if __name__ == "__main__":
+    run_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    page_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    asyncio.run(main(run_seconds, page_delay))
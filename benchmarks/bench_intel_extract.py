@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: in-page field extraction vs page.content() + regex.
+
+For each fixture in fixtures/intel (padded with extra posts to a realistic
+multi-MB DOM), compares:
+  - bytes crossed over CDP: the serialized HTML vs the JSON fields object
+  - Python CPU time: fields_from_html() + build_result() vs build_result() alone
+If a Playwright Chromium is installed, also times both paths in the browser
+(page.content() vs page.evaluate(EXTRACT_FIELDS_JS)) and checks they agree.
+
+Usage: python -m benchmarks.bench_intel_extract [padding_posts]
+"""
+import asyncio
+import json
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+from intel_parser import BAN_MESSAGES, EXTRACT_FIELDS_JS, build_result, fields_from_html
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures" / "intel"
+POST = ('<shreddit-post post-title="Padding post {i}" author="user{i}" permalink="/r/pad/comments/{i}/">'
+        '<div slot="text-body"><p>{body}</p></div><img src="https://preview.redd.it/{i}.jpg"></shreddit-post>\n')
+
+logging.getLogger("intel_parser").setLevel(logging.ERROR)
+
+
+def load_fixtures(padding: int) -> list[tuple[str, str, str]]:
+    """(subreddit_name, html, title) per fixture, feed padded to a realistic size."""
+    padding_html = "".join(POST.format(i=i, body="lorem ipsum dolor sit amet " * 30) for i in range(padding))
+    fixtures = []
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text()
+        title = re.search(r"<title>(.*?)</title>", html).group(1)
+        name = title[2:] if title.startswith("r/") else path.stem
+        fixtures.append((name, html.replace("</body>", padding_html + "</body>"), title))
+    return fixtures
+
+
+def time_cpu(fn, repeat: int = 20) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat
+
+
+async def browser_comparison(fixtures):
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError:
+        return
+    try:
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch()
+            page = await browser.new_page()
+            print("\nIn-browser (wall time per call):")
+            for name, html, title in fixtures:
+                await page.set_content(html)
+                start = time.perf_counter()
+                content = await page.content()
+                content_time = time.perf_counter() - start
+                start = time.perf_counter()
+                fields = await page.evaluate(EXTRACT_FIELDS_JS, {"name": name, "banMessages": BAN_MESSAGES})
+                evaluate_time = time.perf_counter() - start
+                same = build_result(name, fields) == build_result(name, fields_from_html(name, content, title))
+                print(f"  {name:<20} content() {content_time * 1000:6.1f}ms  evaluate() {evaluate_time * 1000:6.1f}ms  "
+                      f"results match: {same}")
+            await browser.close()
+    except Exception as e:
+        print(f"\n(Skipping in-browser comparison: {str(e).splitlines()[0]})")
+
+
+def main(padding: int):
+    fixtures = load_fixtures(padding)
+    print("=" * 78)
+    print(f"INTEL EXTRACTION: {len(fixtures)} fixtures, {padding} padding posts each")
+    print("=" * 78)
+    print(f"  {'fixture':<20} {'HTML bytes':>12} {'JSON bytes':>11} {'regex CPU':>11} {'fields CPU':>11}")
+    for name, html, title in fixtures:
+        fields = fields_from_html(name, html, title)
+        html_cpu = time_cpu(lambda: build_result(name, fields_from_html(name, html, title)))
+        fields_cpu = time_cpu(lambda: build_result(name, fields))
+        print(f"  {name:<20} {len(html.encode()) + len(title):>12,} {len(json.dumps(fields)):>11,} "
+              f"{html_cpu * 1000:>9.2f}ms {fields_cpu * 1000:>9.3f}ms")
+    asyncio.run(browser_comparison(fixtures))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: browserless intel throughput.
+
+Runs IntelHTTPScraper against the local mock Reddit (every 10th page is a
+403 block page) at a few concurrency levels, and reports subs/hour, the
+share escalated to a browser, and bytes per page. Compare subs/hour with
+bench_intel_tabs, which drives real Chromium tabs against the same mock.
+
+Usage: python -m benchmarks.bench_intel_http [subs] [page_delay_seconds]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.mock_reddit import MockReddit
+
+from intel_http import IntelHTTPScraper
+from proxy_pool import Proxy, ProxyPool
+from rate_limiter import AdaptiveRateLimiter
+from reddit_http import reddit_http
+
+detach_file_logs()
+logging.getLogger("intel_http").setLevel(logging.WARNING)
+logging.getLogger("intel_parser").setLevel(logging.ERROR)
+
+
+async def run_once(mock_url: str, concurrency: int, n_subs: int) -> dict:
+    # The mock has no per-IP limit - measure the scraper, not the rate limiter
+    reddit_http.limiters[None] = AdaptiveRateLimiter(1000, 1000, 1000, burst=concurrency)
+    scraper = IntelHTTPScraper(mock_url, proxies=ProxyPool([Proxy("direct", None)]))
+    names = asyncio.Queue()
+    for i in range(n_subs):
+        names.put_nowait(f"benchsub{i}")
+
+    async def worker():
+        while not names.empty():
+            await scraper.scrape(names.get_nowait())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await reddit_http.close()
+    return {"elapsed": elapsed, **scraper.stats}
+
+
+async def main(n_subs: int, delay: float):
+    print("=" * 78)
+    print(f"INTEL HTTP BACKEND: {n_subs} subs, {delay * 1000:.0f}ms page latency, 1 in 10 pages blocked")
+    print("=" * 78)
+    with MockReddit(delay=delay, block_every=10) as mock:
+        for concurrency in (1, 8, 16):
+            stats = await run_once(mock.url, concurrency, n_subs)
+            settled = stats["completed"] + stats["unavailable"]
+            print(
+                f"  {concurrency:>2} connections: {settled / stats['elapsed'] * 3600:>9,.0f} subs/hour | "
+                f"{stats['escalated'] / n_subs * 100:.0f}% escalated | "
+                f"{stats['bytes'] / stats['requests'] / 1024:.0f} KB/page | "
+                f"{stats['elapsed']:.1f}s"
+            )
+
+
+if __name__ == "__main__":
+    subs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    page_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    asyncio.run(main(subs, page_delay))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ban pre-check inline vs ahead of the browser consumers.
+
+Runs the real producer/consumer/safe_scrape_subreddit path with fake browser
+leases against the stub PostgREST server. The pre-check takes a fixed delay
+(the info batch window plus a Reddit round-trip) and reports every 5th sub as
+banned; the browser scrape takes a fixed delay too.
+
+"inline" starts the pre-check when a consumer picks the sub up (the previous
+flow); "ahead" starts it when the producer queues the sub, so it is usually
+answered by the time a browser is free.
+
+Usage: python -m benchmarks.bench_intel_pipeline [subs] [precheck_seconds] [scrape_seconds]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.stub_postgrest import StubPostgrest
+
+import intel_worker_adspower
+from intel_worker_adspower import IntelWorkerAdsPower
+from supabase_client import SupabaseClient
+
+detach_file_logs()
+logging.getLogger("intel_worker_adspower").setLevel(logging.ERROR)
+
+BROWSERS = 4
+
+
+def make_worker(db_url: str, n_subs: int, precheck_delay: float, scrape_delay: float) -> IntelWorkerAdsPower:
+    intel_worker_adspower.INTEL_PROFILE_NAV_SPACING = 0
+    worker = IntelWorkerAdsPower()
+    worker.supabase = SupabaseClient(url=db_url, key="bench.anon.key")
+    worker.supabase.retry_columns = True
+
+    rows = [{"subreddit_name": f"benchsub{i}", "subscribers": 10_000} for i in range(n_subs)]
+
+    async def fetch_work(limit):
+        taken = rows[:limit]
+        del rows[:limit]
+        return taken
+    worker.fetch_work = fetch_work
+
+    async def check_if_banned(name):
+        await asyncio.sleep(precheck_delay)
+        return "Subreddit banned" if int(name[len("benchsub"):]) % 5 == 0 else None
+    worker.check_if_banned = check_if_banned
+
+    async def scrape(name, page):
+        await asyncio.sleep(scrape_delay)
+        return {"subreddit_name": name, "weekly_visitors": 1000, "scrape_status": "completed"}
+    worker.scrape_subreddit = scrape
+
+    for i in range(BROWSERS):
+        worker.active_browsers[f"profile{i}"] = {
+            "pages": [object()],
+            "limit": asyncio.Semaphore(1),
+            "nav_lock": asyncio.Lock(),
+            "last_nav": 0.0,
+        }
+        worker.browser_queue.put_nowait((f"profile{i}", 0))
+    return worker
+
+
+async def run(ahead: bool, db_url: str, n_subs: int, precheck_delay: float,
+              scrape_delay: float) -> tuple[IntelWorkerAdsPower, float]:
+    intel_worker_adspower.INTEL_PRECHECK_AHEAD = ahead
+    worker = make_worker(db_url, n_subs, precheck_delay, scrape_delay)
+    worker.consumer_count = BROWSERS
+    worker.consumers_started = time.monotonic()
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(worker.producer())]
+    tasks += [asyncio.create_task(worker.consumer(i)) for i in range(BROWSERS)]
+    while worker.stats["scraped"] + worker.stats["failed"] + worker.stats["retries"] < n_subs:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    for task in tasks:
+        task.cancel()
+    await worker.supabase.close()
+    await worker.adspower.close()
+    return worker, elapsed
+
+
+async def main(n_subs: int, precheck_delay: float, scrape_delay: float):
+    print("=" * 78)
+    print(
+        f"INTEL PRE-CHECK PIPELINE: {n_subs} subs, {BROWSERS} browsers, "
+        f"{precheck_delay * 1000:.0f}ms pre-check, {scrape_delay * 1000:.0f}ms scrape, 1 in 5 banned"
+    )
+    print("=" * 78)
+    with StubPostgrest() as db:
+        for ahead in (False, True):
+            worker, elapsed = await run(ahead, db.url, n_subs, precheck_delay, scrape_delay)
+            label = "ahead" if ahead else "inline"
+            print(
+                f"  {label:<7} {n_subs / elapsed:5.1f} subs/s | {elapsed:5.1f}s | "
+                f"{worker.browser_utilization():3.0f}% util | "
+                f"{worker.stats['prechecked_out']} kept off browsers"
+            )
+            for stage, histogram in worker.stage_latency.items():
+                print(f"      {stage:<14} {histogram.summary()}")
+            print(f"      precheck_wait buckets: {worker.stage_latency['precheck_wait'].buckets()}")
+
+
+if __name__ == "__main__":
+    subs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    precheck = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    scrape_seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5
+    asyncio.run(main(subs, precheck, scrape_seconds))
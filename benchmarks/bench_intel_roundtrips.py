@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: DB round-trips per scraped sub in the intel worker.
+
+Runs the real consumer/safe_scrape_subreddit path with a fake browser lease
+and a scrape that returns data for 3 of 4 subs (the rest are marked for
+retry), against the stub PostgREST server. Counts reads (GET) and writes
+(POST) per sub, including the final flush of the write buffer.
+
+"legacy" replays the removed pre-scrape read (select error_message for the
+sub) in front of every scrape; "current" takes the failure history from the
+candidate row.
+
+Usage: python -m benchmarks.bench_intel_roundtrips [subs] [db_delay_seconds]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.stub_postgrest import StubPostgrest
+
+import intel_worker_adspower
+from intel_worker_adspower import IntelWorkerAdsPower
+from supabase_client import SupabaseClient, ERROR_NO_DATA
+
+detach_file_logs()
+
+BROWSERS = 4
+
+
+def make_worker(db_url: str) -> IntelWorkerAdsPower:
+    intel_worker_adspower.INTEL_PROFILE_NAV_SPACING = 0
+    worker = IntelWorkerAdsPower()
+    worker.supabase = SupabaseClient(url=db_url, key="bench.anon.key")
+    worker.supabase.retry_columns = True  # Migration applied
+
+    async def not_banned(name):
+        return None
+    worker.check_if_banned = not_banned
+
+    async def scrape(name, page):
+        await asyncio.sleep(0.01)
+        if int(name[len("benchsub"):]) % 4 == 0:
+            return None
+        return {"subreddit_name": name, "weekly_visitors": 1000, "scrape_status": "completed"}
+    worker.scrape_subreddit = scrape
+
+    for i in range(BROWSERS):
+        worker.active_browsers[f"profile{i}"] = {
+            "pages": [object()],
+            "limit": asyncio.Semaphore(1),
+            "nav_lock": asyncio.Lock(),
+            "last_nav": 0.0,
+        }
+        worker.browser_queue.put_nowait((f"profile{i}", 0))
+    return worker
+
+
+def replay_pre_scrape_read(worker: IntelWorkerAdsPower):
+    """Wrap safe_scrape_subreddit with the read it used to start with."""
+    scrape = worker.safe_scrape_subreddit
+
+    async def legacy(subreddit_name, candidate=None):
+        await worker.supabase.execute(worker.supabase.client.table("nsfw_subreddit_intel").select(
+            "error_message"
+        ).eq("subreddit_name", subreddit_name.lower()))
+        await scrape(subreddit_name, candidate)
+    worker.safe_scrape_subreddit = legacy
+
+
+async def run(mode: str, db: StubPostgrest, n_subs: int) -> tuple[dict, float]:
+    worker = make_worker(db.url)
+    if mode == "legacy":
+        replay_pre_scrape_read(worker)
+    for i in range(n_subs):
+        row = {"subreddit_name": f"benchsub{i}", "subscribers": 10_000}
+        if i % 8 == 0:
+            row.update(error_message="Scrape returned no data", retry_count=1, last_error_kind=ERROR_NO_DATA)
+        worker.work_queue.put_nowait(row)
+
+    before = dict(db.methods)
+    worker.consumer_count = BROWSERS
+    start = time.perf_counter()
+    consumers = [asyncio.create_task(worker.consumer(i)) for i in range(BROWSERS)]
+    await worker.work_queue.join()
+    elapsed = time.perf_counter() - start
+    for task in consumers:
+        task.cancel()
+    await worker.supabase.close()
+    await worker.adspower.close()
+    counts = {method: db.methods.get(method, 0) - before.get(method, 0) for method in ("GET", "POST")}
+    return counts, elapsed
+
+
+async def main(n_subs: int, delay: float):
+    print("=" * 70)
+    print(f"INTEL DB ROUND-TRIPS: {n_subs} subs, {BROWSERS} browsers, {delay * 1000:.0f}ms per DB call")
+    print("=" * 70)
+    with StubPostgrest(delay=delay) as db:
+        for mode in ("legacy", "current"):
+            counts, elapsed = await run(mode, db, n_subs)
+            print(
+                f"  {mode:<8} {counts['GET'] / n_subs:.2f} reads/sub, {counts['POST'] / n_subs:.2f} writes/sub "
+                f"({counts['GET']} GET, {counts['POST']} POST) | {n_subs / elapsed:.1f} subs/s"
+            )
+
+
+if __name__ == "__main__":
+    subs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    db_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    asyncio.run(main(subs, db_delay))
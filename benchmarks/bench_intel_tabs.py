@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: intel throughput (subs/hour) at 1, 2 and 4 tabs per profile.
+
+Runs the real IntelWorkerAdsPower scheduler and scrape path against the local
+mock Reddit, using locally launched Chromium contexts in place of AdsPower
+profiles. DB writes go to a stub PostgREST server.
+
+Requires a Playwright Chromium (python -m playwright install chromium).
+
+Usage: python -m benchmarks.bench_intel_tabs [profiles] [subs] [page_delay_seconds]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.mock_reddit import MockReddit
+from benchmarks.stub_postgrest import StubPostgrest
+
+import intel_worker_adspower
+from intel_worker_adspower import IntelWorkerAdsPower
+from playwright.async_api import async_playwright
+from supabase_client import SupabaseClient
+
+detach_file_logs()
+
+
+async def run_once(playwright, mock_url: str, db_url: str, profiles: int, tabs: int, n_subs: int) -> float:
+    intel_worker_adspower.REDDIT_BASE_URL = mock_url
+    intel_worker_adspower.INTEL_TABS_PER_PROFILE = tabs
+    intel_worker_adspower.INTEL_MAX_CONCURRENT_PER_PROFILE = tabs
+    intel_worker_adspower.INTEL_PROFILE_NAV_SPACING = 0
+
+    worker = IntelWorkerAdsPower()
+    worker.supabase = SupabaseClient(url=db_url, key="bench.anon.key")
+    worker.leases_available = False
+
+    async def not_banned(name):
+        return None
+    worker.check_if_banned = not_banned
+
+    browser = await playwright.chromium.launch()
+    for i in range(profiles):
+        await worker.register_browser(f"profile{i}", browser, await browser.new_context())
+    worker.queue_tab_leases()
+
+    for i in range(n_subs):
+        worker.work_queue.put_nowait({"subreddit_name": f"benchsub{i}"})
+
+    worker.consumer_count = worker.browser_queue.qsize()
+    worker.consumers_started = time.monotonic()
+    start = time.perf_counter()
+    consumers = [asyncio.create_task(worker.consumer(i)) for i in range(worker.consumer_count)]
+    await worker.work_queue.join()
+    elapsed = time.perf_counter() - start
+
+    for task in consumers:
+        task.cancel()
+    await worker.supabase.close()
+    await worker.adspower.close()
+    await browser.close()
+
+    print(f"  {tabs} tab(s)/profile: {n_subs} subs in {elapsed:.1f}s -> "
+          f"{n_subs / elapsed * 3600:,.0f} subs/hour, "
+          f"{worker.browser_utilization():.0f}% util, {worker.stats['scraped']} scraped, "
+          f"{worker.stats['bytes'] / max(worker.stats['browser_scrapes'], 1) / 1024:.0f} KB/scrape, "
+          f"{worker.stats['blocked_requests']} requests blocked")
+    return elapsed
+
+
+async def main(profiles: int, n_subs: int, delay: float):
+    print("=" * 60)
+    print(f"TAB POOL: {profiles} profiles, {n_subs} subs, {delay:.1f}s page latency")
+    print("=" * 60)
+    with MockReddit(delay=delay) as mock, StubPostgrest(delay=0.05) as db:
+        async with async_playwright() as playwright:
+            for tabs in (1, 2, 4):
+                await run_once(playwright, mock.url, db.url, profiles, tabs, n_subs)
+
+
+if __name__ == "__main__":
+    profiles = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    n_subs = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    delay = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    asyncio.run(main(profiles, n_subs, delay))
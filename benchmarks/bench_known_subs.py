@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Python set of names vs KnownSubreddits (sorted 64-bit hashes).
+
+At 100k and 1M names, reports memory held by the structure and the peak
+while building it (tracemalloc), build time, membership lookups, and startup: the old path pages every name
+from subreddit_queue (1,000 rows per request), the new one reads the local
+snapshot and only fetches rows added since.
+
+Usage: python -m benchmarks.bench_known_subs
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import detach_file_logs
+
+from known_subs import KnownSubreddits
+
+detach_file_logs()
+
+PAGE_SIZE = 1000
+WORDS = ["gone", "wild", "petite", "thick", "latina", "milf", "amateur", "asian", "curvy", "goth",
+         "fit", "real", "nsfw", "hot", "girls", "couples", "selfie", "over30", "tattoo", "redhead"]
+
+
+def make_names(n: int) -> list[str]:
+    rng = random.Random(n)
+    return [f"{rng.choice(WORDS)}{rng.choice(WORDS)}{i}" for i in range(n)]
+
+
+def measure(build):
+    """(structure, bytes held, peak bytes while building, build seconds)."""
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start  # Timed without tracemalloc's overhead
+    tracemalloc.start()
+    structure = build()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return structure, size, peak, elapsed
+
+
+def lookups(structure, probes) -> float:
+    start = time.perf_counter()
+    for name in probes:
+        _ = name in structure
+    return (time.perf_counter() - start) / len(probes) * 1e6
+
+
+def main():
+    print("=" * 78)
+    print("KNOWN-SUBREDDIT SET")
+    print("=" * 78)
+    for n in (100_000, 1_000_000):
+        names = make_names(n)
+        probes = random.Random(1).sample(names, 50_000) + [f"missing{i}" for i in range(50_000)]
+
+        # Names are rebuilt from the DB rows in both cases, so only the structure is counted
+        names_blob = "\n".join(names)
+        plain, plain_bytes, plain_peak, plain_build = measure(lambda: set(names_blob.split("\n")))
+
+        def build_compact():
+            known = KnownSubreddits()
+            known.update(names_blob.split("\n"))
+            known._merge()
+            return known
+        compact, compact_bytes, compact_peak, compact_build = measure(build_compact)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            compact.path = os.path.join(tmp, "known_subs.bin")
+            compact.watermark = "2026-01-01T00:00:00+00:00"
+            compact.save()
+            snapshot_size = os.path.getsize(compact.path)
+            start = time.perf_counter()
+            warm = KnownSubreddits(compact.path)
+            warm.load()
+            load_time = time.perf_counter() - start
+            assert len(warm) == n and names[n // 2] in warm
+
+        print(f"\n  {n:,} names")
+        print(f"    set[str]           {plain_bytes / 2**20:6.1f} MB (peak {plain_peak / 2**20:6.1f}) | build {plain_build:5.2f}s | "
+              f"lookup {lookups(plain, probes):.2f}us")
+        print(f"    KnownSubreddits    {compact_bytes / 2**20:6.1f} MB (peak {compact_peak / 2**20:6.1f}) | build {compact_build:5.2f}s | "
+              f"lookup {lookups(compact, probes):.2f}us")
+        print(f"    startup: old = {n // PAGE_SIZE + 1:,} DB pages; "
+              f"new = snapshot ({snapshot_size / 2**20:.1f} MB) loaded in {load_time * 1000:.0f}ms + delta pages only")
+        del plain, compact, warm
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: clearing an LLM backlog with the online loop vs the Batch API backfill.
+
+The backlog is held by an in-memory stand-in for the intel table; rules come
+from the sample set instead of Reddit. The backfill runs end to end against
+the local OpenAI stub (export, upload, batch job, streamed import). The
+online loop is not run for days: its throughput is that of the old
+fixed-interval loop (10 subs every 10 minutes), and its cost per sub is
+measured on a sample of single-sub requests.
+
+Usage: python -m benchmarks.bench_llm_backfill [subs] [batch_seconds]
+"""
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.sample_subs import sample_subs
+from benchmarks.stub_openai import StubOpenAI
+
+from openai import AsyncOpenAI
+from config import LLM_BATCH_PRICE_FACTOR
+from llm_analyzer import SubredditLLMAnalyzer, token_cost
+from llm_backfill import LLMBackfill
+
+detach_file_logs()
+logging.getLogger("llm_analyzer").setLevel(logging.ERROR)
+logging.getLogger("llm_backfill").setLevel(logging.WARNING)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+SAMPLE = 50
+LOOP_SUBS, LOOP_SECONDS = 10, 600  # Online loop before it was rate-limit driven
+
+
+class MemoryBacklog:
+    """The nsfw_subreddit_intel calls the backfill and the LLM scheduler make, on a dict."""
+
+    def __init__(self, subs: list[dict]):
+        self.rows = {sub["subreddit_name"]: {"verification_required": None, **sub} for sub in subs}
+        self.claimed: set[str] = set()
+        self.writes = 0
+
+    async def get_subs_missing_llm(self, limit: int = 50, offset: int = 0) -> list[dict]:
+        missing = [
+            {"subreddit_name": row["subreddit_name"], "description": row["description"], "subscribers": row["subscribers"]}
+            for name, row in self.rows.items() if row["verification_required"] is None and name not in self.claimed
+        ]
+        return missing[offset:offset + limit]
+
+    async def count_subs_missing_llm(self) -> int:
+        return sum(row["verification_required"] is None and name not in self.claimed for name, row in self.rows.items())
+
+    async def has_llm_claims(self) -> bool:
+        return True
+
+    async def set_llm_claims(self, subreddit_names: list[str], until) -> int:
+        if until:
+            self.claimed.update(subreddit_names)
+        else:
+            self.claimed.difference_update(subreddit_names)
+        return len(subreddit_names)
+
+    async def update_llm_analysis(self, subreddit_name: str, result: dict) -> bool:
+        self.rows[subreddit_name]["verification_required"] = result["verification_required"]
+        self.writes += 1
+        return True
+
+    async def flush(self) -> int:
+        return 0
+
+
+def make_analyzer(stub: StubOpenAI, subs: list[dict]) -> SubredditLLMAnalyzer:
+    rules = {sub["subreddit_name"]: sub["rules"] for sub in subs}
+    analyzer = SubredditLLMAnalyzer(api_key="sk-bench")
+    analyzer.client = AsyncOpenAI(api_key="sk-bench", base_url=stub.url, max_retries=0)
+    analyzer.cache = None
+    analyzer.rule_classifier = False  # Every sub goes to the model, as before the classifier
+
+    async def fetch_info(subreddit_name):
+        return {"description": "", "rules": rules[subreddit_name]}
+    analyzer._fetch_subreddit_info = fetch_info
+    return analyzer
+
+
+async def main(n_subs: int, batch_seconds: float):
+    subs = sample_subs(n_subs)
+    print("=" * 78)
+    print(f"LLM BACKLOG: {n_subs:,} subs, batch job completes {batch_seconds:.0f}s after submission")
+    print("=" * 78)
+    with StubOpenAI(delay=0.05, token_delay=0, batch_delay=batch_seconds) as stub, \
+            tempfile.TemporaryDirectory() as tmp:
+        # Online loop: cost per sub from a sample of single-sub requests
+        analyzer = make_analyzer(stub, subs)
+        for sub in subs[:SAMPLE]:
+            await analyzer.analyze_subreddit(sub["subreddit_name"], sub["description"], sub["rules"], sub["subscribers"])
+        online_cost = token_cost(analyzer.usage["prompt_tokens"], analyzer.usage["completion_tokens"]) / SAMPLE * n_subs
+        await analyzer.client.close()
+        per_day = LOOP_SUBS * 86400 / LOOP_SECONDS
+        print(
+            f"  online    {per_day:,.0f} subs/day -> {n_subs / per_day:6.1f} days | "
+            f"{analyzer.tokens_per_subreddit():4.0f} tokens/sub | ${online_cost:.2f}"
+        )
+
+        # Backfill: the real export/submit/poll/import path
+        backlog = MemoryBacklog(subs)
+        backfill = LLMBackfill(supabase=backlog, analyzer=make_analyzer(stub, subs), work_dir=tmp)
+        backfill.poll_seconds = 0.5
+        start = time.perf_counter()
+        await backfill.run()
+        elapsed = time.perf_counter() - start
+        await backfill.analyzer.client.close()
+        stats = backfill.stats
+        tokens = stats["prompt_tokens"] + stats["completion_tokens"]
+        cost = token_cost(stats["prompt_tokens"], stats["completion_tokens"]) * LLM_BATCH_PRICE_FACTOR
+        print(
+            f"  backfill  {elapsed:6.1f}s wall ({stats['requests']:,} request lines) | "
+            f"{tokens / n_subs:4.0f} tokens/sub | ${cost:.2f} | "
+            f"{stats['written']:,} written, {stats['missing']} left for the online loop"
+        )
+        remaining = sum(row["verification_required"] is None for row in backlog.rows.values())
+        print(f"  backlog after backfill: {remaining:,}")
+
+
+if __name__ == "__main__":
+    subs_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    batch_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    asyncio.run(main(subs_count, batch_delay))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one chat completion per subreddit vs K subreddits per prompt.
+
+Runs SubredditLLMAnalyzer against the local OpenAI stub for K = 1, 5, 10,
+with LLM_MAX_CONCURRENT requests in flight like run_llm_analysis. The stub
+leaves out or garbles omit_rate of the entries in batched answers, so the
+per-entry retry path is exercised too.
+
+Reports tokens per subreddit, requests, retried entries, wall time per 100
+subs, and how many results match the K = 1 run.
+
+Usage: python -m benchmarks.bench_llm_batch [subs] [omit_rate]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.sample_subs import sample_subs
+from benchmarks.stub_openai import StubOpenAI
+
+from openai import AsyncOpenAI
+from config import LLM_MAX_CONCURRENT
+from llm_analyzer import SubredditLLMAnalyzer
+
+detach_file_logs()
+logging.getLogger("llm_analyzer").setLevel(logging.ERROR)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def run(stub: StubOpenAI, subs: list[dict], k: int) -> tuple[SubredditLLMAnalyzer, dict, float]:
+    analyzer = SubredditLLMAnalyzer(api_key="sk-bench")
+    analyzer.client = AsyncOpenAI(api_key="sk-bench", base_url=stub.url, max_retries=0)
+    analyzer.cache = None  # Every run pays for its own requests
+    analyzer.rule_classifier = False
+    semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENT)
+    results = {}
+
+    async def analyze(group):
+        async with semaphore:
+            if k == 1:
+                sub = group[0]
+                results[sub["subreddit_name"]] = await analyzer.analyze_subreddit(
+                    sub["subreddit_name"], sub["description"], sub["rules"], sub["subscribers"]
+                )
+            else:
+                results.update(await analyzer.analyze_batch(group))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(analyze(subs[i:i + k]) for i in range(0, len(subs), k)))
+    elapsed = time.perf_counter() - start
+    await analyzer.client.close()
+    return analyzer, results, elapsed
+
+
+async def main(n_subs: int, omit_rate: float):
+    subs = sample_subs(n_subs)
+    print("=" * 78)
+    print(
+        f"LLM PROMPT BATCHING: {n_subs} subs, {LLM_MAX_CONCURRENT} concurrent requests, "
+        f"{omit_rate:.0%} of batched entries omitted/garbled"
+    )
+    print("=" * 78)
+    baseline = None
+    with StubOpenAI(omit_rate=omit_rate) as stub:
+        for k in (1, 5, 10):
+            analyzer, results, elapsed = await run(stub, subs, k)
+            baseline = baseline or results
+            fields = ("verification_required", "sellers_allowed")
+            agree = sum(
+                all(results[name].get(field) == baseline[name].get(field) for field in fields)
+                for name in baseline if name in results
+            )
+            usage = analyzer.usage
+            print(
+                f"  K={k:<3} {analyzer.tokens_per_subreddit():6.0f} tokens/sub "
+                f"({usage['prompt_tokens'] / n_subs:.0f} in, {usage['completion_tokens'] / n_subs:.0f} out) | "
+                f"{usage['requests']:3d} requests, {usage['retried']:2d} retried | "
+                f"{elapsed / n_subs * 100:5.1f}s per 100 subs | {agree}/{n_subs} match K=1"
+            )
+
+
+if __name__ == "__main__":
+    subs_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    omit = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    asyncio.run(main(subs_count, omit))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: LLM analysis with and without the content-hash result cache.
+
+Two workers analyze subs against the local OpenAI stub, each with its own
+SubredditLLMAnalyzer and cache connection on one shared SQLite file, like two
+processes on a host:
+
+  worker A   the first N subs
+  worker B   a quarter of those again (rows reset), plus N/2 new subs
+
+Sample subs draw their rules from a small pool, so some new subs have the
+same inputs as ones analyzed before. Reports OpenAI requests, tokens and
+cost with the cache off and on, plus the cache's per-day counters.
+
+Usage: python -m benchmarks.bench_llm_cache [subs]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+
+from benchmarks import detach_file_logs
+from benchmarks.sample_subs import sample_subs
+from benchmarks.stub_openai import StubOpenAI
+
+from openai import AsyncOpenAI
+from config import LLM_SUBS_PER_PROMPT
+from llm_analyzer import SubredditLLMAnalyzer, token_cost
+from llm_cache import LLMResultCache
+
+detach_file_logs()
+logging.getLogger("llm_analyzer").setLevel(logging.ERROR)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def worker(stub: StubOpenAI, subs: list[dict], cache_path: str = None) -> SubredditLLMAnalyzer:
+    analyzer = SubredditLLMAnalyzer(api_key="sk-bench")
+    analyzer.client = AsyncOpenAI(api_key="sk-bench", base_url=stub.url, max_retries=0)
+    analyzer.cache = LLMResultCache(cache_path) if cache_path else None
+    analyzer.rule_classifier = False  # Measure the cache alone
+    groups = [subs[i:i + LLM_SUBS_PER_PROMPT] for i in range(0, len(subs), LLM_SUBS_PER_PROMPT)]
+    await asyncio.gather(*(analyzer.analyze_batch(group) for group in groups))
+    await analyzer.client.close()
+    return analyzer
+
+
+async def run(stub: StubOpenAI, n_subs: int, cache_path: str = None) -> tuple[int, int, int]:
+    subs = sample_subs(n_subs + n_subs // 2)
+    first, new = subs[:n_subs], subs[n_subs:]
+    reset = first[::4]
+
+    requests = prompt_tokens = completion_tokens = 0
+    for batch in (first, reset + new):
+        analyzer = await worker(stub, batch, cache_path)
+        requests += analyzer.usage["requests"]
+        prompt_tokens += analyzer.usage["prompt_tokens"]
+        completion_tokens += analyzer.usage["completion_tokens"]
+    return requests, prompt_tokens, completion_tokens
+
+
+async def main(n_subs: int):
+    print("=" * 78)
+    print(f"LLM RESULT CACHE: {n_subs} subs, then {n_subs // 4} reset + {n_subs // 2} new on a second worker")
+    print("=" * 78)
+    with StubOpenAI() as stub, tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "llm_results.sqlite3")
+        for label, path in (("no cache", None), ("cache", cache_path)):
+            requests, prompt_tokens, completion_tokens = await run(stub, n_subs, path)
+            print(
+                f"  {label:<9} {requests:4d} requests | {prompt_tokens + completion_tokens:8,} tokens | "
+                f"${token_cost(prompt_tokens, completion_tokens):.4f}"
+            )
+
+        cache = LLMResultCache(cache_path)
+        for day in cache.daily():
+            lookups = day["hits"] + day["misses"]
+            saved = day["prompt_tokens_saved"] + day["completion_tokens_saved"]
+            print(
+                f"  {day['day']}: {day['hits']}/{lookups} hits ({day['hits'] / max(lookups, 1):.0%}) | "
+                f"{saved:,} tokens / ${token_cost(day['prompt_tokens_saved'], day['completion_tokens_saved']):.4f} saved"
+            )
+        cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: draining an LLM backlog under OpenAI rate limits.
+
+The local OpenAI stub enforces RPM/TPM limits over a sliding window and
+answers over-limit requests with 429 + retry-after-ms, like the real API.
+The window is shortened to `period` seconds (limits and pacing are scaled
+to match), so a run takes seconds instead of minutes. Three ways to clear
+the same backlog of an in-memory intel table:
+
+  old loop    LLM_BATCH_SIZE subs every 10 minutes (computed, not run)
+  unpaced     LLM_MAX_CONCURRENT requests in flight, no rate-limit pacing
+  scheduler   LLMScheduler paced by the x-ratelimit-* headers
+
+The analyzer's client keeps the SDK's default retries, which honour
+retry-after-ms. Reports wall time, achieved requests/tokens per minute
+against the limits, and 429s.
+
+Usage: python -m benchmarks.bench_llm_scheduler [subs] [period_seconds]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.bench_llm_backfill import MemoryBacklog, make_analyzer
+from benchmarks.sample_subs import sample_subs
+from benchmarks.stub_openai import StubOpenAI
+
+from openai import AsyncOpenAI
+from config import LLM_RATE_HEADROOM
+from llm_scheduler import LLMScheduler
+from openai_limits import OpenAIRateLimits
+
+detach_file_logs()
+logging.getLogger("llm_analyzer").setLevel(logging.CRITICAL)
+logging.getLogger("llm_scheduler").setLevel(logging.WARNING)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("openai").setLevel(logging.WARNING)
+
+RPM_LIMIT = 500
+TPM_LIMIT = 120_000
+OLD_LOOP_SUBS, OLD_LOOP_SECONDS = 10, 600
+
+
+class Unpaced(OpenAIRateLimits):
+    """Sees the headers but never waits - concurrency is the only limit."""
+
+    def delay(self, tokens: float) -> float:
+        return 0.0
+
+    def request_budget(self, tokens: float):
+        return None
+
+
+async def drain(stub: StubOpenAI, subs: list[dict], limits: OpenAIRateLimits) -> dict:
+    backlog = MemoryBacklog(subs)
+    analyzer = make_analyzer(stub, subs)
+    analyzer.client = AsyncOpenAI(api_key="sk-bench", base_url=stub.url)
+    analyzer.rate_limits = limits
+
+    async def analyze(group):
+        try:
+            results = await analyzer.analyze_batch(group)
+        except Exception:
+            return
+        for name, result in results.items():
+            if result:
+                await backlog.update_llm_analysis(name, result)
+
+    scheduler = LLMScheduler(backlog, analyze, limits)
+    scheduler.idle_seconds = 0.1
+    scheduler.requeue_seconds = limits.period / 2
+    scheduler.backlog_refresh_seconds = 1
+
+    throttled_before = stub.throttled
+    start = time.perf_counter()
+    task = asyncio.create_task(scheduler.run())
+    peak_rpm = peak_tpm = 0.0
+    while await backlog.count_subs_missing_llm():
+        await asyncio.sleep(0.2)
+        peak_rpm, peak_tpm = max(peak_rpm, limits.rpm()), max(peak_tpm, limits.tpm())
+    elapsed = time.perf_counter() - start
+    task.cancel()
+    scheduler.close()
+    await analyzer.client.close()
+    minutes = elapsed / limits.period
+    return {
+        "elapsed": elapsed,
+        "requests": analyzer.usage["requests"],
+        "rpm": analyzer.usage["requests"] / minutes,
+        "tpm": (analyzer.usage["prompt_tokens"] + analyzer.usage["completion_tokens"]) / minutes,
+        "peak_rpm": peak_rpm,
+        "peak_tpm": peak_tpm,
+        "throttled": stub.throttled - throttled_before,
+    }
+
+
+async def main(n_subs: int, period: float):
+    subs = sample_subs(n_subs)
+    print("=" * 78)
+    print(
+        f"LLM SCHEDULER: {n_subs:,} subs, limits {RPM_LIMIT} RPM / {TPM_LIMIT:,} TPM "
+        f"(one 'minute' = {period:.0f}s), headroom {LLM_RATE_HEADROOM:.0%}"
+    )
+    print("=" * 78)
+    days = n_subs / (OLD_LOOP_SUBS * 86400 / OLD_LOOP_SECONDS)
+    print(f"  old loop   {OLD_LOOP_SUBS} subs per {OLD_LOOP_SECONDS // 60} min -> {days:.1f} days")
+
+    with StubOpenAI(delay=0.3, token_delay=0.002, rpm_limit=RPM_LIMIT, tpm_limit=TPM_LIMIT,
+                    rate_period=period) as stub:
+        for label, limits in (
+            ("unpaced", Unpaced(headroom=LLM_RATE_HEADROOM, period=period)),
+            ("scheduler", OpenAIRateLimits(headroom=LLM_RATE_HEADROOM, period=period)),
+        ):
+            stub.window.clear()
+            result = await drain(stub, subs, limits)
+            print(
+                f"  {label:<10} {result['elapsed'] / period:5.1f} min | {result['requests']:4d} requests | "
+                f"{result['rpm']:4.0f} RPM / {result['tpm']:7,.0f} TPM avg, "
+                f"peak {result['peak_rpm']:4.0f} / {result['peak_tpm']:7,.0f} | {result['throttled']:4d} x 429"
+            )
+            await asyncio.sleep(period)  # Let the stub's window empty before the next run
+
+
+if __name__ == "__main__":
+    subs_count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    period_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 6.0
+    asyncio.run(main(subs_count, period_seconds))
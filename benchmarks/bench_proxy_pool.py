@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: coordinated proxy pool vs rotating on every failure.
+
+Each "proxy" is a mock Reddit used as a forward proxy: it allows 10 req/s and
+burns its IP (403 on everything) after 150 requests until its rotation URL
+is hit. 16 concurrent callers fetch about.json for a fixed time.
+
+  old        1 proxy, client per request, every 403/429 hits the rotation URL
+             and sleeps 5s (the previous fetch_with_retry/rotate_proxy behaviour)
+  pool xN    ProxyPool over N proxies: single-flight rotation with cooldown,
+             requests routed to the healthiest proxy
+
+Usage: python -m benchmarks.bench_proxy_pool [seconds]
+"""
+import asyncio
+import logging
+import sys
+import time
+from contextlib import ExitStack
+
+import httpx
+
+from benchmarks import detach_file_logs
+from benchmarks.mock_reddit import MockReddit
+
+from proxy_pool import Proxy, ProxyPool
+from reddit_http import reddit_http
+
+detach_file_logs()
+logging.getLogger("proxy_pool").setLevel(logging.WARNING)
+
+TARGET = "http://www.reddit.invalid/r/{name}/about.json"
+CALLERS = 16
+
+
+async def run_old(mock: MockReddit, seconds: float) -> int:
+    """Previous fetch_with_retry: fresh client, rotate + 5s sleep on 403/404/429/timeout."""
+    ok = 0
+    deadline = time.monotonic() + seconds
+
+    async def caller(i: int):
+        nonlocal ok
+        while time.monotonic() < deadline:
+            try:
+                async with httpx.AsyncClient(proxy=mock.url, timeout=15) as client:
+                    response = await client.get(TARGET.format(name=f"sub{i}"))
+                if response.status_code == 200:
+                    ok += 1
+                    continue
+            except Exception:
+                pass
+            async with httpx.AsyncClient() as client:
+                await client.get(f"{mock.url}/rotate")
+            await asyncio.sleep(5)
+
+    await asyncio.gather(*(caller(i) for i in range(CALLERS)))
+    return ok
+
+
+async def run_pool(mocks: list[MockReddit], seconds: float) -> int:
+    pool = ProxyPool(
+        [Proxy(f"mock{i}", mock.url, f"{mock.url}/rotate") for i, mock in enumerate(mocks)],
+        cooldown=10,
+        settle_seconds=5,
+    )
+    ok = 0
+    deadline = time.monotonic() + seconds
+
+    async def caller(i: int):
+        nonlocal ok
+        while time.monotonic() < deadline:
+            try:
+                _, response = await pool.get_url(TARGET.format(name=f"sub{i}"))
+                ok += response.status_code == 200
+            except Exception:
+                pass
+
+    await asyncio.gather(*(caller(i) for i in range(CALLERS)))
+    for proxy in pool.proxies:
+        if proxy.rotating:
+            await proxy.rotating
+    return ok
+
+
+async def main(seconds: float):
+    print("=" * 78)
+    print(f"PROXY POOL: {seconds:.0f}s per run, {CALLERS} callers, 10 req/s per IP, IP burns after 150 requests")
+    print("=" * 78)
+    for name, count in [("old", 1), ("pool x1", 1), ("pool x3", 3)]:
+        with ExitStack() as stack:
+            mocks = [stack.enter_context(MockReddit(delay=0.05, max_rps=10, burn_after=150)) for _ in range(count)]
+            reddit_http.limiters.clear()
+            if name == "old":
+                ok = await run_old(mocks[0], seconds)
+            else:
+                ok = await run_pool(mocks, seconds)
+            await reddit_http.close()
+            rotations = sum(mock.rotations for mock in mocks)
+            print(f"  {name:<8} {ok / seconds:5.1f} ok req/s | {rotations:>4} rotation calls")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 30))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fixed request rates vs the adaptive (AIMD) per-proxy limiter.
+
+16 concurrent callers fetch about.json through reddit_http for a fixed time
+against the mock Reddit, which answers 429 above `limit` req/s. A good
+limiter gets close to the limit in successful requests with few 429s.
+
+Usage: python -m benchmarks.bench_rate_limiter [seconds] [limit_rps]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.mock_reddit import MockReddit
+
+from config import REDDIT_RATE_INITIAL, REDDIT_RATE_MIN, REDDIT_RATE_MAX, REDDIT_RATE_BURST
+from rate_limiter import AdaptiveRateLimiter
+from reddit_http import RedditHTTP
+
+detach_file_logs()
+
+
+async def run_once(limiter: AdaptiveRateLimiter, mock: MockReddit, seconds: float) -> dict:
+    client = RedditHTTP()
+    client.limiters[None] = limiter
+    counts = {"ok": 0, "throttled": 0}
+    deadline = time.monotonic() + seconds
+
+    async def caller(i: int):
+        while time.monotonic() < deadline:
+            response = await client.get(f"{mock.url}/r/ratesub{i}/about.json")
+            counts["ok" if response.status_code == 200 else "throttled"] += 1
+
+    await asyncio.gather(*(caller(i) for i in range(16)))
+    await client.close()
+    return counts
+
+
+async def main(seconds: float, limit: float):
+    print("=" * 78)
+    print(f"PER-PROXY RATE LIMIT: {seconds:.0f}s per run, mock Reddit allows {limit:.0f} req/s")
+    print("=" * 78)
+    runs = [
+        (f"fixed {limit / 2:.0f} req/s", AdaptiveRateLimiter(limit / 2, limit / 2, limit / 2, burst=REDDIT_RATE_BURST)),
+        (f"fixed {limit * 1.5:.0f} req/s", AdaptiveRateLimiter(limit * 1.5, limit * 1.5, limit * 1.5, burst=REDDIT_RATE_BURST)),
+        ("adaptive (config defaults)", AdaptiveRateLimiter(
+            REDDIT_RATE_INITIAL, REDDIT_RATE_MIN, REDDIT_RATE_MAX, burst=REDDIT_RATE_BURST)),
+    ]
+    for name, limiter in runs:
+        with MockReddit(delay=0.05, max_rps=limit) as mock:
+            counts = await run_once(limiter, mock, seconds)
+        print(
+            f"  {name:<28} {counts['ok'] / seconds:5.1f} ok req/s | "
+            f"{counts['throttled']:>4} x 429 | "
+            f"final rate {limiter.rate:5.2f} req/s | {limiter.stats['cuts']} cuts"
+        )
+
+
+if __name__ == "__main__":
+    run_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    limit_rps = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(main(run_seconds, limit_rps))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request latency with and without connection pooling.
+
+"fresh" builds an httpx.AsyncClient per request, like the crawler, LLM
+analyzer and ban check used to. "pooled" goes through reddit_http's shared
+keep-alive pool. Both hit a local HTTPS stub that adds a fixed delay per new
+connection for the proxy round trips.
+
+Usage: python -m benchmarks.bench_reddit_http [requests] [connect_delay_seconds]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from benchmarks import detach_file_logs
+from benchmarks.stub_tls import StubTLS
+
+from reddit_http import RedditHTTP
+
+detach_file_logs()
+
+
+async def fresh_get(url: str):
+    async with httpx.AsyncClient(verify=False, timeout=15) as client:
+        return await client.get(url)
+
+
+async def measure(name: str, stub: StubTLS, get, n: int, concurrency: int):
+    url = f"{stub.url}/r/stub/about.json"
+    connections_before = stub.connections
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(n):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            response = await get(url)
+            assert response.status_code == 200
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(
+        f"  {name:<7} x{concurrency:<3} mean {statistics.mean(latencies) * 1000:6.1f}ms | "
+        f"p50 {latencies[len(latencies) // 2] * 1000:6.1f}ms | "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.1f}ms | "
+        f"{n / elapsed:6.0f} req/s | {stub.connections - connections_before} connections"
+    )
+
+
+async def main(n: int, connect_delay: float):
+    print("=" * 78)
+    print(f"REDDIT HTTP CLIENT: {n} requests, {connect_delay * 1000:.0f}ms per new connection")
+    print("=" * 78)
+    with StubTLS(connect_delay=connect_delay) as stub:
+        for concurrency in (1, 10):
+            await measure("fresh", stub, fresh_get, n, concurrency)
+            pool = RedditHTTP(verify=False)
+            await measure("pooled", stub, lambda url: pool.get(url), n, concurrency)
+            await pool.close()
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    asyncio.run(main(requests, delay))
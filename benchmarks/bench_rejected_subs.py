@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: crawler metadata lookups with and without the negative cache.
+
+Within one session the crawl frontier already schedules each candidate once;
+rejected subs came back after every restart (and whenever the frontier's
+seen set was reset). Each mode runs two discovery sessions against the local
+mock Reddit with a restart in between - known subs carry over as they would
+via their snapshot, rejected subs only when the cache is on. Reports the
+second session's metadata lookups (and how many were rejects re-fetched),
+cache hit ratio and lookups saved.
+
+Usage: python -m benchmarks.bench_rejected_subs [seconds_per_session] [page_delay_seconds]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.bench_crawler_frontier import MemoryQueue
+from benchmarks.mock_reddit import MockReddit
+
+import crawler_llm
+from crawler_llm import CrawlerLLM
+from known_subs import KnownSubreddits
+from proxy_pool import Proxy, ProxyPool
+from rate_limiter import AdaptiveRateLimiter
+from reddit_http import reddit_http
+from rejected_subs import RejectedSubreddits, SFW, TOO_SMALL
+
+detach_file_logs()
+logging.getLogger("crawler_llm").setLevel(logging.WARNING)
+logging.getLogger("rejected_subs").setLevel(logging.WARNING)
+
+RATE = 20.0
+TTLS = {SFW: 86400, TOO_SMALL: 86400}
+
+
+async def session(mock: MockReddit, known: KnownSubreddits, rejected: RejectedSubreddits, seconds: float) -> dict:
+    crawler_llm.REDDIT_BASE_URL = mock.url
+    crawler = CrawlerLLM()
+    crawler.supabase = MemoryQueue()
+    crawler.proxy_pool = ProxyPool([Proxy("direct", None)])
+    crawler.existing_subs = known
+    crawler.existing_subs.sync = lambda supabase: asyncio.sleep(0)  # No DB to sync from
+    crawler.existing_subs_loaded = True
+    crawler.rejected_subs = rejected
+    crawler.authors.path = None
+    reddit_http.limiters[None] = AdaptiveRateLimiter(RATE, min_rate=RATE, max_rate=RATE, burst=RATE)
+
+    task = asyncio.create_task(crawler.discover_subreddits())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    await reddit_http.close()
+    rejected.save()
+    return {
+        "lookups": crawler.subreddit_info.stats["names"],
+        "batches": crawler.subreddit_info.stats["requests"],
+    }
+
+
+async def run(cache: bool, seconds: float, delay: float, tmp: str) -> tuple[dict, RejectedSubreddits]:
+    path = os.path.join(tmp, f"rejected_{cache}.sqlite3")
+    ttls = TTLS if cache else {}  # No TTL = every entry is already expired
+    known = KnownSubreddits()
+    with MockReddit(delay=delay) as mock:
+        await session(mock, known, RejectedSubreddits(path, ttls), seconds)
+        restarted = RejectedSubreddits(path, ttls)
+        restarted.load()
+        stats = await session(mock, known, restarted, seconds)
+    return stats, restarted
+
+
+async def main(seconds: float, delay: float):
+    print("=" * 78)
+    print(f"NEGATIVE CACHE: 2 x {seconds:.0f}s sessions, {delay * 1000:.0f}ms per request, {RATE:.0f} req/s cap")
+    print("=" * 78)
+    with tempfile.TemporaryDirectory() as tmp:
+        for cache in (False, True):
+            start = time.perf_counter()
+            stats, rejected = await run(cache, seconds, delay, tmp)
+            label = "cache on" if cache else "cache off"
+            print(
+                f"  {label:<10} after restart: {stats['lookups']:4d} lookups in {stats['batches']:3d} requests "
+                f"({rejected.stats['added']:3d} rejects re-fetched) | hit ratio {rejected.hit_ratio():4.0%} | "
+                f"{rejected.stats['hits']:,} lookups saved ({time.perf_counter() - start:.0f}s)"
+            )
+
+
+if __name__ == "__main__":
+    session_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    page_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    asyncio.run(main(session_seconds, page_delay))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: LLM analysis with and without the rule pre-classifier.
+
+The sample subs are first analyzed by the local OpenAI stub with the
+classifier off; those answers play the stored LLM results. Then:
+
+  eval        rule_classifier.evaluate() against them - share decided
+              locally and agreement on the decided subs
+  no rules    the backlog drained by LLMScheduler the way crawler_llm.py
+              runs it (prepare on refill, analyze_prepared per request),
+              every sub to the model
+  rules       the same with the classifier on
+  in-batch    classifier on, but decided inside analyze_batch after the
+              subs were grouped - requests are thinned, not saved
+
+Reports OpenAI requests, tokens, cost and wall time, and the classifier's
+own cost per sub. The stub answers with regexes much like the classifier's,
+so the eval agreement here only checks the plumbing; accuracy comes from
+eval_rule_classifier.py against real stored results.
+
+Usage: python -m benchmarks.bench_rule_classifier [subs]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.bench_llm_backfill import MemoryBacklog, make_analyzer
+from benchmarks.sample_subs import sample_subs
+from benchmarks.stub_openai import StubOpenAI
+
+from config import LLM_SUBS_PER_PROMPT
+from llm_analyzer import SubredditLLMAnalyzer, token_cost
+from llm_scheduler import LLMScheduler
+from rule_classifier import classify, evaluate
+
+detach_file_logs()
+logging.getLogger("llm_analyzer").setLevel(logging.ERROR)
+logging.getLogger("llm_scheduler").setLevel(logging.WARNING)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def drain(stub: StubOpenAI, subs: list[dict], rule_classifier: bool) -> tuple[SubredditLLMAnalyzer, dict, float]:
+    """Scheduler + prepare/analyze callbacks as in CrawlerLLM; returns the results written."""
+    backlog = MemoryBacklog(subs)
+    analyzer = make_analyzer(stub, subs)
+    analyzer.rule_classifier = rule_classifier
+    written = {}
+
+    async def prepare(rows):
+        local, uncached = await analyzer.prepare(rows)
+        written.update(local)
+        for name, result in local.items():
+            await backlog.update_llm_analysis(name, result)
+        return uncached
+
+    async def analyze(group):
+        results = await analyzer.analyze_prepared(group)
+        written.update(results)
+        for name, result in results.items():
+            await backlog.update_llm_analysis(name, result)
+
+    scheduler = LLMScheduler(backlog, analyze, analyzer.rate_limits, prepare=prepare)
+    scheduler.idle_seconds = 0.05
+    start = time.perf_counter()
+    task = asyncio.create_task(scheduler.run())
+    while await backlog.count_subs_missing_llm():
+        await asyncio.sleep(0.02)
+    elapsed = time.perf_counter() - start
+    task.cancel()
+    scheduler.close()
+    await analyzer.client.close()
+    return analyzer, written, elapsed
+
+
+async def in_batch(stub: StubOpenAI, subs: list[dict]) -> tuple[SubredditLLMAnalyzer, float]:
+    analyzer = make_analyzer(stub, subs)
+    analyzer.rule_classifier = True
+    groups = [subs[i:i + LLM_SUBS_PER_PROMPT] for i in range(0, len(subs), LLM_SUBS_PER_PROMPT)]
+    start = time.perf_counter()
+    await asyncio.gather(*(analyzer.analyze_batch(group) for group in groups))
+    elapsed = time.perf_counter() - start
+    await analyzer.client.close()
+    return analyzer, elapsed
+
+
+def report_line(label: str, analyzer: SubredditLLMAnalyzer, elapsed: float) -> str:
+    usage = analyzer.usage
+    tokens = usage["prompt_tokens"] + usage["completion_tokens"]
+    return (
+        f"  {label:<9} {usage['requests']:4d} requests | {tokens:8,} tokens | "
+        f"${token_cost(usage['prompt_tokens'], usage['completion_tokens']):.4f} | {elapsed:5.2f}s | "
+        f"{usage['classified']} decided by rules"
+    )
+
+
+async def main(n_subs: int):
+    subs = sample_subs(n_subs)
+    print("=" * 78)
+    print(f"RULE PRE-CLASSIFIER: {n_subs} subs, {LLM_SUBS_PER_PROMPT} per request")
+    print("=" * 78)
+    with StubOpenAI() as stub:
+        baseline, stored, baseline_elapsed = await drain(stub, subs, rule_classifier=False)
+        examples = [{**sub, "result": stored[sub["subreddit_name"]]} for sub in subs]
+
+        report = evaluate(examples)
+        decided = report["decided"]
+        print(
+            f"  eval      {decided}/{n_subs} decided locally ({decided / n_subs:.0%}) | agreement on decided: "
+            f"verification {report['verification_agree'] / max(decided, 1):.1%}, "
+            f"sellers {report['sellers_agree'] / max(decided, 1):.1%}"
+        )
+
+        print(report_line("no rules", baseline, baseline_elapsed))
+        with_rules, _, elapsed = await drain(stub, subs, rule_classifier=True)
+        print(report_line("rules", with_rules, elapsed))
+        batched, elapsed = await in_batch(stub, subs)
+        print(report_line("in-batch", batched, elapsed))
+        print(
+            f"  requests avoided: {1 - with_rules.usage['requests'] / max(baseline.usage['requests'], 1):.0%} "
+            f"(in-batch {1 - batched.usage['requests'] / max(baseline.usage['requests'], 1):.0%})"
+        )
+
+    start = time.perf_counter()
+    for sub in subs:
+        classify(sub["subreddit_name"], sub["description"], sub["rules"])
+    print(f"  classifier: {(time.perf_counter() - start) / n_subs * 1e6:.0f} µs/sub")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-sub about.json vs batched /api/info.json metadata lookups.
+
+Discovery runs for a fixed time against the local mock Reddit, once with the
+old one-about.json-per-candidate lookup and once with SubredditInfoBatcher.
+Reports metadata requests per discovered sub and total discovery rate.
+
+A second part resolves the same names the way the intel worker's ban
+pre-check does - a fixed number of concurrent callers - and reports names
+per request and total time, against one name per request.
+
+Usage: python -m benchmarks.bench_subreddit_info [seconds] [page_delay_seconds]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks import detach_file_logs
+from benchmarks.bench_crawler_frontier import MemoryQueue
+from benchmarks.mock_reddit import MockReddit
+
+import crawler_llm
+from crawler_llm import CrawlerLLM
+from known_subs import KnownSubreddits
+from proxy_pool import Proxy, ProxyPool
+from rate_limiter import AdaptiveRateLimiter
+from reddit_http import reddit_http
+from subreddit_info import SubredditInfoBatcher
+
+detach_file_logs()
+logging.getLogger("crawler_llm").setLevel(logging.WARNING)
+
+RATE = 20.0
+
+
+class AboutLookup:
+    """The previous lookup: one about.json per sub."""
+
+    def __init__(self, crawler: CrawlerLLM):
+        self.crawler = crawler
+
+    async def get(self, subreddit_name: str):
+        data = await self.crawler.fetch_with_retry(f"{crawler_llm.REDDIT_BASE_URL}/r/{subreddit_name}/about.json")
+        return data.get("data") if data else None
+
+
+def unlimited():
+    reddit_http.limiters[None] = AdaptiveRateLimiter(RATE, min_rate=RATE, max_rate=RATE, burst=RATE)
+
+
+async def discovery(batched: bool, seconds: float, delay: float) -> dict:
+    with MockReddit(delay=delay) as mock:
+        crawler_llm.REDDIT_BASE_URL = mock.url
+        crawler = CrawlerLLM()
+        crawler.supabase = MemoryQueue()
+        crawler.proxy_pool = ProxyPool([Proxy("direct", None)])
+        crawler.existing_subs = KnownSubreddits()
+        crawler.existing_subs.sync = lambda supabase: asyncio.sleep(0)  # No DB to sync from
+        crawler.existing_subs_loaded = True
+        crawler.rejected_subs.path = None
+        crawler.authors.path = None
+        if batched:
+            crawler.subreddit_info = SubredditInfoBatcher(mock.url, fetch_json=crawler.fetch_with_retry)
+        else:
+            crawler.subreddit_info = AboutLookup(crawler)
+        unlimited()
+
+        task = asyncio.create_task(crawler.discover_subreddits())
+        await asyncio.sleep(seconds)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await reddit_http.close()
+        return {
+            "metadata": mock.paths.get("about.json", 0) + mock.paths.get("info.json", 0),
+            "requests": crawler.crawler_stats["requests"],
+            "discovered": crawler.crawler_stats["discovered"],
+        }
+
+
+async def precheck(callers: int, names: int, delay: float, batched: bool = True) -> tuple[float, float]:
+    """(names per request, seconds) for `callers` concurrent lookups at a time."""
+    with MockReddit(delay=delay) as mock:
+        pool = ProxyPool([Proxy("direct", None)])
+        batcher = SubredditInfoBatcher(mock.url, proxies=pool, batch_size=None if batched else 1,
+                                       window=None if batched else 0)
+        unlimited()
+        queue = asyncio.Queue()
+        for i in range(names):
+            queue.put_nowait(f"mocksub{i}")
+
+        async def consumer():
+            while not queue.empty():
+                await batcher.get(queue.get_nowait())
+
+        start = time.perf_counter()
+        await asyncio.gather(*(consumer() for _ in range(callers)))
+        elapsed = time.perf_counter() - start
+        await reddit_http.close()
+        return batcher.names_per_request(), elapsed
+
+
+async def main(seconds: float, delay: float):
+    print("=" * 78)
+    print(f"SUBREDDIT METADATA: {seconds:.0f}s discovery runs, {delay * 1000:.0f}ms per request, {RATE:.0f} req/s cap")
+    print("=" * 78)
+    for batched in (False, True):
+        stats = await discovery(batched, seconds, delay)
+        label = "info.json batches" if batched else "about.json per sub"
+        discovered = max(stats["discovered"], 1)
+        print(
+            f"  {label:<20} {stats['discovered']:5d} discovered | {stats['metadata']:5d} metadata requests "
+            f"({stats['metadata'] / discovered:.2f}/sub) | {stats['requests'] / discovered:.2f} requests/sub"
+        )
+
+    print("\n  Ban pre-check, 500 subs:")
+    per_request, elapsed = await precheck(8, 500, delay, batched=False)
+    print(f"      8 concurrent, one sub/request: {elapsed:.1f}s")
+    for callers in (8, 32, 100):
+        per_request, elapsed = await precheck(callers, 500, delay)
+        print(f"    {callers:3d} concurrent checks: {per_request:5.1f} subs/request, {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    run_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    page_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    asyncio.run(main(run_seconds, page_delay))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark: N intel upserts against a stub PostgREST server.
+
+  Blocking      - the old behaviour, .execute() straight on the event loop (N round-trips)
+  Concurrent    - single-row upserts awaited through the DB thread pool (~1 round-trip)
+  Write-behind  - upsert_subreddit_intel() via the batch buffer (1 request total)
+
+Usage: python -m benchmarks.bench_supabase_async [N] [delay_seconds]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks.stub_postgrest import StubPostgrest
+from supabase_client import SupabaseClient
+
+
+def _row(i: int) -> dict:
+    return {"subreddit_name": f"bench_sub_{i}", "weekly_visitors": i, "weekly_contributions": i}
+
+
+async def run(n: int, delay: float):
+    with StubPostgrest(delay=delay) as stub:
+        db = SupabaseClient(url=stub.url, key="bench.anon.key", max_workers=n)
+
+        def upsert(i):
+            return db.client.table("nsfw_subreddit_intel").upsert(_row(i), on_conflict="subreddit_name")
+
+        start = time.perf_counter()
+        for i in range(n):
+            upsert(i).execute()
+        blocking = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*(db.execute(upsert(i)) for i in range(n)))
+        concurrent = time.perf_counter() - start
+
+        requests_before = stub.requests
+        start = time.perf_counter()
+        await asyncio.gather(*(db.upsert_subreddit_intel(_row(i)) for i in range(n)))
+        await db.flush()
+        buffered = time.perf_counter() - start
+        buffered_requests = stub.requests - requests_before
+
+        writes = db.intel_writes.get_stats()
+        await db.close()
+
+    print("=" * 60)
+    print(f"{n} upserts, {delay * 1000:.0f}ms simulated round-trip")
+    print("=" * 60)
+    print(f"  Blocking (old):    {blocking:.2f}s  ({blocking / delay:.1f} round-trips, {n} requests)")
+    print(f"  Concurrent:        {concurrent:.2f}s  ({concurrent / delay:.1f} round-trips, {n} requests)")
+    print(f"  Write-behind:      {buffered:.2f}s  ({buffered / delay:.1f} round-trips, {buffered_requests} requests)")
+    print(f"  Flushed rows:      {writes['rows_flushed']} (avg batch {writes['avg_batch_size']:.0f}, {writes['avg_flush_ms']:.0f}ms/flush)")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    asyncio.run(run(n, delay))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold vs warm startup of the intel candidate index.
+
+The queue and intel tables live in memory behind a tiny query builder that
+mimics the supabase-py calls IntelCandidateIndex makes; every page costs a
+fixed round-trip delay. Cold start pages through both tables. Warm start
+loads the SQLite snapshot written by the cold run and only fetches rows
+changed since (new queue rows plus intel updates).
+
+Usage: python -m benchmarks.bench_warm_start [--delay 0.08]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks import detach_file_logs
+
+from supabase_client import IntelCandidateIndex
+
+detach_file_logs()
+
+MIN_SUBSCRIBERS = 5000
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class Query:
+    """The subset of the postgrest builder used by _fetch_since."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.bounds = (0, len(rows))
+
+    def select(self, columns: str):
+        return self
+
+    def gte(self, column, value):
+        self.rows = [row for row in self.rows if row[column] >= value]
+        return self
+
+    def gt(self, column, value):
+        self.rows = [row for row in self.rows if row[column] > value]
+        return self
+
+    def order(self, column):
+        self.rows = sorted(self.rows, key=lambda row: row[column])
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end + 1)
+        return self
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class MemorySupabase:
+    """Stands in for SupabaseClient: .client.table() plus async execute()."""
+
+    def __init__(self, tables: dict, delay: float):
+        self.tables = tables
+        self.delay = delay
+        self.pages = 0
+        self.client = self
+
+    def table(self, name):
+        return Query(self.tables[name])
+
+    async def has_retry_columns(self) -> bool:
+        return False
+
+    async def execute(self, query: Query):
+        self.pages += 1
+        await asyncio.sleep(self.delay)
+        start, end = query.bounds
+        return Result(query.rows[start:end])
+
+
+def stamp(i: int) -> str:
+    return (EPOCH + timedelta(seconds=i)).isoformat()
+
+
+def make_tables(n: int) -> dict:
+    rng = random.Random(n)
+    queue = [
+        {"subreddit_name": f"sub{i}", "subscribers": rng.randint(MIN_SUBSCRIBERS, 2_000_000), "created_at": stamp(i)}
+        for i in range(n)
+    ]
+    intel = [
+        {"subreddit_name": f"sub{i}", "scrape_status": "completed", "error_message": None, "updated_at": stamp(i)}
+        for i in range(0, n, 2)
+    ]
+    return {"subreddit_queue": queue, "nsfw_subreddit_intel": intel}
+
+
+def apply_changes(tables: dict, n: int, new_subs: int, intel_updates: int):
+    """Rows written by the rest of the system while the worker was down."""
+    base = 10 * n
+    tables["subreddit_queue"].extend(
+        {"subreddit_name": f"new{i}", "subscribers": MIN_SUBSCRIBERS + i, "created_at": stamp(base + i)}
+        for i in range(new_subs)
+    )
+    tables["nsfw_subreddit_intel"].extend(
+        {"subreddit_name": f"sub{i}", "scrape_status": "completed", "error_message": None, "updated_at": stamp(base + i)}
+        for i in range(1, 2 * intel_updates, 2)
+    )
+
+
+async def start(supabase: MemorySupabase, path: str) -> tuple[float, int, IntelCandidateIndex]:
+    supabase.pages = 0
+    index = IntelCandidateIndex(supabase, MIN_SUBSCRIBERS, snapshot_path=path)
+    t0 = time.perf_counter()
+    await index.refresh(force=True)
+    elapsed = time.perf_counter() - t0
+    index.snapshot.close()
+    return elapsed, supabase.pages, index
+
+
+async def main(delay: float):
+    print("=" * 78)
+    print(f"INTEL CANDIDATE INDEX STARTUP ({delay * 1000:.0f}ms per DB page)")
+    print("=" * 78)
+    for n in (10_000, 100_000):
+        tables = make_tables(n)
+        supabase = MemorySupabase(tables, delay)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "intel_index.sqlite3")
+            cold_time, cold_pages, cold = await start(supabase, path)
+            size = os.path.getsize(path)
+
+            apply_changes(tables, n, new_subs=200, intel_updates=300)
+            warm_time, warm_pages, warm = await start(supabase, path)
+
+            # A fresh cold start over the same data must agree with the warm index
+            _, _, check = await start(supabase, os.path.join(tmp, "check.sqlite3"))
+            assert warm.subscribers == check.subscribers and warm.done == check.done
+            assert warm._in_heap - warm.done == check._in_heap - check.done
+
+        print(f"\n  {n:,} queue rows, {n // 2:,} intel rows; then +200 queue / 300 intel changes")
+        print(f"    cold  {cold_time:6.2f}s  {cold_pages:4d} DB pages  ({len(cold.subscribers):,} subs, {len(cold.done):,} done)")
+        print(f"    warm  {warm_time:6.2f}s  {warm_pages:4d} DB pages  (snapshot {size / 2**20:.1f} MB)")
+        print(f"    speedup {cold_time / warm_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.08, help="Seconds per DB page")
+    args = parser.parse_args()
+    asyncio.run(main(args.delay))
@@ -0,0 +1,206 @@
+"""
+Local mock of the Reddit pages/endpoints the workers hit.
+
+Data is derived deterministically from the subreddit/user name, and every
+response waits `delay` seconds to stand in for proxy + Reddit latency.
+
+  /r/<name>                      shreddit-style subreddit page with weekly stats
+  /r/<name>/about.json           subreddit metadata
+  /r/<name>/new.json             recent posts (authors)
+  /user/<name>/submitted.json    a user's posts across subreddits
+  /api/info.json?sr_name=a,b     metadata for several subreddits
+  /static/*                      heavy assets (images/fonts) referenced by pages
+
+With block_every=N, every Nth subreddit page gets Reddit's 403 block page.
+With max_rps set, requests beyond that rate (token bucket, burst = max_rps)
+get a 429, like Reddit's per-IP limit.
+
+With author_skew=True, the first PROLIFIC_AUTHORS users show up in every
+sub's new posts but only ever post in the same few popular subs - the
+prolific cross-posters that make author sampling waste requests.
+
+It also works as a forward proxy URL (absolute-form requests), standing in
+for one mobile proxy's exit IP: with burn_after=N the IP gets 403s after N
+requests until GET /rotate gives it a "new IP".
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def _seed(name: str) -> int:
+    return int(hashlib.md5(name.lower().encode()).hexdigest()[:8], 16)
+
+
+def subreddit_page(name: str) -> str:
+    """Rough shape of a new-Reddit subreddit page: big DOM, stats in slots."""
+    seed = _seed(name)
+    visitors = f"{(seed % 900) / 10 + 1:.1f}K"
+    contributions = str(seed % 5000)
+    posts = "\n".join(
+        f'<shreddit-post post-title="Post {i} in r/{name}" author="user{(seed + i) % 500}">'
+        f'<img src="/static/thumb_{i}.jpg" loading="lazy"><p>{"lorem ipsum " * 40}</p></shreddit-post>'
+        for i in range(25)
+    )
+    return f"""<!DOCTYPE html>
+<html><head><title>r/{name}</title>
+<link rel="stylesheet" href="/static/app.css">
+<link rel="preload" href="/static/font.woff2" as="font">
+<script src="/static/analytics.js"></script>
+</head><body>
+<shreddit-subreddit-header name="{name}">
+  <img src="/static/banner.jpg">
+  <faceplate-number slot="weekly-active-users-count">{visitors}</faceplate-number>
+  <faceplate-number slot="weekly-contributions-count">{contributions}</faceplate-number>
+</shreddit-subreddit-header>
+{posts}
+</body></html>"""
+
+
+BLOCK_PAGE = b"<html><head><title>Blocked</title></head><body>You've been blocked by network security.</body></html>"
+
+
+def about_json(name: str) -> dict:
+    seed = _seed(name)
+    return {"kind": "t5", "data": {
+        "display_name": name,
+        "over18": seed % 4 != 0,
+        "subscribers": seed % 200_000,
+        "public_description": f"Mock community r/{name}",
+        "community_rules": [
+            {"short_name": "Verified only" if seed % 3 == 0 else "Be nice", "description": "Mock rule"},
+        ],
+    }}
+
+
+PROLIFIC_AUTHORS = 50
+POPULAR_SUBS = 40
+
+
+def new_json(name: str, author_skew: bool = False) -> dict:
+    seed = _seed(name)
+    authors = [f"user{(seed + i) % 500}" for i in range(25)]
+    if author_skew:
+        authors[:10] = [f"user{(seed + i) % PROLIFIC_AUTHORS}" for i in range(10)]
+    return {"data": {"children": [
+        {"data": {"author": author, "subreddit": name, "over_18": True}}
+        for author in authors
+    ]}}
+
+
+def submitted_json(username: str, author_skew: bool = False) -> dict:
+    seed = _seed(username)
+    subs = 3000
+    if author_skew and username[4:].isdigit() and int(username[4:]) < PROLIFIC_AUTHORS:
+        subs = POPULAR_SUBS
+    return {"data": {"children": [
+        {"data": {"subreddit": f"mocksub{(seed + i * 7919) % subs}", "over_18": True}}
+        for i in range(20)
+    ]}}
+
+
+class MockReddit:
+    """Threaded mock server. Counts requests and bytes served."""
+
+    def __init__(self, delay: float = 0.2, asset_size: int = 150_000, block_every: int = 0,
+                 max_rps: float = 0, burn_after: int = 0, author_skew: bool = False):
+        self.delay = delay
+        self.author_skew = author_skew
+        self.block_every = block_every
+        self.max_rps = max_rps
+        self.tokens = max_rps
+        self.tokens_updated = time.monotonic()
+        self.throttled = 0
+        self.burn_after = burn_after
+        self.served_since_rotation = 0
+        self.rotations = 0
+        self.page_requests = 0
+        self.asset = b"\0" * asset_size
+        self.requests = 0
+        self.bytes_sent = 0
+        self.paths: dict[str, int] = {}
+        self._lock = threading.Lock()
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                with mock._lock:
+                    mock.requests += 1
+                    mock.bytes_sent += len(body)
+                    key = self.path.split("?")[0].rsplit("/", 1)[-1] or "/"
+                    mock.paths[key] = mock.paths.get(key, 0) + 1
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parts = [p for p in url.path.split("/") if p]
+                if url.path == "/rotate":
+                    with mock._lock:
+                        mock.rotations += 1
+                        mock.served_since_rotation = 0
+                    return self._send(200, b'{"status": "ok"}', "application/json")
+                with mock._lock:
+                    mock.served_since_rotation += 1
+                    burned = mock.burn_after and mock.served_since_rotation > mock.burn_after
+                if burned:
+                    return self._send(403, BLOCK_PAGE, "text/html")
+                if mock.max_rps and not mock._take_token():
+                    return self._send(429, b'{"message": "Too Many Requests", "error": 429}', "application/json")
+                time.sleep(mock.delay)
+
+                if parts[:1] == ["static"]:
+                    return self._send(200, mock.asset, "application/octet-stream")
+                if len(parts) == 2 and parts[0] == "r":
+                    with mock._lock:
+                        mock.page_requests += 1
+                        blocked = mock.block_every and mock.page_requests % mock.block_every == 0
+                    if blocked:
+                        return self._send(403, BLOCK_PAGE, "text/html")
+                    return self._send(200, subreddit_page(parts[1]).encode(), "text/html")
+                if len(parts) == 3 and parts[0] == "r" and parts[2] == "about.json":
+                    return self._send(200, json.dumps(about_json(parts[1])).encode(), "application/json")
+                if len(parts) == 3 and parts[0] == "r" and parts[2] == "new.json":
+                    return self._send(200, json.dumps(new_json(parts[1], mock.author_skew)).encode(), "application/json")
+                if len(parts) == 3 and parts[0] == "user" and parts[2] == "submitted.json":
+                    return self._send(200, json.dumps(submitted_json(parts[1], mock.author_skew)).encode(), "application/json")
+                if url.path == "/api/info.json":
+                    names = parse_qs(url.query).get("sr_name", [""])[0].split(",")
+                    children = [about_json(n) for n in names if n]
+                    return self._send(200, json.dumps({"data": {"children": children}}).encode(), "application/json")
+                self._send(404, b'{"message": "Not Found"}', "application/json")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.server.handle_error = lambda request, address: None  # Clients cancelled mid-response
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.max_rps, self.tokens + (now - self.tokens_updated) * self.max_rps)
+            self.tokens_updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.throttled += 1
+            return False
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
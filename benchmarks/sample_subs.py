@@ -0,0 +1,67 @@
+"""
+Synthetic subreddit descriptions and rule sets for the LLM benchmarks.
+
+Rules are drawn deterministically from a pool modelled on real NSFW
+community rules - verification requirements, seller/OnlyFans policies and
+the generic rules most subs carry - so prompts have realistic length and the
+stub model has something to judge.
+"""
+import random
+
+NICHES = ["amateur", "petite", "asian", "milf", "curvy", "fitness", "cosplay", "latina", "goth", "redhead"]
+
+VERIFICATION_RULES = [
+    ("Verified users only", "You must be verified to post here. Send a photo holding a sign with your username "
+                            "and the subreddit name to the moderators via modmail before posting."),
+    ("Verification required", "All posters need to complete verification. Unverified posts are removed without "
+                              "notice. See the wiki for the verification process."),
+]
+
+NO_SELLER_RULES = [
+    ("No OF / sellers", "No OnlyFans, Fansly, or any other paid content links. No selling of any kind, "
+                        "including in comments or your profile. Amateur content only."),
+    ("No selling", "This is a non-commercial community. Sellers are banned on sight, and so are posts that "
+                   "advertise paid content or direct people to DMs for menus."),
+]
+
+SELLER_RULES = [
+    ("Creators welcome", "OnlyFans creators are welcome to post, but links go in the comments only. One post "
+                         "per day per creator. Self-promo allowed within these limits."),
+    ("Promotion", "Self-promotion allowed. Include your own content only; reposting other creators' "
+                  "material is not allowed and results in a ban."),
+]
+
+GENERIC_RULES = [
+    ("18+ only", "Everyone pictured must be 18 or older. Content that suggests otherwise is removed and "
+                 "reported to the admins."),
+    ("Be respectful", "No harassment, degrading comments, or unsolicited DMs. Report rule-breaking instead "
+                      "of arguing in the comments."),
+    ("OC only", "Post your own original content. Reposts and stolen content are removed."),
+    ("No spam", "Do not post more than three times per day. Titles must describe the content, no "
+                "clickbait or emoji-only titles."),
+    ("Tag your posts", "Use the correct flair for every post. Unflaired posts are removed after one hour."),
+    ("No personal info", "Never share anyone's personal information, including your own contact details."),
+]
+
+
+def sample_subs(n: int, seed: int = 0) -> list[dict]:
+    """n subreddits shaped like get_subs_missing_llm rows plus their rules."""
+    rng = random.Random(seed)
+    subs = []
+    for i in range(n):
+        niche = NICHES[i % len(NICHES)]
+        rules = rng.sample(GENERIC_RULES, rng.randint(2, 4))
+        if rng.random() < 0.4:
+            rules.insert(0, rng.choice(VERIFICATION_RULES))
+        policy = rng.random()
+        if policy < 0.35:
+            rules.append(rng.choice(NO_SELLER_RULES))
+        elif policy < 0.65:
+            rules.append(rng.choice(SELLER_RULES))
+        subs.append({
+            "subreddit_name": f"{niche}sub{i}",
+            "description": f"A community for {niche} content. Read the rules before posting.",
+            "subscribers": rng.randint(5_000, 2_000_000),
+            "rules": [{"short_name": short_name, "description": text} for short_name, text in rules],
+        })
+    return subs
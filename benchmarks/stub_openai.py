@@ -0,0 +1,297 @@
+"""
+Minimal OpenAI chat completions stand-in for benchmarks.
+
+Answers POST /v1/chat/completions the way the subreddit analysis prompts
+expect: every "**Subreddit:** r/<name>" section of the user message gets a
+result derived from keywords in that section, either as a single JSON object
+or, for the batched structured-output format, as {"results": [...]}.
+
+Token counts are estimated at 4 characters per token. Each request sleeps for
+a fixed delay plus a per-completion-token delay, and omit_rate makes batched
+answers leave out or garble that fraction of their entries.
+
+The Batch API is covered too: POST /v1/files (purpose "batch"), POST
+/v1/batches, GET /v1/batches/<id> and GET /v1/files/<id>/content. A batch
+answers every request line without the per-request delay and completes
+batch_delay seconds after it was created.
+
+With rpm_limit / tpm_limit set, chat completions carry x-ratelimit-* headers
+for a sliding window of rate_period seconds (60, or less to run a benchmark
+faster), and requests over either limit get a 429 with retry-after-ms.
+"""
+import email.parser
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SECTION_RE = re.compile(r"\*\*Subreddit:\*\* r/(\w+)")
+
+
+class StubServer(ThreadingHTTPServer):
+    # A burst of concurrent requests overflows the default listen backlog of 5
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def tokens(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+
+def analyze(name: str, section: str) -> dict:
+    """Deterministic stand-in for the model's judgement of one subreddit."""
+    text = section.lower()
+    if re.search(r"no (of|onlyfans|sellers|selling)|sellers? (are )?banned|amateur only", text):
+        sellers = "not_allowed"
+    elif re.search(r"onlyfans|sellers? welcome|promotion allowed|self-promo", text):
+        sellers = "allowed"
+    else:
+        sellers = "unknown"
+    verification = bool(re.search(r"verif", text))
+    return {
+        "verification_required": verification,
+        "sellers_allowed": sellers,
+        "niche_categories": ["amateur"],
+        "confidence": "high" if sellers != "unknown" else "medium",
+        "reasoning": f"r/{name}: {'verification required' if verification else 'no verification rule'}, "
+                     f"sellers {sellers.replace('_', ' ')}.",
+    }
+
+
+class StubOpenAI:
+    """Threaded HTTP server that simulates chat completion latency and usage."""
+
+    def __init__(self, delay: float = 0.3, token_delay: float = 0.002, omit_rate: float = 0.0, seed: int = 0,
+                 batch_delay: float = 1.0, rpm_limit: int = None, tpm_limit: int = None, rate_period: float = 60.0):
+        self.delay = delay
+        self.batch_delay = batch_delay
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.rate_period = rate_period
+        self.window: deque = deque()  # (time, tokens) of answered requests inside rate_period
+        self.throttled = 0
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+        self.token_delay = token_delay
+        self.omit_rate = omit_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if self.path.endswith("/files"):
+                    self._send(200, stub.upload(self.headers.get("Content-Type", ""), body))
+                elif self.path.endswith("/batches"):
+                    self._send(200, stub.create_batch(json.loads(body)))
+                elif self.path.endswith("/chat/completions"):
+                    request = json.loads(body or b"{}")
+                    retry_after = stub.admit(request)
+                    if retry_after is not None:
+                        headers = {**stub.limit_headers(), "retry-after-ms": str(int(retry_after * 1000))}
+                        self._send(429, {"error": {"message": "Rate limit reached", "type": "requests",
+                                                   "code": "rate_limit_exceeded"}}, headers=headers)
+                        return
+                    reply = stub.complete(request)
+                    stub.spend(reply["usage"]["total_tokens"])
+                    time.sleep(stub.delay + reply["usage"]["completion_tokens"] * stub.token_delay)
+                    self._send(200, reply, headers=stub.limit_headers())
+                else:
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                if parts[-1] == "content" and parts[-2] in stub.files:
+                    self._send(200, stub.files[parts[-2]], "application/octet-stream")
+                elif parts[-2] == "batches" and parts[-1] in stub.batches:
+                    with stub._lock:
+                        self._send(200, dict(stub.batches[parts[-1]]))
+                else:
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def _send(self, status: int, payload, content_type: str = "application/json", headers: dict = None):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client cancelled the request
+
+            def log_message(self, *args):
+                pass
+
+        self.server = StubServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def answer(self, request: dict) -> str:
+        """Assistant message content for a chat completion request."""
+        prompt = "\n".join(message["content"] for message in request["messages"] if message["role"] == "user")
+        parts = SECTION_RE.split(prompt)
+        # Each section runs until the next one or the instructions that follow the last
+        sections = [
+            (name, re.split(r"\n\n(?:### |Determine:|For each subreddit)", section)[0])
+            for name, section in zip(parts[1::2], parts[2::2])
+        ]
+        batched = request.get("response_format", {}).get("type") == "json_schema"
+        if not batched:
+            name, section = sections[0]
+            return json.dumps(analyze(name, section))
+
+        results = []
+        for name, section in sections:
+            entry = {"subreddit": name, **analyze(name, section)}
+            with self._lock:
+                roll = self.random.random()
+            if roll < self.omit_rate / 2:
+                continue
+            if roll < self.omit_rate:
+                entry["sellers_allowed"] = "maybe"
+            results.append(entry)
+        return json.dumps({"results": results})
+
+    def _used(self) -> tuple[int, int]:
+        cutoff = time.monotonic() - self.rate_period
+        while self.window and self.window[0][0] < cutoff:
+            self.window.popleft()
+        return len(self.window), sum(tokens for _, tokens in self.window)
+
+    def admit(self, request: dict):
+        """None if the request fits the limits, else seconds until it would."""
+        if not (self.rpm_limit or self.tpm_limit):
+            return None
+        estimate = sum(tokens(message["content"]) for message in request["messages"])
+        with self._lock:
+            used_requests, used_tokens = self._used()
+            over_requests = self.rpm_limit and used_requests >= self.rpm_limit
+            over_tokens = self.tpm_limit and used_tokens + estimate > self.tpm_limit
+            if not (over_requests or over_tokens):
+                return None
+            self.throttled += 1
+            return max(self.window[0][0] + self.rate_period - time.monotonic(), 0.01)
+
+    def spend(self, total_tokens: int):
+        if self.rpm_limit or self.tpm_limit:
+            with self._lock:
+                self.window.append((time.monotonic(), total_tokens))
+
+    def limit_headers(self) -> dict:
+        if not (self.rpm_limit or self.tpm_limit):
+            return {}
+        with self._lock:
+            used_requests, used_tokens = self._used()
+            reset = max(self.window[0][0] + self.rate_period - time.monotonic(), 0) if self.window else 0
+        headers = {}
+        if self.rpm_limit:
+            headers.update({
+                "x-ratelimit-limit-requests": str(self.rpm_limit),
+                "x-ratelimit-remaining-requests": str(max(self.rpm_limit - used_requests, 0)),
+                "x-ratelimit-reset-requests": f"{reset:.3f}s",
+            })
+        if self.tpm_limit:
+            headers.update({
+                "x-ratelimit-limit-tokens": str(self.tpm_limit),
+                "x-ratelimit-remaining-tokens": str(max(self.tpm_limit - used_tokens, 0)),
+                "x-ratelimit-reset-tokens": f"{reset:.3f}s",
+            })
+        return headers
+
+    def complete(self, request: dict) -> dict:
+        content = self.answer(request)
+        prompt_tokens = sum(tokens(message["content"]) for message in request["messages"])
+        completion_tokens = tokens(content)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        return {
+            "id": f"chatcmpl-stub{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def upload(self, content_type: str, body: bytes) -> dict:
+        """Store the "file" part of a multipart upload."""
+        message = email.parser.BytesParser().parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        part = next(
+            part for part in message.get_payload()
+            if part.get_param("name", header="content-disposition") == "file"
+        )
+        data = part.get_payload(decode=True)
+        with self._lock:
+            file_id = f"file-stub{len(self.files) + 1}"
+            self.files[file_id] = data
+        return {
+            "id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+            "filename": part.get_filename() or "upload.jsonl", "purpose": "batch", "status": "processed",
+        }
+
+    def create_batch(self, request: dict) -> dict:
+        with self._lock:
+            batch_id = f"batch_stub{len(self.batches) + 1}"
+            batch = {
+                "id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+                "input_file_id": request["input_file_id"], "completion_window": request["completion_window"],
+                "status": "validating", "created_at": int(time.time()), "metadata": request.get("metadata"),
+                "output_file_id": None, "error_file_id": None,
+                "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            }
+            self.batches[batch_id] = batch
+        threading.Thread(target=self._run_batch, args=(batch_id,), daemon=True).start()
+        return dict(batch)
+
+    def _run_batch(self, batch_id: str):
+        batch = self.batches[batch_id]
+        lines = [json.loads(line) for line in self.files[batch["input_file_id"]].splitlines() if line.strip()]
+        with self._lock:
+            batch["status"] = "in_progress"
+            batch["request_counts"]["total"] = len(lines)
+        output = []
+        for line in lines:
+            reply = self.complete(line["body"])
+            output.append(json.dumps({
+                "id": f"batch_req_{reply['id']}", "custom_id": line["custom_id"],
+                "response": {"status_code": 200, "request_id": reply["id"], "body": reply}, "error": None,
+            }))
+        time.sleep(self.batch_delay)
+        with self._lock:
+            file_id = f"file-stub{len(self.files) + 1}"
+            self.files[file_id] = ("\n".join(output) + "\n").encode()
+            batch.update(status="completed", output_file_id=file_id, completed_at=int(time.time()))
+            batch["request_counts"]["completed"] = len(lines)
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,61 @@
+"""
+Minimal PostgREST stand-in for benchmarks.
+
+Every request sleeps for a fixed round-trip delay and echoes the posted rows
+back, which is all supabase-py needs for upserts and simple selects.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubPostgrest:
+    """Threaded HTTP server that simulates DB latency."""
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.requests = 0
+        self.methods: dict[str, int] = {}
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, payload):
+                with stub._lock:
+                    stub.requests += 1
+                    stub.methods[self.command] = stub.methods.get(self.command, 0) + 1
+                time.sleep(stub.delay)
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                rows = json.loads(self.rfile.read(length) or b"[]")
+                self._reply(rows if isinstance(rows, list) else [rows])
+
+            def do_GET(self):
+                # Drain any body, or it is parsed as the next request on this connection
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._reply([])
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,76 @@
+"""
+Local HTTPS stub serving a Reddit-sized about.json.
+
+Uses a throwaway self-signed certificate (made with the openssl CLI). Each
+new connection waits `connect_delay` seconds before the TLS handshake, to
+stand in for the TCP + proxy CONNECT round trips a mobile proxy adds.
+"""
+import json
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ABOUT = json.dumps({"kind": "t5", "data": {
+    "display_name": "stub", "over18": True, "subscribers": 123456,
+    "public_description": "x" * 2000,
+}}).encode()
+
+
+class StubTLS:
+    """Threaded HTTPS server. Counts connections and requests."""
+
+    def __init__(self, connect_delay: float = 0.05):
+        self.connect_delay = connect_delay
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._tmp = tempfile.TemporaryDirectory()
+        cert, key = Path(self._tmp.name) / "cert.pem", Path(self._tmp.name) / "key.pem"
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+             "-subj", "/CN=127.0.0.1", "-keyout", str(key), "-out", str(cert)],
+            check=True, capture_output=True,
+        )
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def setup(self):
+                with stub._lock:
+                    stub.connections += 1
+                time.sleep(stub.connect_delay)
+                self.request = context.wrap_socket(self.request, server_side=True)
+                super().setup()
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(ABOUT)))
+                self.end_headers()
+                self.wfile.write(ABOUT)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"https://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp.cleanup()
@@ -56,6 +56,16 @@ PROXYEMPIRE_ROTATION_URL = f"https://panel.proxyempire.io/dedicated-mobile/{PROX
 CRAWLER_PROXY = PROXYEMPIRE_URL
 CRAWLER_ROTATION_URL = PROXYEMPIRE_ROTATION_URL
 
+# Proxy pool for Reddit HTTP requests (crawler, LLM analyzer, intel ban check/HTTP backend)
+# ProxyEmpire is always in it. Optional extras:
+#   PROXIDIZE_PROXY_URL - the Proxidize modem as an HTTP proxy (rotated via PROXIDIZE_ROTATION_URL;
+#                         shares its IP with the AdsPower profiles that use it)
+#   EXTRA_PROXIES       - comma-separated "proxy_url|rotation_url" entries (rotation_url optional)
+PROXIDIZE_PROXY_URL = os.getenv("PROXIDIZE_PROXY_URL")
+EXTRA_PROXIES = [entry.strip() for entry in os.getenv("EXTRA_PROXIES", "").split(",") if entry.strip()]
+PROXY_ROTATION_COOLDOWN = 30  # Min seconds between IP rotations of the same proxy
+PROXY_ROTATION_SETTLE_SECONDS = 5  # Proxy is kept out of rotation this long while its new IP comes up
+
 # =============================================================================
 # OPENAI CONFIGURATION
 # =============================================================================
@@ -63,16 +73,58 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY must be set in .env file")
 
+# =============================================================================
+# DATABASE SETTINGS
+# =============================================================================
+DB_MAX_WORKERS = 16  # Thread pool size for concurrent Supabase requests
+INTEL_WRITE_BATCH_SIZE = 200  # Flush buffered intel writes at this many rows...
+INTEL_WRITE_FLUSH_SECONDS = 2.0  # ...or after this many seconds
+INTEL_WRITE_MAX_ATTEMPTS = 3  # Drop an intel row the DB rejected (bad value, constraint) this many times
+INTEL_INDEX_REFRESH_SECONDS = 30  # Fallback candidate index: min seconds between incremental syncs
+
+# =============================================================================
+# LOCAL CACHE
+# =============================================================================
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")  # Local snapshots that make restarts incremental
+KNOWN_SUBS_SNAPSHOT = os.path.join(CACHE_DIR, "known_subs.bin")  # Crawler's known-subreddit set
+INTEL_INDEX_SNAPSHOT = os.path.join(CACHE_DIR, "intel_index.sqlite3")  # Intel candidate index (queue/intel rows)
+REJECTED_SUBS_SNAPSHOT = os.path.join(CACHE_DIR, "rejected_subs.sqlite3")  # Crawler negative cache (SFW/too small)
+AUTHOR_CACHE_SNAPSHOT = os.path.join(CACHE_DIR, "authors.sqlite3")  # Crawler author expansions and yield
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_results.sqlite3")  # LLM results by input hash (shared by processes)
+
 # =============================================================================
 # WORKER SETTINGS
 # =============================================================================
 
 # Intel Worker (AdsPower)
-INTEL_BATCH_SIZE = 4  # Number of subreddits to fetch per batch (2x browsers for buffer)
+INTEL_BATCH_SIZE = 4  # Local work queue depth kept prefetched from the DB (2x browsers for buffer)
 INTEL_TIMEOUT_SECONDS = 180  # Timeout per subreddit scrape (3 minutes max)
 INTEL_CONCURRENT = 2  # Match number of active browsers
-INTEL_DELAY_BETWEEN_BATCHES = 2  # Seconds between batches
+INTEL_DELAY_BETWEEN_BATCHES = 2  # Seconds between DB refills when nothing new was found
+INTEL_STATS_INTERVAL = 60  # Seconds between STATS log lines
+INTEL_TABS_PER_PROFILE = 2  # Tabs opened per AdsPower browser (each scrapes one sub at a time)
+INTEL_MAX_CONCURRENT_PER_PROFILE = 2  # Cap on simultaneous scrapes per profile (<= tabs)
+INTEL_PROFILE_NAV_SPACING = 1.0  # Min seconds between page loads started on the same profile
+INTEL_BLOCK_RESOURCES = True  # Abort images/media/fonts/third-party requests (disables browser HTTP cache while on)
+INTEL_PRECHECK_AHEAD = True  # Start the ban pre-check when a sub is queued, not when a browser picks it up
 INTEL_RETRY_MAX = 5  # Max retries before marking as failed
+INTEL_LEASE_SECONDS = 600  # Claimed subs stay reserved for this worker this long (renewed while in progress)
+INTEL_WORKER_ID = os.getenv("INTEL_WORKER_ID")  # Unique per process; defaults to hostname-pid
+INTEL_BACKEND = os.getenv("INTEL_BACKEND", "browser")  # "browser", or "http" (plain HTTP first, browser only when blocked)
+INTEL_HTTP_CONCURRENCY = 8  # Simultaneous HTTP scrapes in http mode
+INTEL_HTTP_TIMEOUT_SECONDS = 20  # Timeout per HTTP page fetch
+
+# Reddit HTTP client (shared by crawler, LLM analyzer and intel worker)
+REDDIT_HTTP_MAX_CONNECTIONS = 20  # Keep-alive connections per proxy pool
+REDDIT_HTTP_KEEPALIVE_SECONDS = 30  # Idle pooled connections are closed after this long
+REDDIT_RATE_INITIAL = 4.0  # Starting requests/sec per proxy (adapts from here)
+REDDIT_RATE_MIN = 0.5  # Floor after repeated 429/403 cuts
+REDDIT_RATE_MAX = 20.0  # Ceiling for the additive increase
+REDDIT_RATE_INCREASE = 0.5  # req/s added per second of clean responses
+REDDIT_RATE_DECREASE = 0.5  # Rate multiplier on a 429/403
+REDDIT_RATE_BURST = 2  # Requests allowed back-to-back per proxy
+SUBREDDIT_INFO_BATCH_SIZE = 100  # Names per /api/info.json metadata request
+SUBREDDIT_INFO_WINDOW_SECONDS = 0.2  # How long a lookup waits for others to share its request
 
 # Crawler (JSON endpoints)
 CRAWLER_BATCH_SIZE = 50  # Subreddits to process per batch
@@ -80,12 +132,35 @@ CRAWLER_TIMEOUT_SECONDS = 15  # Timeout per request
 CRAWLER_RETRY_MAX = 5  # Max retries per endpoint
 CRAWLER_MIN_SUBSCRIBERS = 5000  # Minimum subscribers to crawl
 CRAWLER_DELAY_BETWEEN_BATCHES = 1  # Seconds between batches
+CRAWLER_WORKERS = 8  # Async discovery workers pulling from the crawl frontier
+CRAWLER_AUTHORS_PER_SUB = 5  # Authors sampled from each seed subreddit's new posts
+CRAWLER_REJECTED_SFW_TTL_DAYS = 30  # Re-check a sub rejected as SFW after this long
+CRAWLER_REJECTED_SMALL_TTL_DAYS = 7  # Re-check a sub rejected as too small after this long
+CRAWLER_AUTHOR_RECHECK_HOURS = 24  # Don't re-fetch an author's post history within this window
 
 # LLM Analyzer
-LLM_BATCH_SIZE = 10  # Subreddits to analyze per batch
-LLM_INTERVAL_SECONDS = 600  # Run every 10 minutes
-LLM_MAX_CONCURRENT = 5  # Concurrent LLM requests
+LLM_BATCH_SIZE = 10  # Min subs fetched per refill of the local analysis queue
+LLM_MAX_CONCURRENT = 20  # Cap on concurrent LLM requests (the OpenAI rate limits usually bind first)
+LLM_RATE_HEADROOM = 0.9  # Use this fraction of the account's requests/tokens per minute
+LLM_IDLE_SECONDS = 60  # Backlog empty: check again after this long
+LLM_REQUEUE_SECONDS = 600  # A sub handed to the LLM isn't queued again for this long (writes are buffered)
+LLM_BACKLOG_REFRESH_SECONDS = 60  # How often the backlog size is counted in the DB
+LLM_STATS_INTERVAL = 300  # Seconds between LLM STATS log blocks
 LLM_RETRY_MAX = 3  # Max retries for LLM calls
+LLM_SUBS_PER_PROMPT = 5  # Subreddits packed into one chat completion (1 = one request per sub)
+LLM_RULE_CLASSIFIER = False  # Decide subs with explicit verification/seller rules locally (rule_classifier.py); enable after eval_rule_classifier.py
+LLM_PRICE_INPUT_PER_M = 0.15  # USD per 1M prompt tokens (gpt-4o-mini)
+LLM_PRICE_OUTPUT_PER_M = 0.60  # USD per 1M completion tokens (gpt-4o-mini)
+
+# LLM bulk backfill (llm_backfill.py, OpenAI Batch API)
+LLM_BACKFILL_DIR = os.path.join(CACHE_DIR, "llm_backfill")  # Request files, manifests and batch ids
+LLM_BACKFILL_PAGE_SIZE = 1000  # Rows per DB page when exporting the backlog
+LLM_BACKFILL_FETCH_CONCURRENCY = 20  # Subs whose rules are fetched from Reddit at once during export
+LLM_BACKFILL_MAX_REQUESTS = 50000  # Request lines per batch file (Batch API limit)
+LLM_BACKFILL_MAX_BYTES = 150_000_000  # Bytes per batch file (Batch API limit is 200 MB)
+LLM_BACKFILL_POLL_SECONDS = 60  # Seconds between batch status checks
+LLM_BACKFILL_CLAIM_SECONDS = 26 * 3600  # Submitted subs are hidden from the online loop this long (24h window + import)
+LLM_BATCH_PRICE_FACTOR = 0.5  # Batch API price relative to synchronous requests
 
 # =============================================================================
 # LOGGING CONFIGURATION
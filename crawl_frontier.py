@@ -0,0 +1,68 @@
+"""
+Crawl frontier for subreddit discovery.
+
+Discovery walks subreddit -> recent posts -> authors -> their post history ->
+subreddits they posted in -> about.json. Each hop is a typed work item in one
+priority queue, consumed by a pool of async workers:
+
+  subreddit_about   finish a candidate (about.json -> queue)   highest priority
+  user_history      an author's submitted.json -> candidates
+  subreddit_posts   a seed sub's new.json -> authors            lowest priority
+
+Finishing what is already in flight before expanding keeps the frontier
+bounded and turns requests into discovered subs as early as possible.
+"""
+import asyncio
+import itertools
+
+SUBREDDIT_ABOUT = "subreddit_about"
+USER_HISTORY = "user_history"
+SUBREDDIT_POSTS = "subreddit_posts"
+
+PRIORITIES = {SUBREDDIT_ABOUT: 0, USER_HISTORY: 1, SUBREDDIT_POSTS: 2}
+
+
+class CrawlFrontier:
+    """
+    Priority queue of (kind, name) items. Authors and candidate subs are
+    scheduled at most once per session; seed subs once per round.
+    """
+
+    def __init__(self, max_seen: int = 500_000):
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.seen: set[tuple[str, str]] = set()
+        self.max_seen = max_seen
+        self.counter = itertools.count()  # FIFO within a priority
+        self.pushed = {kind: 0 for kind in PRIORITIES}
+        self.completed = {kind: 0 for kind in PRIORITIES}
+
+    def push(self, kind: str, name: str) -> bool:
+        """Schedule an item. Returns False if it was already scheduled."""
+        key = (kind, name.lower())
+        if key in self.seen:
+            return False
+        if len(self.seen) >= self.max_seen:
+            # Long sessions: forget history rather than grow forever
+            self.seen.clear()
+        self.seen.add(key)
+        self.queue.put_nowait((PRIORITIES[kind], next(self.counter), kind, key[1]))
+        self.pushed[kind] += 1
+        return True
+
+    async def get(self) -> tuple[str, str]:
+        _, _, kind, name = await self.queue.get()
+        return kind, name
+
+    def done(self, kind: str, name: str):
+        self.completed[kind] += 1
+        if kind == SUBREDDIT_POSTS:
+            # Seeds get new posts over time - they can be crawled again next round
+            self.seen.discard((kind, name))
+        self.queue.task_done()
+
+    async def join(self):
+        """Wait until every scheduled item (including ones they spawn) is done."""
+        await self.queue.join()
+
+    def pending(self) -> int:
+        return self.queue.qsize()
@@ -3,28 +3,44 @@
 Crawler + LLM Worker
 Script 2: Discovers new subreddits via JSON endpoints + enriches with LLM analysis.
 Uses SOAX proxies with aggressive retry logic.
+Discovery runs as a crawl frontier (see crawl_frontier.py) drained by a pool
+of async workers under a shared rate limit.
 """
 import asyncio
 import logging
 import sys
 import httpx
 from datetime import datetime, timezone
-from typing import Optional, List, Set
+from typing import Optional, List
 
 from supabase_client import SupabaseClient
-from llm_analyzer import SubredditLLMAnalyzer
-from user_agents import get_random_user_agent, get_reddit_headers, get_reddit_cookies
+from crawl_frontier import CrawlFrontier, SUBREDDIT_ABOUT, USER_HISTORY, SUBREDDIT_POSTS
+from author_cache import AuthorCache
+from known_subs import KnownSubreddits
+from rejected_subs import RejectedSubreddits, SFW, TOO_SMALL
+from subreddit_info import SubredditInfoBatcher
+from llm_analyzer import SubredditLLMAnalyzer, token_cost
+from llm_scheduler import LLMScheduler
+from proxy_pool import proxy_pool
+from reddit_http import reddit_http
+from user_agents import get_random_user_agent
 from config import (
-    CRAWLER_PROXY,
-    CRAWLER_ROTATION_URL,
     CRAWLER_BATCH_SIZE,
     CRAWLER_TIMEOUT_SECONDS,
     CRAWLER_RETRY_MAX,
     CRAWLER_MIN_SUBSCRIBERS,
-    CRAWLER_DELAY_BETWEEN_BATCHES,
+    CRAWLER_WORKERS,
+    CRAWLER_AUTHORS_PER_SUB,
+    CRAWLER_REJECTED_SFW_TTL_DAYS,
+    CRAWLER_REJECTED_SMALL_TTL_DAYS,
+    CRAWLER_AUTHOR_RECHECK_HOURS,
+    AUTHOR_CACHE_SNAPSHOT,
+    KNOWN_SUBS_SNAPSHOT,
+    REJECTED_SUBS_SNAPSHOT,
     LLM_BATCH_SIZE,
-    LLM_INTERVAL_SECONDS,
     LLM_MAX_CONCURRENT,
+    LLM_SUBS_PER_PROMPT,
+    LLM_STATS_INTERVAL,
     LOG_LEVEL,
     LOG_FORMAT,
 )
@@ -44,33 +60,54 @@ logger = logging.getLogger(__name__)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 
+REDDIT_BASE_URL = "https://www.reddit.com"
+
 
 class CrawlerLLM:
     """
     Combined crawler and LLM worker.
     
     Task 1: Discover new subreddits via JSON API (continuous)
-    Task 2: Enrich subreddits with LLM analysis (periodic)
+    Task 2: Enrich subreddits with LLM analysis (continuous, paced by the OpenAI limits)
     """
     
     def __init__(self):
         self.supabase = SupabaseClient()
-        self.llm_analyzer = SubredditLLMAnalyzer(reddit_proxy=CRAWLER_PROXY)
+        self.llm_analyzer = SubredditLLMAnalyzer()
+        self.llm_scheduler = LLMScheduler(
+            self.supabase, self.safe_llm_analyze_batch, self.llm_analyzer.rate_limits, prepare=self.prepare_llm_rows
+        )
         
-        # ProxyEmpire mobile proxy
-        self.proxy = CRAWLER_PROXY
-        self.rotation_url = CRAWLER_ROTATION_URL
-        self.rotation_count = 0
+        # Mobile proxies (ProxyEmpire + any extras), routed and rotated by the pool
+        self.proxy_pool = proxy_pool
         
         # Tracking (session-only - will reload existing from DB on first run)
-        self.existing_subs: Set[str] = set()
+        self.existing_subs = KnownSubreddits(KNOWN_SUBS_SNAPSHOT)
         self.existing_subs_loaded = False
         
+        # Subs about.json rejected (SFW / too small) - skipped until their TTL runs out
+        self.rejected_subs = RejectedSubreddits(REJECTED_SUBS_SNAPSHOT, ttls={
+            SFW: CRAWLER_REJECTED_SFW_TTL_DAYS * 86400,
+            TOO_SMALL: CRAWLER_REJECTED_SMALL_TTL_DAYS * 86400,
+        })
+        
+        # Authors already expanded and how many new subs each led to
+        self.authors = AuthorCache(AUTHOR_CACHE_SNAPSHOT, CRAWLER_AUTHOR_RECHECK_HOURS * 3600)
+        self.candidate_sources: dict[str, str] = {}  # candidate sub -> author it came from
+        
+        # Discovery frontier (request rate is paced per proxy by reddit_http)
+        self.frontier = CrawlFrontier()
+        
+        # Candidate metadata, many subs per /api/info.json request
+        self.subreddit_info = SubredditInfoBatcher(REDDIT_BASE_URL, fetch_json=self.fetch_with_retry)
+        self.candidate_tasks = set()
+        
         # Stats
         self.crawler_stats = {
             "discovered": 0,
             "updated": 0,
             "failed": 0,
+            "requests": 0,
             "start_time": datetime.now(timezone.utc),
         }
         
@@ -79,65 +116,41 @@ class CrawlerLLM:
             "failed": 0,
         }
     
-    async def rotate_proxy(self):
-        """Rotate ProxyEmpire IP."""
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(self.rotation_url)
-                if response.status_code == 200:
-                    self.rotation_count += 1
-                    logger.info(f"🔄 ProxyEmpire IP rotated (rotation #{self.rotation_count})")
-                else:
-                    logger.warning(f"Failed to rotate IP: HTTP {response.status_code}")
-        except Exception as e:
-            logger.warning(f"Error rotating IP: {e}")
-    
     async def fetch_with_retry(self, url: str, max_retries: int = None) -> Optional[dict]:
         """
-        Fetch URL with aggressive retry logic and proxy rotation.
+        Fetch URL with aggressive retry logic.
         Non-blocking - returns None after max retries.
-        Uses rotating user agents and realistic browser headers.
+        Each attempt goes to the healthiest proxy; blocked/failed proxies are
+        rotated by the pool (at most once per cooldown) while others carry on.
         """
         max_retries = max_retries or CRAWLER_RETRY_MAX
         
         for attempt in range(max_retries):
             try:
-                # Get fresh user agent and headers for each attempt
-                headers = get_reddit_headers()
-                cookies = get_reddit_cookies()
+                self.crawler_stats["requests"] += 1
+                proxy, response = await self.proxy_pool.get_url(url, timeout=CRAWLER_TIMEOUT_SECONDS)
+                ua_short = response.request.headers.get("User-Agent", "")[:40]
                 
-                async with httpx.AsyncClient(
-                    proxy=self.proxy,
-                    timeout=CRAWLER_TIMEOUT_SECONDS,
-                    verify=False,
-                    follow_redirects=True,
-                    cookies=cookies
-                ) as client:
-                    response = await client.get(url, headers=headers)
-                    
-                    if response.status_code == 200:
-                        return response.json()
-                    
-                    elif response.status_code in [403, 429]:
-                        ua_short = headers['User-Agent'][:40]
-                        logger.warning(f"HTTP {response.status_code} (attempt {attempt+1}/{max_retries}) - UA: {ua_short}... - rotating IP & user agent")
-                        await self.rotate_proxy()
-                        await asyncio.sleep(5)  # Wait for IP to change
-                    
-                    elif response.status_code == 404:
-                        ua_short = headers['User-Agent'][:40]
-                        logger.warning(f"HTTP 404 (attempt {attempt+1}/{max_retries}) - UA: {ua_short}... - likely bot detection, rotating")
-                        await self.rotate_proxy()
-                        await asyncio.sleep(3)
+                if response.status_code == 200:
+                    return response.json()
+                
+                elif response.status_code == 429:
+                    # The proxy's limiter already cut its rate - just retry at the slower pace
+                    logger.warning(f"HTTP 429 (attempt {attempt+1}/{max_retries}) - {proxy.name} slowing to {reddit_http.rate(proxy.url):.2f} req/s")
+                
+                elif response.status_code == 403:
+                    logger.warning(f"HTTP 403 (attempt {attempt+1}/{max_retries}) - UA: {ua_short}... - rotating {proxy.name} IP & user agent")
+                
+                elif response.status_code == 404:
+                    logger.warning(f"HTTP 404 (attempt {attempt+1}/{max_retries}) - UA: {ua_short}... - likely bot detection, rotating {proxy.name}")
+                    self.proxy_pool.rotate(proxy, "HTTP 404")
+                
+                else:
+                    logger.warning(f"HTTP {response.status_code} for {url}")
+                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
                     
-                    else:
-                        logger.warning(f"HTTP {response.status_code} for {url}")
-                        await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                        
             except httpx.TimeoutException:
                 logger.warning(f"Timeout (attempt {attempt+1}/{max_retries}) - rotating IP")
-                await self.rotate_proxy()
-                await asyncio.sleep(3)
                 
             except Exception as e:
                 logger.warning(f"Error (attempt {attempt+1}/{max_retries}): {e}")
@@ -149,25 +162,24 @@ class CrawlerLLM:
     
     async def discover_subreddit_info(self, subreddit_name: str) -> Optional[dict]:
         """
-        Fetch subreddit info from /about.json endpoint.
+        Fetch subreddit info (batched /api/info.json lookup).
         Returns basic info to add to queue.
         """
-        url = f"https://www.reddit.com/r/{subreddit_name}/about.json"
-        
-        data = await self.fetch_with_retry(url)
-        if not data:
+        sub_data = await self.subreddit_info.get(subreddit_name)
+        if not sub_data:
             return None
         
         try:
-            sub_data = data.get("data", {})
+            subscribers = sub_data.get("subscribers", 0)
             
             # Skip if not NSFW
             if not sub_data.get("over18", False):
+                self.rejected_subs.add(subreddit_name, SFW, subscribers)
                 return None
             
             # Skip if too small
-            subscribers = sub_data.get("subscribers", 0)
             if subscribers < CRAWLER_MIN_SUBSCRIBERS:
+                self.rejected_subs.add(subreddit_name, TOO_SMALL, subscribers)
                 return None
             
             return {
@@ -185,7 +197,7 @@ class CrawlerLLM:
         Discover subreddits from a user's post history.
         Returns list of unique subreddit names.
         """
-        url = f"https://www.reddit.com/user/{username}/submitted.json?limit=100"
+        url = f"{REDDIT_BASE_URL}/user/{username}/submitted.json?limit=100"
         
         data = await self.fetch_with_retry(url)
         if not data:
@@ -210,209 +222,238 @@ class CrawlerLLM:
             return []
     
     async def load_existing_subs(self):
-        """Load all existing subreddit names from DB into memory cache."""
+        """Load known subreddit names: local snapshot + rows added since."""
         try:
-            logger.info("Loading existing subreddits from database...")
-            
-            all_subs = []
-            offset = 0
-            page_size = 1000
-            
-            while True:
-                result = self.supabase.client.table("subreddit_queue").select(
-                    "subreddit_name"
-                ).range(offset, offset + page_size - 1).execute()
-                
-                if not result.data or len(result.data) == 0:
-                    break
-                
-                all_subs.extend([row["subreddit_name"].lower() for row in result.data])
-                
-                if len(result.data) < page_size:
-                    break
-                
-                offset += page_size
-            
-            self.existing_subs = set(all_subs)
+            logger.info("Loading existing subreddits...")
+            await self.existing_subs.load_and_sync(self.supabase)
+            await asyncio.to_thread(self.rejected_subs.load)
+            await asyncio.to_thread(self.authors.load)
             self.existing_subs_loaded = True
-            logger.info(f"Loaded {len(self.existing_subs):,} existing subreddits from database")
             
         except Exception as e:
             logger.error(f"Error loading existing subs: {e}")
-            self.existing_subs = set()
     
     async def discover_subreddits(self):
         """
         Main discovery loop - continuously finds new subreddits.
+        Seeds the frontier from the queue, lets the workers drain it, repeats.
         """
-        logger.info("Starting subreddit discovery...")
+        logger.info(f"Starting subreddit discovery ({CRAWLER_WORKERS} workers)...")
         
         # Load existing subs on first run
         if not self.existing_subs_loaded:
             await self.load_existing_subs()
         
-        while True:
-            try:
-                # Get some existing subreddits from queue to bootstrap discovery
-                existing = await self.supabase.get_pending_intel_scrapes(limit=10)
-                
-                if not existing:
-                    logger.info("No subreddits to bootstrap from. Waiting 60s...")
-                    await asyncio.sleep(60)
-                    continue
-                
-                for sub in existing:
-                    subreddit_name = sub["subreddit_name"]
-                    
-                    # Get recent posts from this subreddit
-                    posts_url = f"https://www.reddit.com/r/{subreddit_name}/new.json?limit=25"
-                    posts_data = await self.fetch_with_retry(posts_url)
+        workers = [asyncio.create_task(self.discovery_worker()) for _ in range(CRAWLER_WORKERS)]
+        
+        try:
+            while True:
+                try:
+                    # Get some existing subreddits from queue to bootstrap discovery
+                    existing = await self.supabase.get_pending_intel_scrapes(limit=10)
                     
-                    if not posts_data:
+                    if not existing:
+                        logger.info("No subreddits to bootstrap from. Waiting 60s...")
+                        await asyncio.sleep(60)
                         continue
                     
-                    # Extract unique authors
-                    posts = posts_data.get("data", {}).get("children", [])
-                    authors = set()
+                    for sub in existing:
+                        self.frontier.push(SUBREDDIT_POSTS, sub["subreddit_name"])
                     
-                    for post in posts:
-                        author = post.get("data", {}).get("author")
-                        if author and author != "[deleted]":
-                            authors.add(author)
+                    # Everything the seeds lead to - authors, their subs - is crawled before reseeding
+                    await self.frontier.join()
                     
-                    logger.info(f"Found {len(authors)} authors in r/{subreddit_name}")
-                    
-                    # Discover subreddits from each author
-                    for author in list(authors)[:5]:  # Sample 5 authors
-                        discovered_subs = await self.discover_from_user(author)
-                        
-                        for new_sub in discovered_subs:
-                            # Skip if already in DB
-                            if new_sub in self.existing_subs:
-                                continue
-                            
-                            # Fetch subreddit info
-                            sub_info = await self.discover_subreddit_info(new_sub)
-                            
-                            if sub_info:
-                                # Check one more time in case it was just added
-                                is_new = new_sub not in self.existing_subs
-                                
-                                # Add to queue (upsert)
-                                success = await self.supabase.add_subreddit_to_queue(
-                                    sub_info["subreddit_name"],
-                                    sub_info["subscribers"]
-                                )
-                                
-                                if success:
-                                    self.existing_subs.add(new_sub)
-                                    
-                                    if is_new:
-                                        self.crawler_stats["discovered"] += 1
-                                        logger.info(
-                                            f"✓ Discovered r/{new_sub} "
-                                            f"({sub_info['subscribers']:,} subscribers)"
-                                        )
-                                    else:
-                                        self.crawler_stats["updated"] += 1
-                                        logger.debug(
-                                            f"↻ Updated r/{new_sub} "
-                                            f"({sub_info['subscribers']:,} subscribers)"
-                                        )
-                            
-                            # Small delay to avoid rate limits
-                            await asyncio.sleep(0.5)
-                    
-                    # Delay between subreddits
-                    await asyncio.sleep(CRAWLER_DELAY_BETWEEN_BATCHES)
-                
-                # Log stats periodically
-                if self.crawler_stats["discovered"] % 10 == 0:
+                    # Pick up subs other workers added, and persist our own
+                    await self.existing_subs.sync(self.supabase)
+                    await asyncio.to_thread(self.rejected_subs.save)
+                    await asyncio.to_thread(self.authors.save)
                     self.log_crawler_stats()
-                
-            except Exception as e:
-                logger.error(f"Error in discovery loop: {e}")
-                await asyncio.sleep(60)
+                    
+                except Exception as e:
+                    logger.error(f"Error in discovery loop: {e}")
+                    await asyncio.sleep(60)
+        finally:
+            for task in workers + list(self.candidate_tasks):
+                task.cancel()
+            self.subreddit_info.close()
+    
+    async def discovery_worker(self):
+        """Pull the next frontier item and expand it. Never exits on errors."""
+        while True:
+            kind, name = await self.frontier.get()
+            if kind == SUBREDDIT_ABOUT:
+                # Candidates are looked up in batches - hand off and keep pulling so the batch fills
+                task = asyncio.create_task(self.process_item(kind, name))
+                self.candidate_tasks.add(task)
+                task.add_done_callback(self.candidate_tasks.discard)
+            else:
+                await self.process_item(kind, name)
+    
+    async def process_item(self, kind: str, name: str):
+        """Run one frontier item and mark it done."""
+        try:
+            if kind == SUBREDDIT_POSTS:
+                await self.expand_subreddit(name)
+            elif kind == USER_HISTORY:
+                await self.expand_user(name)
+            else:
+                await self.check_candidate(name)
+        except Exception as e:
+            logger.error(f"Error on {kind} {name}: {e}")
+        finally:
+            self.frontier.done(kind, name)
+    
+    async def expand_subreddit(self, subreddit_name: str):
+        """Seed sub -> authors of its recent posts."""
+        posts_url = f"{REDDIT_BASE_URL}/r/{subreddit_name}/new.json?limit=25"
+        posts_data = await self.fetch_with_retry(posts_url)
+        
+        if not posts_data:
+            return
+        
+        # Extract unique authors
+        posts = posts_data.get("data", {}).get("children", [])
+        authors = set()
+        
+        for post in posts:
+            author = post.get("data", {}).get("author")
+            if author and author != "[deleted]":
+                authors.add(author)
+        
+        logger.info(f"Found {len(authors)} authors in r/{subreddit_name}")
+        
+        # Expand a few authors: best yield first, skipping recently expanded/already scheduled ones
+        scheduled = 0
+        for author in self.authors.rank(authors):
+            if scheduled >= CRAWLER_AUTHORS_PER_SUB:
+                break
+            if self.frontier.push(USER_HISTORY, author):
+                scheduled += 1
+    
+    async def expand_user(self, username: str):
+        """Author -> NSFW subs they post in that we don't have yet."""
+        self.authors.expanded(username)
+        for new_sub in await self.discover_from_user(username):
+            # Skip if already in DB, or rejected recently
+            if new_sub not in self.existing_subs and not self.rejected_subs.get(new_sub):
+                if self.frontier.push(SUBREDDIT_ABOUT, new_sub):
+                    self.candidate_sources[new_sub] = username
+    
+    async def check_candidate(self, new_sub: str):
+        """Candidate sub -> metadata -> queue if NSFW and big enough."""
+        source = self.candidate_sources.pop(new_sub, None)
+        if new_sub in self.existing_subs:
+            return
+        
+        sub_info = await self.discover_subreddit_info(new_sub)
+        if not sub_info:
+            return
+        
+        # Check one more time in case it was just added
+        is_new = new_sub not in self.existing_subs
+        
+        # Add to queue (upsert)
+        success = await self.supabase.add_subreddit_to_queue(
+            sub_info["subreddit_name"],
+            sub_info["subscribers"]
+        )
+        
+        if success:
+            self.existing_subs.add(new_sub)
+            
+            if is_new:
+                self.crawler_stats["discovered"] += 1
+                if source:
+                    self.authors.credit(source)
+                logger.info(
+                    f"✓ Discovered r/{new_sub} "
+                    f"({sub_info['subscribers']:,} subscribers)"
+                )
+            else:
+                self.crawler_stats["updated"] += 1
+                logger.debug(
+                    f"↻ Updated r/{new_sub} "
+                    f"({sub_info['subscribers']:,} subscribers)"
+                )
     
     async def run_llm_analysis(self):
         """
-        Periodic LLM analysis loop.
-        Runs every LLM_INTERVAL_SECONDS to enrich subreddits.
+        Continuous LLM analysis loop.
+        The scheduler keeps requests going while there is a backlog, as fast
+        as the OpenAI rate limits allow (see llm_scheduler.py).
         """
         logger.info("Starting LLM analysis loop...")
+        stats_task = asyncio.create_task(self.llm_stats_loop())
         
+        try:
+            await self.llm_scheduler.run()
+        finally:
+            stats_task.cancel()
+            self.llm_scheduler.close()
+    
+    async def llm_stats_loop(self):
+        """Log LLM stats every LLM_STATS_INTERVAL seconds."""
         while True:
-            try:
-                await asyncio.sleep(LLM_INTERVAL_SECONDS)
-                
-                # Get subreddits missing LLM data
-                missing_llm = await self.supabase.get_subs_missing_llm(limit=LLM_BATCH_SIZE)
-                
-                if not missing_llm:
-                    logger.info("No subreddits need LLM analysis")
-                    continue
-                
-                logger.info(f"\n{'='*80}")
-                logger.info(f"Running LLM analysis on {len(missing_llm)} subreddits")
-                logger.info(f"{'='*80}")
-                
-                # Process in smaller concurrent batches
-                semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENT)
-                
-                async def analyze_one(sub_data):
-                    async with semaphore:
-                        await self.safe_llm_analyze(sub_data)
-                
-                tasks = [analyze_one(sub) for sub in missing_llm]
-                await asyncio.gather(*tasks)
-                
-                self.log_llm_stats()
-                
-            except Exception as e:
-                logger.error(f"Error in LLM analysis loop: {e}")
-                await asyncio.sleep(60)
+            await asyncio.sleep(LLM_STATS_INTERVAL)
+            self.log_llm_stats()
     
-    async def safe_llm_analyze(self, sub_data: dict):
+    async def prepare_llm_rows(self, rows: list[dict]) -> list[dict]:
+        """
+        Fetch rules for subs about to be queued and store what the result
+        cache and the rule classifier can answer.
+        Returns the subs that need the model (with their rules).
+        Non-blocking - on errors the rows stay in the backlog for later.
         """
-        Analyze a subreddit with LLM with error handling.
+        try:
+            local, uncached = await self.llm_analyzer.prepare([
+                {
+                    "subreddit_name": row["subreddit_name"],
+                    "description": row.get("description", ""),
+                    "subscribers": row.get("subscribers", 0),
+                }
+                for row in rows
+            ])
+            
+            for subreddit_name, result in local.items():
+                await self.save_llm_result(subreddit_name, result)
+            return uncached
+            
+        except Exception as e:
+            logger.error(f"Error preparing {len(rows)} subreddits for LLM analysis: {e}")
+            return []
+    
+    async def safe_llm_analyze_batch(self, group: list[dict]):
+        """
+        Analyze prepared subreddits with one LLM request (one sub when
+        LLM_SUBS_PER_PROMPT is 1).
         Non-blocking - always returns.
         """
-        subreddit_name = sub_data["subreddit_name"]
-        
         try:
-            logger.info(f"Analyzing r/{subreddit_name}...")
+            logger.info(f"Analyzing {', '.join('r/' + sub['subreddit_name'] for sub in group)}...")
             
-            result = await self.llm_analyzer.analyze_subreddit(
-                subreddit_name=subreddit_name,
-                description=sub_data.get("description", ""),
-                subscribers=sub_data.get("subscribers", 0),
-            )
+            results = await self.llm_analyzer.analyze_prepared(group)
             
-            if result:
-                # Update database with LLM results
-                update_data = {
-                    "subreddit_name": subreddit_name,
-                    "verification_required": result.get("verification_required"),
-                    "sellers_allowed": result.get("sellers_allowed"),
-                    "niche_categories": result.get("niche_categories"),
-                    "llm_analysis_confidence": result.get("confidence"),
-                    "llm_analysis_reasoning": result.get("reasoning"),
-                }
-                
-                await self.supabase.upsert_subreddit_intel(update_data)
-                self.llm_stats["analyzed"] += 1
-                
-                logger.info(
-                    f"✓ r/{subreddit_name}: "
-                    f"verification={result.get('verification_required')}, "
-                    f"sellers={result.get('sellers_allowed')}"
-                )
-            else:
-                logger.warning(f"LLM analysis returned no result for r/{subreddit_name}")
-                self.llm_stats["failed"] += 1
+            for sub in group:
+                await self.save_llm_result(sub["subreddit_name"], results.get(sub["subreddit_name"]))
                 
         except Exception as e:
-            logger.error(f"Error analyzing r/{subreddit_name}: {e}")
+            logger.error(f"Error analyzing batch of {len(group)} subreddits: {e}")
+            self.llm_stats["failed"] += len(group)
+    
+    async def save_llm_result(self, subreddit_name: str, result: Optional[dict]):
+        """Write one LLM result to the intel table."""
+        if result:
+            # Update database with LLM results (LLM columns only)
+            await self.supabase.update_llm_analysis(subreddit_name, result)
+            self.llm_stats["analyzed"] += 1
+            
+            logger.info(
+                f"✓ r/{subreddit_name}: "
+                f"verification={result.get('verification_required')}, "
+                f"sellers={result.get('sellers_allowed')}"
+            )
+        else:
+            logger.warning(f"LLM analysis returned no result for r/{subreddit_name}")
             self.llm_stats["failed"] += 1
     
     def log_crawler_stats(self):
@@ -420,6 +461,7 @@ class CrawlerLLM:
         runtime = (datetime.now(timezone.utc) - self.crawler_stats["start_time"]).total_seconds()
         hours = runtime / 3600
         rate = self.crawler_stats["discovered"] / hours if hours > 0 else 0
+        request_rate = self.crawler_stats["requests"] / runtime if runtime > 0 else 0
         
         logger.info(f"\n{'='*80}")
         logger.info("CRAWLER STATS")
@@ -427,7 +469,30 @@ class CrawlerLLM:
         logger.info(f"  Updated:    {self.crawler_stats['updated']}")
         logger.info(f"  Failed:     {self.crawler_stats['failed']}")
         logger.info(f"  In DB:      {len(self.existing_subs):,}")
+        logger.info(
+            f"  Rejected:   {len(self.rejected_subs):,} cached, {self.rejected_subs.hit_ratio():.0%} hit ratio, "
+            f"{self.rejected_subs.stats['hits']:,} lookups saved"
+        )
         logger.info(f"  Rate:       {rate:.1f} new/hour")
+        logger.info(
+            f"  Requests:   {self.crawler_stats['requests']:,} ({request_rate:.2f} req/s, "
+            f"{self.crawler_stats['discovered'] / max(self.crawler_stats['requests'], 1):.3f} new/request)"
+        )
+        logger.info(
+            f"  Authors:    {len(self.authors):,} known, {self.authors.stats['expanded']:,} expanded, "
+            f"{self.authors.stats['skipped_recent']:,} skipped as recent"
+        )
+        for proxy in self.proxy_pool.proxies:
+            limiter = reddit_http.limiter(proxy.url)
+            logger.info(
+                f"  Proxy:      {proxy.name} - {limiter.rate:.2f} req/s, health {proxy.health:.2f}, "
+                f"{proxy.latency * 1000:.0f}ms, {limiter.stats['throttled']} throttled, {proxy.rotations} rotations"
+            )
+        logger.info(
+            f"  Metadata:   {self.subreddit_info.stats['names']:,} subs in {self.subreddit_info.stats['requests']:,} "
+            f"requests ({self.subreddit_info.names_per_request():.1f} per request)"
+        )
+        logger.info(f"  Frontier:   {self.frontier.pending()} pending")
         logger.info(f"  Runtime:    {hours:.1f}h")
         logger.info(f"{'='*80}\n")
     
@@ -437,6 +502,44 @@ class CrawlerLLM:
         logger.info("LLM STATS")
         logger.info(f"  Analyzed: {self.llm_stats['analyzed']}")
         logger.info(f"  Failed:   {self.llm_stats['failed']}")
+        usage = self.llm_analyzer.usage
+        logger.info(
+            f"  OpenAI:   {usage['requests']} requests for {usage['subreddits']} subs "
+            f"(up to {LLM_SUBS_PER_PROMPT}/request, {usage['retried']} retried), "
+            f"{self.llm_analyzer.tokens_per_subreddit():.0f} tokens/sub"
+        )
+        if self.llm_analyzer.rule_classifier:
+            logger.info(
+                f"  Rules:    {usage['classified']} decided without the model "
+                f"({usage['classified'] / max(usage['subreddits'], 1):.0%} of subs)"
+            )
+        cache = self.llm_analyzer.cache
+        if cache:
+            day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            today = next((row for row in cache.daily(days=1) if row["day"] == day), None)
+            line = f"  Cache:    {cache.stats['hits']} hits, {cache.hit_ratio():.0%} hit ratio"
+            if today:
+                saved = today["prompt_tokens_saved"] + today["completion_tokens_saved"]
+                line += (
+                    f" | today (all workers) {today['hits']}/{today['hits'] + today['misses']} hits, "
+                    f"{saved:,} tokens / "
+                    f"${token_cost(today['prompt_tokens_saved'], today['completion_tokens_saved']):.4f} saved"
+                )
+            logger.info(line)
+        scheduler = self.llm_scheduler.get_stats()
+        backlog = scheduler["backlog"]
+        logger.info(
+            f"  Backlog:  {backlog if backlog is not None else '?'} missing, {scheduler['queued']} queued, "
+            f"{scheduler['in_flight']}/{scheduler['target_in_flight']} requests in flight"
+        )
+        limits = (
+            f"limits {scheduler['limit_requests']:,} RPM / {scheduler['limit_tokens']:,} TPM"
+            if scheduler["limit_requests"] and scheduler["limit_tokens"] else "limits not seen yet"
+        )
+        logger.info(
+            f"  Rate:     {scheduler['rpm']:.0f} RPM / {scheduler['tpm']:,.0f} TPM achieved ({limits}), "
+            f"{scheduler['throttled']} throttled"
+        )
         logger.info(f"{'='*80}\n")
     
     async def run(self):
@@ -445,8 +548,8 @@ class CrawlerLLM:
         logger.info("CRAWLER + LLM WORKER STARTING")
         logger.info(f"  Crawler Batch: {CRAWLER_BATCH_SIZE}")
         logger.info(f"  LLM Batch: {LLM_BATCH_SIZE}")
-        logger.info(f"  LLM Interval: {LLM_INTERVAL_SECONDS}s")
-        logger.info(f"  Proxy: ProxyEmpire Mobile")
+        logger.info(f"  LLM: {LLM_SUBS_PER_PROMPT} subs/request, up to {LLM_MAX_CONCURRENT} in flight")
+        logger.info(f"  Proxies: {', '.join(proxy.name for proxy in self.proxy_pool.proxies)}")
         logger.info("="*80)
         
         # Run both tasks in parallel
@@ -459,6 +562,12 @@ class CrawlerLLM:
             logger.info("\nShutdown requested...")
             discovery_task.cancel()
             llm_task.cancel()
+        finally:
+            # Flush buffered LLM result writes
+            await self.supabase.close()
+            self.rejected_subs.save()
+            self.authors.save()
+            await reddit_http.close()
 
 
 async def main():
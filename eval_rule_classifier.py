@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Evaluate the rule classifier against stored LLM results.
+
+Pages through nsfw_subreddit_intel rows that have a real LLM analysis,
+fetches each sub's current rules from Reddit, runs rule_classifier.classify()
+on them and reports:
+
+  decided     share of subs answered without the model (and the OpenAI
+              requests that saves at LLM_SUBS_PER_PROMPT subs per request)
+  agreement   on verification_required and sellers_allowed, among decided subs
+  examples    the first disagreements, to tune the patterns on
+
+Rules are fetched now, the stored result is from when the sub was analyzed;
+a few disagreements can be rule changes rather than classifier mistakes.
+--save keeps the fetched examples as JSONL so pattern changes can be
+re-evaluated with --file without hitting Reddit again.
+
+Usage:
+    python eval_rule_classifier.py [--limit N] [--save examples.jsonl]
+    python eval_rule_classifier.py --file examples.jsonl
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import sys
+
+from llm_analyzer import SubredditLLMAnalyzer
+from rule_classifier import evaluate
+from supabase_client import SupabaseClient
+from config import LLM_SUBS_PER_PROMPT, LLM_BACKFILL_FETCH_CONCURRENCY, LOG_LEVEL, LOG_FORMAT
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = {
+    "verification_required": "verification_required",
+    "sellers_allowed": "sellers_allowed",
+    "niche_categories": "niche_categories",
+    "llm_analysis_confidence": "confidence",
+    "llm_analysis_reasoning": "reasoning",
+}
+
+
+async def fetch_examples(limit: int) -> list[dict]:
+    """Stored LLM results plus the subs' current rules."""
+    supabase = SupabaseClient()
+    analyzer = SubredditLLMAnalyzer()
+    examples = []
+    try:
+        offset = 0
+        while offset < limit:
+            rows = await supabase.get_llm_analyzed_subs(limit=min(500, limit - offset), offset=offset)
+            if not rows:
+                break
+            offset += len(rows)
+            for start in range(0, len(rows), LLM_BACKFILL_FETCH_CONCURRENCY):
+                chunk = rows[start:start + LLM_BACKFILL_FETCH_CONCURRENCY]
+                infos = await asyncio.gather(*(
+                    analyzer._fetch_subreddit_info(row["subreddit_name"]) for row in chunk
+                ))
+                for row, info in zip(chunk, infos):
+                    examples.append({
+                        "subreddit_name": row["subreddit_name"],
+                        "description": row.get("description") or info.get("description", ""),
+                        "rules": info.get("rules", []),
+                        "result": {key: row.get(column) for column, key in RESULT_COLUMNS.items()},
+                    })
+            logger.info(f"Fetched rules for {len(examples):,} subs")
+    finally:
+        await supabase.close()
+    return examples
+
+
+def log_report(report: dict):
+    total, decided = report["total"], report["decided"]
+    requests_before = math.ceil(total / LLM_SUBS_PER_PROMPT)
+    requests_after = math.ceil((total - decided) / LLM_SUBS_PER_PROMPT)
+    logger.info(f"\n{'='*80}")
+    logger.info("RULE CLASSIFIER vs STORED LLM RESULTS")
+    logger.info(f"  Subs:          {total:,}")
+    logger.info(
+        f"  Decided:       {decided:,} ({decided / max(total, 1):.1%}) - OpenAI requests "
+        f"{requests_before:,} -> {requests_after:,} at {LLM_SUBS_PER_PROMPT} subs/request"
+    )
+    for label, key in (("Verification:", "verification_agree"), ("Sellers:", "sellers_agree"), ("Both:", "both_agree")):
+        logger.info(f"  {label:<14} {report[key]:,}/{decided:,} agree ({report[key] / max(decided, 1):.1%})")
+    for case in report["disagreements"]:
+        logger.info(f"  ✗ r/{case['subreddit_name']}: rules {case['local']} vs LLM {case['llm']}")
+        logger.info(f"      {case['reasoning']}")
+    logger.info(f"{'='*80}\n")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare the rule classifier with stored LLM results")
+    parser.add_argument("--limit", type=int, default=1000, help="Evaluate at most this many subs from the DB")
+    parser.add_argument("--save", help="Write the fetched examples to this JSONL file")
+    parser.add_argument("--file", help="Evaluate examples from a JSONL file instead of the DB")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL), format=LOG_FORMAT, handlers=[logging.StreamHandler(sys.stdout)])
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("llm_analyzer").setLevel(logging.WARNING)
+
+    if args.file:
+        with open(args.file) as f:
+            examples = [json.loads(line) for line in f if line.strip()]
+    else:
+        examples = await fetch_examples(args.limit)
+        if args.save:
+            with open(args.save, "w") as f:
+                for example in examples:
+                    f.write(json.dumps(example) + "\n")
+
+    log_report(evaluate(examples))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
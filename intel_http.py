@@ -0,0 +1,72 @@
+"""
+Browserless intel scraping.
+Fetches subreddit pages through the shared Reddit HTTP pool and parses the weekly
+stats out of the raw HTML. Anything inconclusive (blocks, rate limits,
+stats that only render with JS) is left for the AdsPower browsers.
+"""
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict
+
+from intel_parser import http_result
+from proxy_pool import ProxyPool, proxy_pool
+from config import INTEL_HTTP_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class IntelHTTPScraper:
+    """Scrapes subreddit pages without a browser."""
+
+    def __init__(self, base_url: str = "https://www.reddit.com", proxies: Optional[ProxyPool] = None):
+        self.base_url = base_url
+        self.proxies = proxies or proxy_pool
+        self.stats = {
+            "requests": 0,
+            "completed": 0,
+            "unavailable": 0,
+            "escalated": 0,
+            "blocked": 0,
+            "bytes": 0,
+            "seconds": 0.0,
+        }
+
+    async def scrape(self, subreddit_name: str) -> Optional[Dict]:
+        """
+        Scrape one subreddit over HTTP.
+
+        Returns:
+            Intel data dict, {"permanently_failed": True, ...} for banned/private
+            subs, or None if a browser should take over.
+        """
+        url = f"{self.base_url}/r/{subreddit_name}/"
+        start = time.monotonic()
+        try:
+            _, response = await self.proxies.get_url(url, timeout=INTEL_HTTP_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.debug(f"HTTP scrape failed for r/{subreddit_name}: {e}")
+            self.stats["escalated"] += 1
+            return None
+        finally:
+            self.stats["requests"] += 1
+            self.stats["seconds"] += time.monotonic() - start
+
+        self.stats["bytes"] += len(response.content)
+        if response.status_code in (403, 429):
+            self.stats["blocked"] += 1
+
+        result = http_result(subreddit_name, response.status_code, response.text)
+        if result is None:
+            self.stats["escalated"] += 1
+        elif result.get("permanently_failed"):
+            self.stats["unavailable"] += 1
+        else:
+            self.stats["completed"] += 1
+            result["last_scraped_at"] = datetime.now(timezone.utc).isoformat()
+            logger.info(
+                f"[OK] r/{subreddit_name} (http): "
+                f"{result.get('weekly_visitors', 'N/A')} visitors, "
+                f"{result.get('weekly_contributions', 'N/A')} contributions"
+            )
+        return result
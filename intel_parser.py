@@ -0,0 +1,217 @@
+"""
+Subreddit page parsing for the intel worker.
+Turns a loaded subreddit page into weekly visitor/contribution metrics,
+or flags it as banned/private.
+
+Two ways to get the raw fields:
+- EXTRACT_FIELDS_JS runs inside the page (page.evaluate) and returns a small
+  JSON object - nothing but these fields crosses CDP.
+- fields_from_html() derives the same fields from serialized HTML, for when
+  the in-page extraction fails.
+build_result() then applies the same decision logic to either.
+
+http_result() is the browserless variant: it classifies a page fetched over
+plain HTTP and only answers when the HTML is conclusive.
+"""
+import logging
+import re
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+# Page text that means the sub is gone for good
+BAN_MESSAGES = [
+    "this community has been banned",
+    "this community is private",
+    "this subreddit has been banned",
+    "you must be invited",
+    "this community has been set to private",
+    "r/all - reddit",  # Redirected to r/all means doesn't exist
+    "page not found",
+    "sorry, this community is private",
+]
+
+# Title fragments that mean we didn't land on the sub (unless the title names it)
+TITLE_INDICATORS = ["banned", "private", "not found", "reddit - dive into anything"]
+
+# Reddit's anti-bot interstitials - the IP/fingerprint is blocked, not the sub
+BLOCK_MESSAGES = [
+    "blocked by network security",
+    "whoa there, pardner",
+    "too many requests",
+]
+
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+VISITORS_PATTERN = re.compile(r'slot="weekly-active-users-count"[^>]*>([^<]+)<')
+CONTRIBUTIONS_PATTERNS = [
+    re.compile(r'slot="weekly-posts-count"[^>]*>([^<]+)<'),
+    re.compile(r'slot="weekly-contributions-count"[^>]*>([^<]+)<'),
+]
+
+# In-page extraction. Mirrors fields_from_html(): slot values are the text
+# node right after the opening tag, like the regexes above.
+EXTRACT_FIELDS_JS = """
+({name, banMessages}) => {
+    const lower = name.toLowerCase();
+    const slotText = (slot) => {
+        const el = document.querySelector(`[slot="${slot}"]`);
+        const first = el && el.firstChild;
+        return first && first.nodeType === Node.TEXT_NODE ? first.nodeValue : null;
+    };
+    const text = ((document.title || "") + "\\n" + (document.body ? document.body.textContent : "")).toLowerCase();
+    return {
+        title: document.title || "",
+        visitors: slotText("weekly-active-users-count"),
+        contributions: slotText("weekly-posts-count") ?? slotText("weekly-contributions-count"),
+        ban_message: banMessages.some((msg) => text.includes(msg)),
+        has_header: !!document.querySelector("shreddit-subreddit-header"),
+        has_sub_ref: text.includes("r/" + lower) || !!document.querySelector(`a[href*="/r/${lower}" i]`),
+        has_posts: !!document.querySelector("shreddit-post, [slot]"),
+        head_private: document.head ? document.head.outerHTML.slice(0, 5000).toLowerCase().includes("private") : false,
+    };
+}
+"""
+
+
+def parse_metric(text: str) -> Optional[int]:
+    """Parse metrics like '1.2K' to integer."""
+    if not text:
+        return None
+
+    text = text.strip().replace(',', '')
+    multipliers = {'K': 1000, 'M': 1000000, 'B': 1000000000}
+
+    for suffix, mult in multipliers.items():
+        if suffix in text.upper():
+            try:
+                num = float(text.upper().replace(suffix, ''))
+                return int(num * mult)
+            except ValueError:
+                pass
+
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+def fields_from_html(subreddit_name: str, content: str, title: str) -> Dict:
+    """Derive the EXTRACT_FIELDS_JS fields from serialized page HTML."""
+    content_lower = content.lower()
+
+    visitors_match = VISITORS_PATTERN.search(content)
+    contributions = None
+    for pattern in CONTRIBUTIONS_PATTERNS:
+        match = pattern.search(content)
+        if match:
+            contributions = match.group(1)
+            break
+
+    return {
+        "title": title or "",
+        "visitors": visitors_match.group(1) if visitors_match else None,
+        "contributions": contributions,
+        "ban_message": any(msg in content_lower for msg in BAN_MESSAGES),
+        "has_header": "shreddit-subreddit-header" in content,
+        "has_sub_ref": f"r/{subreddit_name.lower()}" in content_lower,
+        "has_posts": "shreddit-post" in content or "slot=" in content,
+        "head_private": "private" in content_lower[:5000],
+    }
+
+
+def build_result(subreddit_name: str, fields: Dict) -> Optional[Dict]:
+    """
+    Decide what a scraped page means.
+
+    Returns:
+        Intel data dict (scrape_status='completed'),
+        {"permanently_failed": True, "error": ...} for banned/private/deleted subs,
+        or None if the page loaded without metrics and should be retried.
+    """
+    title_lower = (fields.get("title") or "").lower()
+
+    # Explicit ban/private messages
+    is_unavailable = fields.get("ban_message", False)
+
+    # Generic title (not the sub's name) means we didn't land on the sub
+    if not is_unavailable:
+        is_unavailable = (
+            any(indicator in title_lower for indicator in TITLE_INDICATORS)
+            and subreddit_name.lower() not in title_lower
+        )
+
+    # Page has absolutely no subreddit-specific content
+    if not is_unavailable:
+        has_sub_header = fields.get("has_header") or fields.get("has_sub_ref")
+        if not has_sub_header and not fields.get("has_posts"):
+            is_unavailable = True
+            logger.debug(f"r/{subreddit_name}: No subreddit content found on page")
+
+    if is_unavailable:
+        logger.warning(f"[X] r/{subreddit_name}: Subreddit is unavailable (banned/private/deleted)")
+        return {"permanently_failed": True, "error": "Subreddit banned/private/deleted"}
+
+    data = {
+        "subreddit_name": subreddit_name.lower(),
+        "display_name": f"r/{subreddit_name}",
+    }
+
+    visitors = parse_metric(fields.get("visitors"))
+    if visitors is not None:
+        data["weekly_visitors"] = visitors
+    contributions = parse_metric(fields.get("contributions"))
+    if contributions is not None:
+        data["weekly_contributions"] = contributions
+
+    # If no metrics found at all, this might be a banned/private sub
+    if not data.get("weekly_visitors") and not data.get("weekly_contributions"):
+        logger.warning(f"[X] r/{subreddit_name}: No metrics found on page")
+
+        # Double-check: is this actually a banned/unavailable sub?
+        if (
+            not fields.get("has_header") or
+            title_lower == "reddit - dive into anything" or
+            "banned" in title_lower or
+            fields.get("head_private")
+        ):
+            logger.warning(f"[X] r/{subreddit_name}: Looks like banned/private sub (no header or metrics)")
+            return {"permanently_failed": True, "error": "No metrics - likely banned/private"}
+
+        # Otherwise, genuine timeout/loading issue - retry
+        logger.warning(f"[X] r/{subreddit_name}: Page loaded but no metrics found, will retry")
+        return None
+
+    data["scrape_status"] = "completed"
+
+    # Calculate competition score
+    if data.get("weekly_visitors") and data.get("weekly_contributions"):
+        data["competition_score"] = round(
+            data["weekly_contributions"] / data["weekly_visitors"], 6
+        )
+
+    return data
+
+
+def http_result(subreddit_name: str, status_code: int, content: str) -> Optional[Dict]:
+    """
+    Classify a subreddit page fetched without a browser.
+
+    Only conclusive pages get an answer: metrics present (completed) or an
+    explicit ban/private message (permanently failed). Blocks, rate limits and
+    pages whose stats need JS return None - hand those to a browser.
+    """
+    content_lower = content.lower()
+    if status_code in (403, 429) or any(msg in content_lower for msg in BLOCK_MESSAGES):
+        logger.debug(f"r/{subreddit_name}: HTTP {status_code} blocked")
+        return None
+
+    title_match = TITLE_PATTERN.search(content)
+    fields = fields_from_html(subreddit_name, content, title_match.group(1).strip() if title_match else "")
+
+    if fields["ban_message"]:
+        return build_result(subreddit_name, fields)
+    has_metrics = parse_metric(fields["visitors"]) or parse_metric(fields["contributions"])
+    if status_code != 200 or not has_metrics:
+        logger.debug(f"r/{subreddit_name}: HTTP {status_code}, no metrics in raw HTML")
+        return None
+    return build_result(subreddit_name, fields)
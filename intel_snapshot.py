@@ -0,0 +1,134 @@
+"""
+Local SQLite snapshot of the intel candidate index.
+
+IntelCandidateIndex keeps subreddit_queue and nsfw_subreddit_intel state in
+memory and follows both tables by timestamp high-water marks. This file
+stores the same rows and watermarks on disk, so a restart loads the snapshot
+and only fetches rows changed since the last run instead of paging through
+both tables again.
+
+The snapshot is only valid for the min_subscribers it was built with; a
+different threshold starts from an empty file.
+"""
+import logging
+import os
+import sqlite3
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    subreddit_name TEXT PRIMARY KEY,
+    subscribers INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS intel (
+    subreddit_name TEXT PRIMARY KEY,
+    scrape_status TEXT,
+    error_message TEXT,
+    retry_count INTEGER,
+    last_error_kind TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class IntelSnapshot:
+    """Queue/intel rows plus watermarks in a local SQLite file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Used from worker threads (asyncio.to_thread), one call at a time
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(intel)")]
+            if columns and "retry_count" not in columns:
+                # Older snapshot layout - it is only a cache, start over
+                self._conn.executescript("DROP TABLE intel; DROP TABLE queue; DROP TABLE meta;")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _meta(self, conn: sqlite3.Connection) -> dict:
+        return dict(conn.execute("SELECT key, value FROM meta"))
+
+    def load(self, min_subscribers: int) -> Optional[dict]:
+        """
+        Read the snapshot.
+
+        Returns {"queue": [(name, subscribers)],
+        "intel": [(name, status, error, retry_count, last_error_kind)],
+        "queue_watermark": ..., "intel_watermark": ...}, or None when there is
+        no usable snapshot.
+        """
+        try:
+            conn = self._connect()
+            meta = self._meta(conn)
+            if meta.get("min_subscribers") != str(min_subscribers):
+                if meta:
+                    logger.info(f"Intel snapshot built for min_subscribers={meta.get('min_subscribers')}, discarding")
+                    self.clear()
+                return None
+            return {
+                "queue": conn.execute("SELECT subreddit_name, subscribers FROM queue").fetchall(),
+                "intel": conn.execute(
+                    "SELECT subreddit_name, scrape_status, error_message, retry_count, last_error_kind FROM intel"
+                ).fetchall(),
+                "queue_watermark": meta.get("queue_watermark"),
+                "intel_watermark": meta.get("intel_watermark"),
+            }
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read intel snapshot {self.path}: {e}")
+            return None
+
+    def save(self, min_subscribers: int, queue_rows: list[dict], intel_rows: list[dict],
+             queue_watermark: Optional[str], intel_watermark: Optional[str]):
+        """Upsert changed rows and the new watermarks in one transaction."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO queue (subreddit_name, subscribers) VALUES (?, ?)",
+                    [(row["subreddit_name"].lower(), row.get("subscribers") or 0) for row in queue_rows],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO intel (subreddit_name, scrape_status, error_message, retry_count, "
+                    "last_error_kind) VALUES (?, ?, ?, ?, ?)",
+                    [(row["subreddit_name"].lower(), row.get("scrape_status"), row.get("error_message"),
+                      row.get("retry_count"), row.get("last_error_kind"))
+                     for row in intel_rows],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [
+                        ("min_subscribers", str(min_subscribers)),
+                        ("queue_watermark", queue_watermark),
+                        ("intel_watermark", intel_watermark),
+                    ],
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write intel snapshot {self.path}: {e}")
+
+    def clear(self):
+        """Drop all rows and watermarks."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM queue")
+                conn.execute("DELETE FROM intel")
+                conn.execute("DELETE FROM meta")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not clear intel snapshot {self.path}: {e}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -5,24 +5,40 @@ Script 1: Scrapes subreddit metrics using AdsPower managed browsers with ProxyEm
 """
 import asyncio
 import logging
+import os
+import socket
 import sys
-import re
-import httpx
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import Optional, Dict
-from playwright.async_api import async_playwright, Page
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright, Page, Route
 
 from adspower_client import AdsPowerClient
-from supabase_client import SupabaseClient
-from user_agents import get_reddit_headers, get_reddit_cookies
+from intel_http import IntelHTTPScraper
+from intel_parser import EXTRACT_FIELDS_JS, BAN_MESSAGES, fields_from_html, build_result
+from latency_histogram import LatencyHistogram
+from proxy_pool import proxy_pool
+from reddit_http import reddit_http
+from subreddit_info import SubredditInfoBatcher
+from supabase_client import SupabaseClient, ERROR_NO_DATA, ERROR_TIMEOUT, ERROR_BLOCKED, ERROR_OTHER
 from config import (
     ADSPOWER_PROFILE_IDS,
     INTEL_BATCH_SIZE,
     INTEL_TIMEOUT_SECONDS,
-    INTEL_CONCURRENT,
     INTEL_DELAY_BETWEEN_BATCHES,
+    INTEL_STATS_INTERVAL,
+    INTEL_TABS_PER_PROFILE,
+    INTEL_MAX_CONCURRENT_PER_PROFILE,
+    INTEL_PROFILE_NAV_SPACING,
+    INTEL_BLOCK_RESOURCES,
+    INTEL_LEASE_SECONDS,
+    INTEL_PRECHECK_AHEAD,
+    INTEL_WORKER_ID,
+    INTEL_BACKEND,
+    INTEL_HTTP_CONCURRENCY,
     PROXYEMPIRE_ROTATION_URL,
-    CRAWLER_PROXY,
     LOG_LEVEL,
     LOG_FORMAT,
     HEALTH_CHECK_INTERVAL,
@@ -43,6 +59,14 @@ logger = logging.getLogger(__name__)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 
+REDDIT_BASE_URL = "https://www.reddit.com"
+
+# Request filter for intel scrapes - we only need the document and the JS
+# that renders the shreddit header, not the page's images/video/fonts/trackers
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+ALLOWED_HOST_SUFFIXES = ("reddit.com", "redditstatic.com")
+BLOCKED_HOST_PREFIXES = ("w3-reporting.", "error-tracking.", "events.")
+
 
 class IntelWorkerAdsPower:
     """
@@ -55,16 +79,51 @@ class IntelWorkerAdsPower:
         self.supabase = SupabaseClient()
         
         # Browser management
-        self.active_browsers: Dict[str, Dict] = {}  # profile_id -> {page, playwright_browser}
-        self.browser_queue = asyncio.Queue()  # Available browsers
+        self.active_browsers: Dict[str, Dict] = {}  # profile_id -> {pages, browser, context, limit}
+        self.browser_queue = asyncio.Queue()  # Available (profile_id, tab_index) leases
+        
+        # Work leases - lets several workers share the queue without duplicates
+        self.worker_id = INTEL_WORKER_ID or f"{socket.gethostname()}-{os.getpid()}"
+        self.leases_available = True  # Flipped off if the claim RPC isn't deployed
+        
+        # HTTP backend - browsers only see what plain HTTP couldn't settle
+        self.http_scraper = IntelHTTPScraper(REDDIT_BASE_URL) if INTEL_BACKEND == "http" else None
+        
+        # Ban pre-check metadata, batched across concurrent scrapes
+        self.subreddit_info = SubredditInfoBatcher(REDDIT_BASE_URL)
+        self.prechecks: Dict[str, asyncio.Task] = {}  # lowercase name -> running/finished check_if_banned
+        
+        # Streaming scheduler - producer keeps work_queue topped up, one consumer per browser
+        self.work_queue: asyncio.Queue = asyncio.Queue()
+        self.work_wanted = asyncio.Event()  # Set by consumers when the queue runs low
+        self.in_progress: set[str] = set()  # Queued locally or being scraped (leases renewed)
+        
+        # Browser utilization
+        self.consumer_count = 0
+        self.consumers_started: Optional[float] = None
+        self.busy_seconds = 0.0
+        self.busy_since: Dict[int, float] = {}  # consumer index -> start of current scrape
         
         # Stats
         self.stats = {
             "scraped": 0,
             "failed": 0,
             "retries": 0,
+            "browser_scrapes": 0,
+            "bytes": 0,
+            "blocked_requests": 0,
+            "prechecked_out": 0,
             "start_time": datetime.now(timezone.utc),
         }
+        
+        # Bytes received per tab (response headers + bodies)
+        self.page_bytes: Dict[Page, int] = {}
+        
+        # Per-stage latency: pre-check itself, time a consumer blocked on it,
+        # time waiting for a browser lease, and the browser scrape
+        self.stage_latency = {
+            stage: LatencyHistogram() for stage in ("precheck", "precheck_wait", "browser_wait", "scrape")
+        }
     
     async def initialize_browsers(self):
         """
@@ -110,80 +169,177 @@ class IntelWorkerAdsPower:
                     await browser.close()
                     continue
                 
-                context = contexts[0]
-                pages = context.pages
+                pages = await self.register_browser(profile_id, browser, contexts[0])
                 
-                if not pages:
-                    # Create a new page if none exist
-                    page = await context.new_page()
-                else:
-                    page = pages[0]
-                
-                # Store browser and page
-                self.active_browsers[profile_id] = {
-                    "page": page,
-                    "browser": browser,
-                    "context": context,
-                    "profile_id": profile_id,
-                }
-                
-                # Add to queue
-                await self.browser_queue.put(profile_id)
-                
-                logger.info(f"[OK] Browser {profile_id} ready (port {debug_port})")
+                logger.info(f"[OK] Browser {profile_id} ready with {len(pages)} tabs (port {debug_port})")
                 
             except Exception as e:
                 logger.error(f"Error initializing browser {profile_id}: {e}")
                 continue
         
+        self.queue_tab_leases()
+        
         active_count = len(self.active_browsers)
         logger.info("="*80)
         logger.info(f"Initialized {active_count}/{len(ADSPOWER_PROFILE_IDS)} browsers")
         logger.info("="*80)
         
         if active_count == 0:
-            raise RuntimeError("No browsers initialized! Check AdsPower setup.")
+            if not self.http_scraper:
+                raise RuntimeError("No browsers initialized! Check AdsPower setup.")
+            logger.warning("No browsers initialized - blocked HTTP scrapes will be retried later")
+    
+    async def register_browser(self, profile_id: str, browser, context) -> list[Page]:
+        """Open the profile's tab pool and add it to active_browsers."""
+        # Reuse existing tabs, open more up to INTEL_TABS_PER_PROFILE
+        pages = list(context.pages)[:INTEL_TABS_PER_PROFILE]
+        while len(pages) < INTEL_TABS_PER_PROFILE:
+            pages.append(await context.new_page())
+        
+        if INTEL_BLOCK_RESOURCES:
+            await context.route("**/*", self._route_filter)
+        for page in pages:
+            self._track_bytes(page)
+        
+        self.active_browsers[profile_id] = {
+            "pages": pages,
+            "browser": browser,
+            "context": context,
+            "profile_id": profile_id,
+            "limit": asyncio.Semaphore(INTEL_MAX_CONCURRENT_PER_PROFILE),
+            "nav_lock": asyncio.Lock(),
+            "last_nav": 0.0,
+        }
+        return pages
+    
+    @staticmethod
+    def should_block(url: str, resource_type: str) -> bool:
+        """True for requests an intel scrape doesn't need."""
+        if resource_type in BLOCKED_RESOURCE_TYPES:
+            return True
+        
+        host = urlparse(url).hostname or ""
+        if host == urlparse(REDDIT_BASE_URL).hostname:
+            return False
+        if not any(host == suffix or host.endswith("." + suffix) for suffix in ALLOWED_HOST_SUFFIXES):
+            return True  # Third-party (ads, analytics, embeds)
+        return host.startswith(BLOCKED_HOST_PREFIXES)  # Reddit's own telemetry
+    
+    async def _route_filter(self, route: Route):
+        """Playwright route handler installed on every profile context."""
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.stats["blocked_requests"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    def _track_bytes(self, page: Page):
+        """Count bytes received by a tab, for per-scrape bandwidth numbers."""
+        self.page_bytes[page] = 0
+        
+        async def on_request_finished(request):
+            try:
+                sizes = await request.sizes()
+                self.page_bytes[page] += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+            except Exception:
+                pass  # Page closed or request detached
+        
+        page.on("requestfinished", on_request_finished)
+    
+    def queue_tab_leases(self):
+        """
+        Hand out (profile, tab) leases interleaved across profiles, so load
+        spreads over all browsers before any profile gets a second tab busy.
+        """
+        for tab_index in range(INTEL_TABS_PER_PROFILE):
+            for profile_id, browser_ctx in self.active_browsers.items():
+                if tab_index < len(browser_ctx["pages"]):
+                    self.browser_queue.put_nowait((profile_id, tab_index))
+    
+    @asynccontextmanager
+    async def profile_slot(self, browser_ctx: Dict):
+        """
+        Per-profile concurrency cap plus minimum spacing between page loads,
+        so extra tabs don't turn one Reddit account into a burst of traffic.
+        """
+        async with browser_ctx["limit"]:
+            async with browser_ctx["nav_lock"]:
+                wait = browser_ctx["last_nav"] + INTEL_PROFILE_NAV_SPACING - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                browser_ctx["last_nav"] = time.monotonic()
+            yield
     
     async def check_if_banned(self, subreddit_name: str) -> Optional[str]:
         """
         Quick check if subreddit is banned/private via JSON endpoint.
         Returns error message if banned/private, None if accessible.
+        
+        Accessible and private subs are answered by the batched info lookup;
+        only subs it leaves out (banned/deleted, or a failed batch) cost their
+        own about.json request.
         """
-        url = f"https://www.reddit.com/r/{subreddit_name}/about.json"
+        info = await self.subreddit_info.get(subreddit_name)
+        if info:
+            if info.get("subreddit_type") == "private":
+                return "Subreddit private"
+            return None
+        
+        url = f"{REDDIT_BASE_URL}/r/{subreddit_name}/about.json"
         
         try:
-            async with httpx.AsyncClient(proxies=CRAWLER_PROXY, timeout=10) as client:
-                headers = get_reddit_headers()
-                cookies = get_reddit_cookies()
-                
-                response = await client.get(url, headers=headers, cookies=cookies)
-                
-                # Check for banned/private indicators
-                if response.status_code in [403, 404]:
-                    try:
-                        data = response.json()
-                        reason = data.get("reason", "").lower()
-                        message = data.get("message", "").lower()
-                        
-                        if "banned" in reason or "banned" in message:
-                            return "Subreddit banned"
-                        if "private" in reason or "private" in message:
-                            return "Subreddit private"
-                        if "not found" in message:
-                            return "Subreddit not found"
-                    except:
-                        # Can't parse JSON, but 404 likely means banned/not found
-                        return "Subreddit unavailable"
-                
-                # 200 OK means it's accessible
-                if response.status_code == 200:
-                    return None
+            _, response = await proxy_pool.get_url(url, timeout=10, sub_answers=True)
+            
+            # Check for banned/private indicators
+            if response.status_code in [403, 404]:
+                try:
+                    data = response.json()
+                    reason = data.get("reason", "").lower()
+                    message = data.get("message", "").lower()
                     
+                    if "banned" in reason or "banned" in message:
+                        return "Subreddit banned"
+                    if "private" in reason or "private" in message:
+                        return "Subreddit private"
+                    if "not found" in message:
+                        return "Subreddit not found"
+                except:
+                    # Can't parse JSON, but 404 likely means banned/not found
+                    return "Subreddit unavailable"
+            
+            # 200 OK means it's accessible
+            if response.status_code == 200:
+                return None
+                
         except Exception as e:
             logger.debug(f"JSON check failed for r/{subreddit_name}: {e}")
         
         return None  # If check fails, proceed with browser scrape anyway
     
+    async def timed_precheck(self, subreddit_name: str) -> Optional[str]:
+        started = time.monotonic()
+        try:
+            return await self.check_if_banned(subreddit_name)
+        finally:
+            self.stage_latency["precheck"].record(time.monotonic() - started)
+    
+    def start_precheck(self, subreddit_name: str) -> asyncio.Task:
+        """Ban pre-check for a sub, started once and shared by whoever needs the answer."""
+        key = subreddit_name.lower()
+        task = self.prechecks.get(key)
+        if task is None:
+            task = asyncio.create_task(self.timed_precheck(subreddit_name))
+            self.prechecks[key] = task
+        return task
+    
+    def release_lease_request(self, lease_task: asyncio.Task):
+        """Cancel a pending browser lease request, or hand back the lease it already got."""
+        if lease_task.done() and not lease_task.cancelled() and lease_task.exception() is None:
+            self.browser_queue.put_nowait(lease_task.result())
+        else:
+            lease_task.cancel()
+    
     async def scrape_subreddit(self, subreddit_name: str, page: Page) -> Optional[Dict]:
         """
         Scrape metrics for a single subreddit.
@@ -195,7 +351,7 @@ class IntelWorkerAdsPower:
         Returns:
             Dict with scraped data or None on failure
         """
-        url = f"https://www.reddit.com/r/{subreddit_name}"
+        url = f"{REDDIT_BASE_URL}/r/{subreddit_name}"
         
         try:
             # Navigate to subreddit - use domcontentloaded (faster, don't wait for everything)
@@ -229,96 +385,13 @@ class IntelWorkerAdsPower:
                 await asyncio.sleep(2)
             
             # Extract data immediately (don't wait for anything else)
-            content = await page.content()
-            page_title = await page.title()
-            
-            # Check if subreddit is banned/private/deleted/quarantined
-            page_title_lower = page_title.lower()
-            content_lower = content.lower()
-            
-            # Check for explicit ban/private messages
-            ban_messages = [
-                "this community has been banned",
-                "this community is private",
-                "this subreddit has been banned",
-                "you must be invited",
-                "this community has been set to private",
-                "r/all - reddit",  # Redirected to r/all means doesn't exist
-                "page not found",
-                "sorry, this community is private",
-            ]
-            
-            is_unavailable = any(msg in content_lower for msg in ban_messages)
-            
-            # Also check page title
-            if not is_unavailable:
-                title_indicators = ["banned", "private", "not found", "reddit - dive into anything"]
-                # If title is generic Reddit title (not subreddit name), something's wrong
-                is_unavailable = any(indicator in page_title_lower for indicator in title_indicators) and subreddit_name.lower() not in page_title_lower
-            
-            # If page loaded but has absolutely no subreddit-specific content, it's likely banned/private
-            if not is_unavailable:
-                # Check if page has basic subreddit elements
-                has_sub_header = "shreddit-subreddit-header" in content or f"r/{subreddit_name}" in content_lower
-                has_any_posts = "shreddit-post" in content or "slot=" in content
-                
-                # If no subreddit content at all, it's unavailable
-                if not has_sub_header and not has_any_posts:
-                    is_unavailable = True
-                    logger.debug(f"r/{subreddit_name}: No subreddit content found on page")
-            
-            if is_unavailable:
-                logger.warning(f"[X] r/{subreddit_name}: Subreddit is unavailable (banned/private/deleted)")
-                return {"permanently_failed": True, "error": "Subreddit banned/private/deleted"}
-            
-            data = {
-                "subreddit_name": subreddit_name.lower(),
-                "display_name": f"r/{subreddit_name}",
-                "last_scraped_at": datetime.now(timezone.utc).isoformat(),
-            }
-            
-            # Extract weekly visitors
-            visitors_match = re.search(r'slot="weekly-active-users-count"[^>]*>([^<]+)<', content)
-            if visitors_match:
-                data["weekly_visitors"] = self._parse_metric(visitors_match.group(1))
-            
-            # Extract weekly contributions
-            for pattern in [
-                r'slot="weekly-posts-count"[^>]*>([^<]+)<',
-                r'slot="weekly-contributions-count"[^>]*>([^<]+)<',
-            ]:
-                contrib_match = re.search(pattern, content)
-                if contrib_match:
-                    data["weekly_contributions"] = self._parse_metric(contrib_match.group(1))
-                    break
+            fields = await self._extract_fields(subreddit_name, page)
+            data = build_result(subreddit_name, fields)
             
-            # If no metrics found at all, this might be a banned/private sub
-            if not data.get("weekly_visitors") and not data.get("weekly_contributions"):
-                logger.warning(f"[X] r/{subreddit_name}: No metrics found on page")
-                
-                # Double-check: is this actually a banned/unavailable sub?
-                # Look for ANY signs this isn't a real subreddit page
-                if (
-                    "shreddit-subreddit-header" not in content or
-                    page_title_lower == "reddit - dive into anything" or
-                    "banned" in page_title_lower or
-                    "private" in content_lower[:5000]  # Check first 5k chars
-                ):
-                    logger.warning(f"[X] r/{subreddit_name}: Looks like banned/private sub (no header or metrics)")
-                    return {"permanently_failed": True, "error": "No metrics - likely banned/private"}
-                
-                # Otherwise, genuine timeout/loading issue - retry
-                logger.warning(f"[X] r/{subreddit_name}: Page loaded but no metrics found, will retry")
-                return None
+            if not data or data.get("permanently_failed"):
+                return data
             
-            # Mark as completed
-            data["scrape_status"] = "completed"
-            
-            # Calculate competition score
-            if data.get("weekly_visitors") and data.get("weekly_contributions"):
-                data["competition_score"] = round(
-                    data["weekly_contributions"] / data["weekly_visitors"], 6
-                )
+            data["last_scraped_at"] = datetime.now(timezone.utc).isoformat()
             
             logger.info(
                 f"[OK] r/{subreddit_name}: "
@@ -351,99 +424,221 @@ class IntelWorkerAdsPower:
             except:
                 pass
     
-    def _parse_metric(self, text: str) -> Optional[int]:
-        """Parse metrics like '1.2K' to integer."""
-        if not text:
-            return None
-        
-        text = text.strip().replace(',', '')
-        multipliers = {'K': 1000, 'M': 1000000, 'B': 1000000000}
-        
-        for suffix, mult in multipliers.items():
-            if suffix in text.upper():
-                try:
-                    num = float(text.upper().replace(suffix, ''))
-                    return int(num * mult)
-                except:
-                    pass
-        
+    async def _extract_fields(self, subreddit_name: str, page: Page) -> Dict:
+        """
+        Pull just the fields we need out of the page in one evaluate() call.
+        Falls back to serializing the full DOM if the in-page script fails.
+        """
         try:
-            return int(text)
-        except:
-            return None
+            return await page.evaluate(
+                EXTRACT_FIELDS_JS,
+                {"name": subreddit_name, "banMessages": BAN_MESSAGES},
+            )
+        except Exception as e:
+            logger.debug(f"In-page extraction failed for r/{subreddit_name} ({e}), using HTML")
+            content = await page.content()
+            page_title = await page.title()
+            return fields_from_html(subreddit_name, content, page_title)
     
-    async def process_batch(self, subreddits: list):
-        """Process a batch of subreddits in parallel using available browsers."""
-        tasks = []
-        
-        for sub in subreddits:
-            task = self.safe_scrape_subreddit(sub["subreddit_name"])
-            tasks.append(task)
+    async def fetch_work(self, limit: int) -> list[dict]:
+        """
+        Claim the next subs to scrape.
+        Uses the lease RPC when deployed, otherwise the plain pending query.
+        """
+        if self.leases_available:
+            claimed = await self.supabase.claim_intel_batch(self.worker_id, limit=limit)
+            if claimed is not None:
+                return claimed
+            
+            logger.warning("Lease RPC unavailable - falling back to unleased selection (run sql/001_intel_leases.sql)")
+            self.leases_available = False
         
-        # Process all in parallel
-        await asyncio.gather(*tasks)
+        # Unleased query can't see our local queue - over-fetch and let the producer filter
+        return await self.supabase.get_pending_intel_scrapes(limit=limit + len(self.in_progress))
+    
+    async def lease_renewal_loop(self):
+        """Keep leases on in-progress subs alive while they are being scraped."""
+        while True:
+            try:
+                await asyncio.sleep(INTEL_LEASE_SECONDS / 3)
+                
+                if self.leases_available and self.in_progress:
+                    held = list(self.in_progress)
+                    renewed = await self.supabase.renew_intel_leases(self.worker_id, held)
+                    if renewed < len(held):
+                        logger.warning(f"Renewed only {renewed}/{len(held)} leases (some expired)")
+                    
+            except Exception as e:
+                logger.error(f"Lease renewal error: {e}")
+    
+    async def producer(self):
+        """
+        Keep the local work queue topped up from the DB.
+        Refills as soon as it drops below one item per consumer, so a free
+        browser never waits for the rest of a batch to finish.
+        """
+        while True:
+            try:
+                while self.work_queue.qsize() >= self.consumer_count:
+                    self.work_wanted.clear()
+                    await self.work_wanted.wait()
+                
+                # At least one item per consumer, or refills shrink to a row at a time
+                target = max(INTEL_BATCH_SIZE, self.consumer_count)
+                want = target - self.work_queue.qsize()
+                rows = await self.fetch_work(want)
+                new_rows = [row for row in rows if row["subreddit_name"].lower() not in self.in_progress]
+                
+                if not new_rows:
+                    if not rows and not self.in_progress:
+                        logger.info("No pending subreddits. Waiting 60s...")
+                        await asyncio.sleep(60)
+                    else:
+                        await asyncio.sleep(INTEL_DELAY_BETWEEN_BATCHES)
+                    continue
+                
+                for row in new_rows:
+                    self.in_progress.add(row["subreddit_name"].lower())
+                    self.work_queue.put_nowait(row)
+                    # Browser mode: check bans while the sub waits in the queue. In
+                    # http mode the HTTP scrape settles most subs, so only escalations
+                    # are pre-checked (in safe_scrape_subreddit).
+                    if INTEL_PRECHECK_AHEAD and not self.http_scraper:
+                        self.start_precheck(row["subreddit_name"])
+                
+                logger.debug(f"Queued {len(new_rows)} subs (queue depth {self.work_queue.qsize()})")
+                
+            except Exception as e:
+                logger.error(f"Producer error: {e}")
+                await asyncio.sleep(5)
     
-    async def safe_scrape_subreddit(self, subreddit_name: str):
+    async def consumer(self, index: int):
+        """Long-lived consumer - pulls the next sub the moment it is free."""
+        while True:
+            sub = await self.work_queue.get()
+            if self.work_queue.qsize() < self.consumer_count:
+                self.work_wanted.set()
+            
+            self.busy_since[index] = time.monotonic()
+            try:
+                await self.safe_scrape_subreddit(sub["subreddit_name"], sub)
+            finally:
+                self.busy_seconds += time.monotonic() - self.busy_since.pop(index)
+                self.work_queue.task_done()
+    
+    def browser_utilization(self) -> float:
+        """Percent of consumer wall time spent scraping since start."""
+        if not self.consumers_started or not self.consumer_count:
+            return 0.0
+        now = time.monotonic()
+        capacity = (now - self.consumers_started) * self.consumer_count
+        busy = self.busy_seconds + sum(now - since for since in self.busy_since.values())
+        return busy / capacity * 100 if capacity > 0 else 0.0
+    
+    async def stats_loop(self):
+        """Log stats periodically (there are no batch boundaries any more)."""
+        while True:
+            await asyncio.sleep(INTEL_STATS_INTERVAL)
+            self.log_stats()
+    
+    @staticmethod
+    def no_data_failures(candidate: Dict) -> int:
+        """Previous "no metrics" failures, from the retry history on the candidate row."""
+        if candidate.get("retry_count") is not None:
+            return candidate["retry_count"] if candidate.get("last_error_kind") == ERROR_NO_DATA else 0
+        # Rows written before sql/002 - count the markers in the error text
+        error_msg = candidate.get("error_message") or ""
+        return error_msg.count("No metrics") + error_msg.count("Scrape returned no data")
+    
+    async def mark_retry(self, subreddit_name: str, candidate: Dict, error_kind: str, error_message: str):
+        """Mark for retry, continuing the candidate's streak if it failed the same way last time."""
+        if error_kind == ERROR_NO_DATA:
+            previous = self.no_data_failures(candidate)
+        elif candidate.get("last_error_kind") == error_kind:
+            previous = candidate.get("retry_count") or 0
+        else:
+            previous = 0
+        await self.supabase.mark_for_retry(subreddit_name, error_message, error_kind, previous + 1)
+    
+    async def safe_scrape_subreddit(self, subreddit_name: str, candidate: Optional[Dict] = None):
         """
         Scrape a subreddit with timeout and error handling.
         Non-blocking - always returns, never crashes.
         If scraping fails, marks for retry and moves on.
         After 3 failed attempts with same error, marks as permanently failed.
+        
+        Failure history comes with the candidate row (retry_count /
+        last_error_kind), so nothing is read from the DB here. The ban
+        pre-check usually started when the sub was queued; the browser lease
+        is requested alongside it and handed back if the sub turns out banned.
         """
-        profile_id = None
+        candidate = candidate or {}
+        lease = None
+        lease_task = None
         
         try:
-            # STEP 1: Quick JSON check - is sub banned/private?
-            ban_reason = await self.check_if_banned(subreddit_name)
+            # STEP 0: Plain HTTP - settles most subs without touching a browser
+            if self.http_scraper:
+                result = await self.http_scraper.scrape(subreddit_name)
+                if result:
+                    await self.save_result(subreddit_name, result)
+                    return
+                if not self.active_browsers:
+                    await self.mark_retry(subreddit_name, candidate, ERROR_BLOCKED, "HTTP blocked, no browser available")
+                    self.stats["retries"] += 1
+                    return
+            
+            # STEP 1: Quick JSON check - is sub banned/private? - while a browser is requested
+            precheck = self.start_precheck(subreddit_name)
+            waiting_since = time.monotonic()
+            lease_task = asyncio.create_task(self.browser_queue.get())
+            try:
+                ban_reason = await precheck
+            finally:
+                self.prechecks.pop(subreddit_name.lower(), None)
+                self.stage_latency["precheck_wait"].record(time.monotonic() - waiting_since)
+            
             if ban_reason:
+                self.release_lease_request(lease_task)
+                lease_task = None
                 logger.warning(f"[X] r/{subreddit_name}: {ban_reason} (JSON check)")
                 await self.supabase.mark_intel_failed(subreddit_name, ban_reason)
                 self.stats["failed"] += 1
+                self.stats["prechecked_out"] += 1
                 return
             
-            # Check how many times this sub has failed before
-            failure_count = 0
-            try:
-                retry_check = self.supabase.client.table("nsfw_subreddit_intel").select(
-                    "error_message"
-                ).eq("subreddit_name", subreddit_name.lower()).execute()
-                
-                if retry_check.data and len(retry_check.data) > 0:
-                    error_msg = retry_check.data[0].get("error_message", "")
-                    # Count how many times "No metrics" appears (each retry adds it)
-                    if "Scrape returned no data" in error_msg or "No metrics" in error_msg:
-                        failure_count = error_msg.count("No metrics") + error_msg.count("Scrape returned no data")
-            except:
-                pass
+            # How many times this sub has failed before
+            failure_count = self.no_data_failures(candidate)
             
-            # STEP 2: Acquire browser from queue (with timeout)
+            # STEP 2: Wait for the (browser, tab) lease (with timeout)
             async with asyncio.timeout(60):
-                profile_id = await self.browser_queue.get()
+                lease = await lease_task
+            self.stage_latency["browser_wait"].record(time.monotonic() - waiting_since)
             
+            profile_id, tab_index = lease
             browser_ctx = self.active_browsers.get(profile_id)
             if not browser_ctx:
                 logger.error(f"Browser {profile_id} not found!")
                 return
             
-            page = browser_ctx["page"]
+            page = browser_ctx["pages"][tab_index]
             
-            # Scrape with timeout
-            async with asyncio.timeout(INTEL_TIMEOUT_SECONDS):
-                result = await self.scrape_subreddit(subreddit_name, page)
+            # Scrape with timeout, within the profile's concurrency cap
+            bytes_before = self.page_bytes.get(page, 0)
+            scrape_started = time.monotonic()
+            try:
+                async with self.profile_slot(browser_ctx):
+                    async with asyncio.timeout(INTEL_TIMEOUT_SECONDS):
+                        result = await self.scrape_subreddit(subreddit_name, page)
+            finally:
+                self.stage_latency["scrape"].record(time.monotonic() - scrape_started)
+                scrape_bytes = self.page_bytes.get(page, 0) - bytes_before
+                self.stats["bytes"] += scrape_bytes
+                self.stats["browser_scrapes"] += 1
+                logger.debug(f"r/{subreddit_name}: {scrape_bytes / 1024:.0f} KB transferred")
             
             if result:
-                # Check if this is a permanently failed sub (banned/private/deleted)
-                if result.get("permanently_failed"):
-                    await self.supabase.mark_intel_failed(
-                        subreddit_name, 
-                        result.get("error", "Subreddit unavailable")
-                    )
-                    self.stats["failed"] += 1
-                    logger.info(f"Permanently failed r/{subreddit_name}")
-                else:
-                    # Save to database
-                    await self.supabase.upsert_subreddit_intel(result)
-                    self.stats["scraped"] += 1
+                await self.save_result(subreddit_name, result)
             else:
                 # If this sub has failed 3+ times, mark as permanently failed
                 if failure_count >= 3:
@@ -452,23 +647,44 @@ class IntelWorkerAdsPower:
                     self.stats["failed"] += 1
                 else:
                     # Mark for retry
-                    await self.supabase.mark_for_retry(subreddit_name, "Scrape returned no data")
+                    await self.mark_retry(subreddit_name, candidate, ERROR_NO_DATA, "Scrape returned no data")
                     self.stats["retries"] += 1
                 
         except asyncio.TimeoutError:
             logger.warning(f"Timeout on r/{subreddit_name}, moving on")
-            await self.supabase.mark_for_retry(subreddit_name, "Timeout")
+            await self.mark_retry(subreddit_name, candidate, ERROR_TIMEOUT, "Timeout")
             self.stats["retries"] += 1
             
         except Exception as e:
             logger.error(f"Error on r/{subreddit_name}: {e}")
-            await self.supabase.mark_for_retry(subreddit_name, str(e))
+            await self.mark_retry(subreddit_name, candidate, ERROR_OTHER, str(e))
             self.stats["failed"] += 1
             
         finally:
-            # Always return browser to queue
-            if profile_id:
-                await self.browser_queue.put(profile_id)
+            # Done with this sub - stop renewing its lease and let it lapse.
+            # The result is already buffered, so it lands before the lease expires.
+            self.in_progress.discard(subreddit_name.lower())
+            
+            # Always return the tab lease to the pool
+            if lease:
+                await self.browser_queue.put(lease)
+            elif lease_task:
+                self.release_lease_request(lease_task)
+    
+    async def save_result(self, subreddit_name: str, result: Dict):
+        """Record a scrape result - intel data, or a permanent failure."""
+        # Check if this is a permanently failed sub (banned/private/deleted)
+        if result.get("permanently_failed"):
+            await self.supabase.mark_intel_failed(
+                subreddit_name, 
+                result.get("error", "Subreddit unavailable")
+            )
+            self.stats["failed"] += 1
+            logger.info(f"Permanently failed r/{subreddit_name}")
+        else:
+            # Save to database
+            await self.supabase.upsert_subreddit_intel(result)
+            self.stats["scraped"] += 1
     
     async def health_check_loop(self):
         """Periodically check browser health."""
@@ -483,7 +699,7 @@ class IntelWorkerAdsPower:
                 
                 for profile_id, browser_ctx in list(self.active_browsers.items()):
                     try:
-                        page = browser_ctx["page"]
+                        page = browser_ctx["pages"][0]
                         browser = browser_ctx["browser"]
                         
                         # Check if browser is still connected
@@ -520,44 +736,38 @@ class IntelWorkerAdsPower:
     async def run(self):
         """Main worker loop."""
         logger.info("="*80)
-        logger.info("INTEL WORKER STARTING (AdsPower Mode)")
-        logger.info(f"  Batch Size: {INTEL_BATCH_SIZE}")
-        logger.info(f"  Concurrent: {INTEL_CONCURRENT}")
+        logger.info(f"INTEL WORKER STARTING (AdsPower Mode, {INTEL_BACKEND} backend)")
+        logger.info(f"  Prefetch: {INTEL_BATCH_SIZE}")
+        logger.info(f"  Tabs/Profile: {INTEL_TABS_PER_PROFILE} (max {INTEL_MAX_CONCURRENT_PER_PROFILE} concurrent)")
         logger.info(f"  Timeout: {INTEL_TIMEOUT_SECONDS}s")
+        logger.info(f"  Worker ID: {self.worker_id}")
         logger.info("="*80)
         
         # Initialize browsers
         await self.initialize_browsers()
         
-        # Start health check loop
-        health_task = asyncio.create_task(self.health_check_loop())
+        # One consumer per (browser, tab) lease, fed by a single prefetching producer
+        self.consumer_count = self.browser_queue.qsize()
+        if self.http_scraper:
+            self.consumer_count = max(self.consumer_count, INTEL_HTTP_CONCURRENCY)
+        self.consumers_started = time.monotonic()
+        
+        tasks = [
+            asyncio.create_task(self.health_check_loop()),
+            asyncio.create_task(self.lease_renewal_loop()),
+            asyncio.create_task(self.stats_loop()),
+            asyncio.create_task(self.producer()),
+        ]
+        tasks += [asyncio.create_task(self.consumer(i)) for i in range(self.consumer_count)]
         
         try:
-            while True:
-                # Get pending subreddits
-                pending = await self.supabase.get_pending_intel_scrapes(limit=INTEL_BATCH_SIZE)
-                
-                if not pending:
-                    logger.info("No pending subreddits. Waiting 60s...")
-                    await asyncio.sleep(60)
-                    continue
-                
-                logger.info(f"--- Batch: {len(pending)} subs ---")
-                
-                # Process batch
-                await self.process_batch(pending)
-                
-                # Log stats
-                self.log_stats()
-                
-                # Brief delay between batches
-                await asyncio.sleep(INTEL_DELAY_BETWEEN_BATCHES)
-                
+            await asyncio.gather(*tasks)
         except KeyboardInterrupt:
             logger.info("\nShutdown requested...")
         finally:
             # Cleanup
-            health_task.cancel()
+            for task in tasks:
+                task.cancel()
             await self.cleanup()
     
     def log_stats(self):
@@ -573,13 +783,61 @@ class IntelWorkerAdsPower:
             f"{self.stats['failed']} failed | "
             f"{rate:.0f}/hr | "
             f"{hours:.1f}h | "
-            f"{len(self.active_browsers)}/{len(ADSPOWER_PROFILE_IDS)} browsers"
+            f"{len(self.active_browsers)}/{len(ADSPOWER_PROFILE_IDS)} browsers x{INTEL_TABS_PER_PROFILE} tabs | "
+            f"{self.browser_utilization():.0f}% util | "
+            f"{self.stats['bytes'] / max(self.stats['browser_scrapes'], 1) / 1024:.0f} KB/scrape | "
+            f"{self.stats['blocked_requests']} blocked | "
+            f"reddit {proxy_pool.total_rate():.1f} req/s | "
+            f"queue {self.work_queue.qsize()}"
+        )
+        
+        if self.http_scraper:
+            http = self.http_scraper.stats
+            logger.info(
+                f"HTTP: {http['completed']} scraped | "
+                f"{http['unavailable']} unavailable | "
+                f"{http['escalated']} escalated to browser | "
+                f"{http['blocked']} blocked (403/429) | "
+                f"avg {http['seconds'] / max(http['requests'], 1) * 1000:.0f}ms | "
+                f"{http['bytes'] / max(http['requests'], 1) / 1024:.0f} KB/page"
+            )
+        
+        info = self.subreddit_info.stats
+        if info["requests"]:
+            logger.info(
+                f"PRECHECK: {info['names']} subs in {info['requests']} info requests "
+                f"({self.subreddit_info.names_per_request():.1f}/request) | "
+                f"{info['missing'] + info['failed']} checked individually | "
+                f"{self.stats['prechecked_out']} banned/private kept off browsers"
+            )
+        
+        if self.stage_latency["precheck"].count:
+            logger.info(
+                "LATENCY: " + " | ".join(
+                    f"{stage.replace('_', ' ')} {histogram.summary()}"
+                    for stage, histogram in self.stage_latency.items()
+                )
+            )
+        
+        writes = self.supabase.intel_writes.get_stats()
+        logger.info(
+            f"WRITES: {writes['rows_flushed']} flushed | "
+            f"{writes['buffered']} buffered | "
+            f"{writes['coalesced']} coalesced | "
+            f"{writes['rows_failed']} failed / {writes['rows_dropped']} dropped | "
+            f"{writes['flushes']} flushes | "
+            f"avg batch {writes['avg_batch_size']:.1f} | "
+            f"avg {writes['avg_flush_ms']:.0f}ms / max {writes['flush_seconds_max'] * 1000:.0f}ms"
         )
     
     async def cleanup(self):
         """Cleanup resources."""
         logger.info("Cleaning up...")
         
+        # Before anything awaits: cancelled scrapes drop their subs from in_progress in their
+        # finally blocks, and those interrupted subs are exactly the leases to hand back
+        unfinished = list(self.in_progress)
+        
         # Close all browsers
         for profile_id, browser_ctx in self.active_browsers.items():
             try:
@@ -590,6 +848,19 @@ class IntelWorkerAdsPower:
                 logger.error(f"Error closing browser {profile_id}: {e}")
         
         await self.adspower.close()
+        
+        # Stop pre-checks for subs that will not be scraped now
+        for task in self.prechecks.values():
+            task.cancel()
+        self.subreddit_info.close()
+        await reddit_http.close()
+        
+        # Flush buffered intel writes, then hand back unfinished leases
+        await self.supabase.flush()
+        if self.leases_available and unfinished:
+            released = await self.supabase.release_intel_leases(self.worker_id, unfinished)
+            logger.info(f"Released {released} unfinished leases")
+        await self.supabase.close()
         logger.info("Cleanup complete")
 
 
@@ -0,0 +1,170 @@
+"""
+Compact set of known subreddit names for crawler dedup.
+
+Names are stored as 64-bit hashes in a sorted array (8 bytes each, versus
+~100 bytes per str in a Python set); membership is a binary search. New
+names go into a small side set and are merged in bulk. At a million names
+the chance of any hash collision is ~3e-8, and a collision would only make
+the crawler skip one sub.
+
+The set is snapshotted to a local file together with a high-water mark on
+subreddit_queue.created_at, so a restart loads the file and only fetches
+rows added since. Syncs re-read OVERLAP_SECONDS behind the mark so rows
+committed late (or stamped by a lagging clock) are not missed; adding a
+known name again is a no-op.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from array import array
+from bisect import bisect_left
+from itertools import chain, groupby
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"KSUB1\n"
+
+
+def name_hash(name: str) -> int:
+    return int.from_bytes(hashlib.blake2b(name.lower().encode(), digest_size=8).digest(), "little")
+
+
+class KnownSubreddits:
+    """Set-like membership for subreddit names (case-insensitive)."""
+
+    MERGE_THRESHOLD = 4096  # Side-set size that triggers a merge into the sorted array
+    PAGE_SIZE = 1000
+    OVERLAP_SECONDS = 120
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.hashes = array("Q")  # Sorted, unique
+        self.recent: set[int] = set()  # Added since the last merge
+        self.watermark: Optional[str] = None  # max subreddit_queue.created_at synced
+        self.dirty = False
+
+    def _in_sorted(self, h: int) -> bool:
+        i = bisect_left(self.hashes, h)
+        return i < len(self.hashes) and self.hashes[i] == h
+
+    def __contains__(self, name: str) -> bool:
+        h = name_hash(name)
+        return h in self.recent or self._in_sorted(h)
+
+    def __len__(self) -> int:
+        return len(self.hashes) + len(self.recent)
+
+    def add(self, name: str):
+        h = name_hash(name)
+        if h in self.recent or self._in_sorted(h):
+            return
+        self.recent.add(h)
+        self.dirty = True
+        # Merge cost is O(n), so let the side set grow with the array
+        if len(self.recent) >= max(self.MERGE_THRESHOLD, len(self.hashes) // 4):
+            self._merge()
+
+    def update(self, names: Iterable[str]):
+        """Bulk add (e.g. a cold load) - one sort at the end."""
+        self._merge()
+        merged = sorted(chain(self.hashes, map(name_hash, names)))
+        self.hashes = array("Q", (h for h, _ in groupby(merged)))
+        self.dirty = True
+
+    def _merge(self):
+        if not self.recent:
+            return
+        fresh = [h for h in self.recent if not self._in_sorted(h)]
+        if fresh:
+            self.hashes.extend(fresh)
+            self.hashes = array("Q", sorted(self.hashes))
+        self.recent.clear()
+
+    def load(self) -> bool:
+        """Load the snapshot file, if there is one. Returns True if loaded."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                if f.readline() != SNAPSHOT_MAGIC:
+                    raise ValueError("not a known-subs snapshot")
+                header = json.loads(f.readline())
+                hashes = array("Q")
+                hashes.frombytes(f.read())
+            if len(hashes) != header["count"]:
+                raise ValueError(f"expected {header['count']} hashes, found {len(hashes)}")
+            self.hashes = hashes
+            self.recent.clear()
+            self.watermark = header.get("watermark")
+            self.dirty = False
+            return True
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable known-subs snapshot {self.path}: {e}")
+            return False
+
+    def save(self):
+        """Write the snapshot atomically (temp file + rename)."""
+        if not self.path:
+            return
+        self._merge()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(json.dumps({"count": len(self.hashes), "watermark": self.watermark}).encode() + b"\n")
+            f.write(self.hashes.tobytes())
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    async def sync(self, supabase) -> int:
+        """
+        Add subreddit_queue rows created since the watermark (all rows on a
+        cold start) and save the snapshot if anything changed.
+        Returns the number of rows fetched.
+        """
+        fetched = 0
+        offset = 0
+        newest = self.watermark
+        since = None
+        if self.watermark:
+            since = (datetime.fromisoformat(self.watermark) - timedelta(seconds=self.OVERLAP_SECONDS)).isoformat()
+        while True:
+            query = supabase.client.table("subreddit_queue").select("subreddit_name, created_at")
+            if since:
+                query = query.gt("created_at", since)
+            result = await supabase.execute(
+                query.order("created_at").range(offset, offset + self.PAGE_SIZE - 1)
+            )
+            if not result.data:
+                break
+            for row in result.data:
+                self.add(row["subreddit_name"])
+                ts = row.get("created_at")
+                if ts and (newest is None or datetime.fromisoformat(ts) > datetime.fromisoformat(newest)):
+                    newest = ts
+            fetched += len(result.data)
+            if len(result.data) < self.PAGE_SIZE:
+                break
+            offset += self.PAGE_SIZE
+
+        if newest != self.watermark:
+            self.watermark = newest
+            self.dirty = True
+        if self.dirty:
+            self.save()
+        return fetched
+
+    async def load_and_sync(self, supabase):
+        """Startup: snapshot first, then only the delta from the DB."""
+        start = time.monotonic()
+        loaded = self.load()
+        fetched = await self.sync(supabase)
+        logger.info(
+            f"Known subreddits: {len(self):,} "
+            f"({'snapshot + ' if loaded else 'cold, '}{fetched:,} rows fetched) "
+            f"in {time.monotonic() - start:.1f}s"
+        )
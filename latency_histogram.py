@@ -0,0 +1,53 @@
+"""
+Fixed-bucket latency histograms for the workers' stats lines.
+
+Buckets are spaced roughly 1-2-5 from 1ms to 60s, so recording is a bisect
+and memory stays constant however long the worker runs. Percentiles report
+the upper edge of the bucket they fall in, capped at the largest value seen.
+"""
+from bisect import bisect_left
+from typing import Dict
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class LatencyHistogram:
+    """Counts of observed durations per bucket, plus count/sum/max."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float:
+        """Approximate p-th percentile in ms (0 when nothing was recorded)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(float(BUCKETS_MS[index]), self.max_ms) if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def buckets(self) -> Dict[str, int]:
+        """Non-empty buckets as {"<=50ms": n, ..., ">60000ms": n}."""
+        labels = [f"<={edge}ms" for edge in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {label: count for label, count in zip(labels, self.counts) if count}
+
+    def summary(self) -> str:
+        if not self.count:
+            return "n=0"
+        return (
+            f"n={self.count} avg {self.total_ms / self.count:.0f}ms "
+            f"p50 {self.percentile(50):.0f}ms p95 {self.percentile(95):.0f}ms max {self.max_ms:.0f}ms"
+        )
@@ -7,20 +7,99 @@ import json
 import logging
 import asyncio
 import random
-import httpx
 from typing import Optional
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
 
-from config import OPENAI_API_KEY, CRAWLER_PROXY
-from user_agents import get_reddit_headers, get_reddit_cookies
+from config import (
+    OPENAI_API_KEY,
+    LLM_CACHE_PATH,
+    LLM_PRICE_INPUT_PER_M,
+    LLM_PRICE_OUTPUT_PER_M,
+    LLM_RATE_HEADROOM,
+    LLM_RULE_CLASSIFIER,
+)
+from llm_cache import LLMResultCache, cache_key
+from openai_limits import OpenAIRateLimits
+from rule_classifier import classify, niches, rules_text
+from proxy_pool import ProxyPool, proxy_pool
+from reddit_http import reddit_http, is_sub_answer
 
 logger = logging.getLogger(__name__)
 
+# Part of the result cache key - bump when the prompts or the result schema change
+PROMPT_VERSION = 1
+
+# Result fields judged from the description and rules alone - the only ones shared through the cache.
+# Niches and reasoning are about the particular sub (its name, its subscriber count).
+CACHED_FIELDS = ("verification_required", "sellers_allowed", "confidence")
+
+# Failures worth retrying later as they are: throttling, network, OpenAI 5xx
+TRANSIENT_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+SYSTEM_PROMPT = "You are an expert at analyzing NSFW subreddit rules and policies. Return only valid JSON."
+
+ANALYSIS_CRITERIA = """Determine:
+
+1. **Verification Required**: Does this subreddit require users to verify their identity?
+
+2. **Sellers Allowed**: Are OnlyFans creators, sellers, or self-promotion allowed?
+   - Return "allowed" if creators/sellers are explicitly welcome OR no restrictions mentioned
+   - Return "not_allowed" if there are explicit bans on OnlyFans, sellers, or "amateur only" rules
+   - Return "unknown" if unclear
+
+3. **Niche Categories**: Main content themes (e.g., amateur, petite, asian, milf, etc.)
+
+4. **Confidence**: How confident are you? (high/medium/low)"""
+
+SELLERS_VALUES = ("allowed", "not_allowed", "unknown")
+CONFIDENCE_VALUES = ("high", "medium", "low")
+
+# Structured output for batched prompts: one entry per subreddit, keyed by name
+BATCH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "subreddit_analyses",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "subreddit": {"type": "string"},
+                            "verification_required": {"type": "boolean"},
+                            "sellers_allowed": {"type": "string", "enum": list(SELLERS_VALUES)},
+                            "niche_categories": {"type": "array", "items": {"type": "string"}},
+                            "confidence": {"type": "string", "enum": list(CONFIDENCE_VALUES)},
+                            "reasoning": {"type": "string"},
+                        },
+                        "required": [
+                            "subreddit", "verification_required", "sellers_allowed",
+                            "niche_categories", "confidence", "reasoning",
+                        ],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["results"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def token_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    """USD for a number of tokens at the configured prices."""
+    return (prompt_tokens * LLM_PRICE_INPUT_PER_M + completion_tokens * LLM_PRICE_OUTPUT_PER_M) / 1_000_000
+
 
 class SubredditLLMAnalyzer:
     """Analyzes subreddit data using LLM to extract structured metadata."""
     
-    def __init__(self, api_key: Optional[str] = None, reddit_proxy: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, reddit_proxies: Optional[ProxyPool] = None,
+                 cache: Optional[LLMResultCache] = None):
         # OpenAI API key
         self.api_key = api_key or OPENAI_API_KEY
         if not self.api_key:
@@ -30,9 +109,24 @@ class SubredditLLMAnalyzer:
         self.client = AsyncOpenAI(api_key=self.api_key)
         self.model = "gpt-4o-mini"
         
-        # ProxyEmpire mobile proxy for Reddit API calls
-        self.reddit_proxy = reddit_proxy or CRAWLER_PROXY
-        logger.info(f"LLM Analyzer initialized with ProxyEmpire mobile proxy")
+        # Mobile proxy pool for Reddit API calls
+        self.reddit_proxies = reddit_proxies or proxy_pool
+        logger.info(f"LLM Analyzer initialized with {len(self.reddit_proxies.proxies)} mobile proxies")
+        
+        # OpenAI usage - subreddits counts each sub once, however many requests it took
+        self.usage = {
+            "requests": 0, "subreddits": 0, "prompt_tokens": 0, "completion_tokens": 0, "retried": 0,
+            "classified": 0,
+        }
+        
+        # Account rate limits and achieved RPM/TPM, from the response headers
+        self.rate_limits = OpenAIRateLimits(headroom=LLM_RATE_HEADROOM)
+        
+        # Results by input hash - consulted before every OpenAI call
+        self.cache = cache or (LLMResultCache(LLM_CACHE_PATH) if LLM_CACHE_PATH else None)
+        
+        # Subs whose rules state their policies outright are decided without the model
+        self.rule_classifier = LLM_RULE_CLASSIFIER
     
     async def _fetch_subreddit_info(self, subreddit_name: str) -> dict:
         """Fetch subreddit info and rules from Reddit JSON API."""
@@ -41,43 +135,41 @@ class SubredditLLMAnalyzer:
         # Try with retries
         for attempt in range(3):
             try:
-                # Get fresh user agent and headers for each attempt
-                headers = get_reddit_headers()
-                cookies = get_reddit_cookies()
+                proxy, response = await self.reddit_proxies.get_url(url, timeout=15.0, sub_answers=True)
                 
-                async with httpx.AsyncClient(
-                    proxy=self.reddit_proxy,
-                    timeout=15.0,
-                    verify=False,
-                    cookies=cookies
-                ) as client:
-                    response = await client.get(url, headers=headers)
+                if response.status_code == 200:
+                    data = response.json()
+                    sub_data = data.get("data", {})
                     
-                    if response.status_code == 200:
-                        data = response.json()
-                        sub_data = data.get("data", {})
-                        
-                        # Extract rules
-                        rules = []
-                        if "community_rules" in sub_data:
-                            for rule in sub_data["community_rules"]:
-                                rules.append({
-                                    "short_name": rule.get("short_name", ""),
-                                    "description": rule.get("description", "")
-                                })
-                        
-                        return {
-                            "description": sub_data.get("public_description", ""),
-                            "rules": rules,
-                        }
+                    # Extract rules
+                    rules = []
+                    if "community_rules" in sub_data:
+                        for rule in sub_data["community_rules"]:
+                            rules.append({
+                                "short_name": rule.get("short_name", ""),
+                                "description": rule.get("description", "")
+                            })
+                    
+                    return {
+                        "description": sub_data.get("public_description", ""),
+                        "rules": rules,
+                    }
+                
+                elif response.status_code == 429:
+                    # Shared per-proxy limiter has slowed down - retry at its pace
+                    logger.warning(f"HTTP 429 for r/{subreddit_name}, retrying at {reddit_http.rate(proxy.url):.2f} req/s...")
+                elif is_sub_answer(response):
+                    # Private / quarantined - Reddit's answer, retrying won't change it
+                    logger.info(f"r/{subreddit_name} is {response.json()['reason']}, no rules to fetch")
+                    break
+                elif response.status_code == 403:
+                    # Retry with different user agent
+                    logger.warning(f"HTTP 403 for r/{subreddit_name}, retrying with new user agent...")
+                    reddit_http.rotate_identity(proxy.url)
+                    await asyncio.sleep(2 ** attempt)
+                else:
+                    await asyncio.sleep(1)
                     
-                    elif response.status_code in [403, 429]:
-                        # Retry with different user agent (happens automatically on next attempt)
-                        logger.warning(f"HTTP {response.status_code} for r/{subreddit_name}, retrying with new user agent...")
-                        await asyncio.sleep(2 ** attempt)
-                    else:
-                        await asyncio.sleep(1)
-                        
             except Exception as e:
                 logger.warning(f"Attempt {attempt+1} failed for r/{subreddit_name}: {e}")
                 await asyncio.sleep(2 ** attempt)
@@ -102,77 +194,318 @@ class SubredditLLMAnalyzer:
         - confidence: str ('high', 'medium', 'low')
         - reasoning: str
         """
+        self.usage["subreddits"] += 1
         try:
             # Fetch info from Reddit if not provided
-            if not description or not rules:
-                logger.info(f"Fetching subreddit info for r/{subreddit_name}...")
-                info = await self._fetch_subreddit_info(subreddit_name)
-                description = description or info.get("description", "")
-                rules = rules or info.get("rules", [])
+            description, rules = await self._fill_info(subreddit_name, description, rules)
             
-            # Build rules text
-            rules_text = "\n".join([
-                f"- {rule.get('short_name', 'Rule')}: {rule.get('description', '')}"
-                for rule in rules
-            ]) if rules else "No rules provided"
+            local = self._answer_locally(subreddit_name, description, rules)
+            if local:
+                return local
             
-            # Create prompt
-            prompt = self._build_prompt(subreddit_name, description, rules_text, subscribers)
-            
-            # Call OpenAI API
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at analyzing NSFW subreddit rules and policies. Return only valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=500,
-                response_format={"type": "json_object"}
-            )
-            
-            # Parse response
-            result = json.loads(response.choices[0].message.content)
-            
-            logger.info(f"LLM analyzed r/{subreddit_name}: {result.get('confidence', 'unknown')} confidence")
-            
-            return result
+            return await self._analyze_one(subreddit_name, description, rules, subscribers)
             
         except Exception as e:
             logger.error(f"LLM analysis error for r/{subreddit_name}: {e}")
             return self._get_fallback_result()
     
-    def _build_prompt(self, subreddit_name: str, description: str, rules_text: str, subscribers: int) -> str:
-        """Build the analysis prompt."""
+    async def analyze_batch(self, subs: list[dict]) -> dict:
+        """
+        Analyze several subreddits with one chat completion.
+        
+        subs are {"subreddit_name", "description", "rules", "subscribers"}
+        dicts; description and rules are fetched when missing, as in
+        analyze_subreddit. Returns {subreddit_name: result} with the same
+        result dicts as analyze_subreddit. Entries the model leaves out or
+        garbles are retried on their own, and a request that fails outright
+        is split in half and retried; a sub that fails on its own gets the
+        fallback result. Transient failures (429, connection, 5xx) are not
+        retried: those subs are missing from the dict.
+        """
+        results, uncached = await self.prepare(subs)
+        if uncached:
+            results.update(await self.analyze_prepared(uncached))
+        return results
+    
+    async def prepare(self, subs: list[dict]) -> tuple[dict, list[dict]]:
+        """
+        Fill in missing descriptions/rules and answer what the cache and the
+        rule classifier can.
+        Returns ({subreddit_name: local result}, [subs that still need the model]).
+        """
+        infos = await asyncio.gather(*(
+            self._fill_info(sub["subreddit_name"], sub.get("description"), sub.get("rules"))
+            for sub in subs
+        ))
+        results = {}
+        uncached = []
+        for sub, (description, rules) in zip(subs, infos):
+            local = self._answer_locally(sub["subreddit_name"], description, rules)
+            if local:
+                results[sub["subreddit_name"]] = local
+            else:
+                uncached.append({**sub, "description": description, "rules": rules})
+        self.usage["subreddits"] += len(results)
+        return results, uncached
+    
+    async def analyze_prepared(self, subs: list[dict]) -> dict:
+        """Model results for subs that prepare() could not answer, as in analyze_batch."""
+        self.usage["subreddits"] += len(subs)
+        return await self._analyze_prepared(subs)
+    
+    def _answer_locally(self, subreddit_name: str, description: str, rules: list) -> Optional[dict]:
+        """A cached LLM result, else the rule classifier's decision, else None."""
+        cached = self._cached(subreddit_name, description, rules)
+        if cached:
+            logger.info(f"LLM cache hit for r/{subreddit_name}")
+            return cached
+        
+        if self.rule_classifier:
+            result = classify(subreddit_name, description, rules)
+            if result:
+                self.usage["classified"] += 1
+                logger.info(f"Rule classifier decided r/{subreddit_name}")
+                return result
+        return None
+    
+    @staticmethod
+    def _cacheable(description: str, rules: list) -> bool:
+        """
+        Whether the inputs say anything beyond the sub's name. With neither a
+        description nor rules, every sub shares one key while the model's
+        verdict rests on the name alone.
+        """
+        return bool((description or "").strip()) or any(
+            (rule.get("short_name") or "").strip() or (rule.get("description") or "").strip()
+            for rule in rules or []
+        )
+    
+    def _cached(self, subreddit_name: str, description: str, rules: list) -> Optional[dict]:
+        """The cached verdict for these inputs, with niches and reasoning for this sub."""
+        if not self.cache or not self._cacheable(description, rules):
+            return None
+        cached = self.cache.get(cache_key(self.model, PROMPT_VERSION, description, rules))
+        if not cached or any(cached.get(field) is None for field in CACHED_FIELDS):
+            return None
+        result = {field: cached.get(field) for field in CACHED_FIELDS}
+        result["niche_categories"] = niches(subreddit_name, rules_text(description, rules))
+        result["reasoning"] = (
+            f"Cached verdict for identical description and rules: verification "
+            f"{'required' if result['verification_required'] else 'not required'}, "
+            f"sellers {(result['sellers_allowed'] or 'unknown').replace('_', ' ')}."
+        )
+        return result
+    
+    def _remember(self, description: str, rules: list, result: dict, prompt_tokens: int, completion_tokens: int):
+        """Cache a result's verdict if it is well-formed (a garbled answer is not worth keeping)."""
+        result = self._validate_result(result) if self.cache and self._cacheable(description, rules) else None
+        if result:
+            self.cache.put(
+                cache_key(self.model, PROMPT_VERSION, description, rules),
+                {field: result[field] for field in CACHED_FIELDS}, prompt_tokens, completion_tokens,
+            )
+    
+    async def _fill_info(self, subreddit_name: str, description: Optional[str], rules: Optional[list]):
+        """Description and rules, fetched from Reddit if either is missing."""
+        if not description or not rules:
+            logger.info(f"Fetching subreddit info for r/{subreddit_name}...")
+            info = await self._fetch_subreddit_info(subreddit_name)
+            description = description or info.get("description", "")
+            rules = rules or info.get("rules", [])
+        return description, rules
+    
+    async def _analyze_prepared(self, subs: list[dict]) -> dict:
+        """
+        Results per sub. Subs hit by a transient failure are left out, so they
+        stay in the backlog; a sub whose own request fails otherwise (bad
+        request, unparseable answer) gets the fallback result, or it would be
+        resent forever.
+        """
+        if len(subs) == 1:
+            sub = subs[0]
+            try:
+                result = await self._analyze_one(
+                    sub["subreddit_name"], sub["description"], sub["rules"], sub.get("subscribers", 0)
+                )
+            except TRANSIENT_ERRORS as e:
+                logger.warning(f"LLM request failed ({type(e).__name__}), leaving r/{sub['subreddit_name']} for later")
+                return {}
+            except Exception as e:
+                logger.error(f"LLM analysis error for r/{sub['subreddit_name']}: {e}")
+                result = self._get_fallback_result()
+            return {sub["subreddit_name"]: result}
+        
+        results = {}
+        request_failed = False
+        try:
+            results = await self._analyze_many(subs)
+        except TRANSIENT_ERRORS as e:
+            # Splitting would multiply requests that fail for the same reason - the scheduler retries later
+            logger.warning(f"LLM request failed ({type(e).__name__}), leaving {len(subs)} subreddits for later")
+            return {}
+        except Exception as e:
+            logger.warning(f"Batched LLM analysis of {len(subs)} subreddits failed: {e}")
+            request_failed = True
+        
+        missing = [sub for sub in subs if sub["subreddit_name"] not in results]
+        if not missing:
+            return results
+        
+        self.usage["retried"] += len(missing)
+        if request_failed:
+            # Nothing usable came back - retry each half as its own batch
+            half = len(subs) // 2
+            parts = [subs[:half], subs[half:]]
+        else:
+            logger.warning(f"LLM batch left out {len(missing)}/{len(subs)} subreddits, retrying them individually")
+            parts = [[sub] for sub in missing]
+        
+        for part_results in await asyncio.gather(*(self._analyze_prepared(part) for part in parts)):
+            results.update(part_results)
+        return results
+    
+    async def _analyze_one(self, subreddit_name: str, description: str, rules: list, subscribers: int) -> dict:
+        """One chat completion for one subreddit. Raises on API or JSON errors."""
+        prompt = self._build_prompt(subreddit_name, description, self._rules_text(rules), subscribers)
+        
+        # Call OpenAI API
+        response = await self._create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=500,
+            response_format={"type": "json_object"}
+        )
+        prompt_tokens, completion_tokens = self._record_usage(response)
+        
+        # Parse response
+        result = json.loads(response.choices[0].message.content)
+        self._remember(description, rules, result, prompt_tokens, completion_tokens)
+        
+        logger.info(f"LLM analyzed r/{subreddit_name}: {result.get('confidence', 'unknown')} confidence")
+        
+        return result
+    
+    async def _analyze_many(self, subs: list[dict]) -> dict:
+        """
+        One structured-output chat completion for several subreddits.
+        Returns the valid entries only, keyed by the caller's subreddit_name.
+        """
+        response = await self._create(**self.batch_request_body(subs))
+        prompt_tokens, completion_tokens = self._record_usage(response)
+        
+        results = self.collect_results(subs, response.choices[0].message.content, prompt_tokens, completion_tokens)
+        logger.info(f"LLM analyzed {len(results)}/{len(subs)} subreddits in one request")
+        return results
+    
+    async def _create(self, **params):
+        """Chat completion that passes the response's rate-limit headers to self.rate_limits."""
+        try:
+            raw = await self.client.chat.completions.with_raw_response.create(**params)
+        except RateLimitError as e:
+            self.rate_limits.throttle(e.response.headers)
+            raise
+        self.rate_limits.update(raw.headers)
+        return raw.parse()
+    
+    def batch_request_body(self, subs: list[dict]) -> dict:
+        """Chat completion parameters for a multi-subreddit prompt (also used for Batch API files)."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": self._build_batch_prompt(subs)}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 500 * len(subs),
+            "response_format": BATCH_RESPONSE_FORMAT,
+        }
+    
+    def collect_results(self, subs: list[dict], content: str, prompt_tokens: int = 0,
+                        completion_tokens: int = 0) -> dict:
+        """
+        Valid entries of a multi-subreddit answer, keyed by the caller's
+        subreddit_name, cached as they are found. Raises on unparseable JSON.
+        """
+        subs_by_name = {sub["subreddit_name"].lower(): sub for sub in subs}
+        results = {}
+        for entry in json.loads(content).get("results", []):
+            if not isinstance(entry, dict):
+                continue
+            sub = subs_by_name.get(str(entry.get("subreddit", "")).lower().removeprefix("r/"))
+            result = self._validate_result(entry)
+            if sub and result and sub["subreddit_name"] not in results:
+                results[sub["subreddit_name"]] = result
+                # The request's tokens, shared evenly by the subs in it
+                self._remember(
+                    sub["description"], sub["rules"], result,
+                    prompt_tokens // len(subs), completion_tokens // len(subs)
+                )
+        return results
+    
+    @staticmethod
+    def _validate_result(entry: dict) -> Optional[dict]:
+        """The analysis fields of one batch entry, or None if any is missing or malformed."""
+        categories = entry.get("niche_categories")
+        if not (
+            isinstance(entry.get("verification_required"), bool)
+            and entry.get("sellers_allowed") in SELLERS_VALUES
+            and isinstance(categories, list) and all(isinstance(c, str) for c in categories)
+            and entry.get("confidence") in CONFIDENCE_VALUES
+            and isinstance(entry.get("reasoning"), str)
+        ):
+            return None
+        return {
+            "verification_required": entry["verification_required"],
+            "sellers_allowed": entry["sellers_allowed"],
+            "niche_categories": categories,
+            "confidence": entry["confidence"],
+            "reasoning": entry["reasoning"],
+        }
+    
+    def _record_usage(self, response) -> tuple[int, int]:
+        """Count a request's tokens; returns (prompt_tokens, completion_tokens)."""
+        self.usage["requests"] += 1
+        if not response.usage:
+            return 0, 0
+        self.usage["prompt_tokens"] += response.usage.prompt_tokens
+        self.usage["completion_tokens"] += response.usage.completion_tokens
+        self.rate_limits.record(response.usage.prompt_tokens + response.usage.completion_tokens)
+        return response.usage.prompt_tokens, response.usage.completion_tokens
+    
+    def tokens_per_subreddit(self) -> float:
+        tokens = self.usage["prompt_tokens"] + self.usage["completion_tokens"]
+        return tokens / self.usage["subreddits"] if self.usage["subreddits"] else 0.0
+    
+    @staticmethod
+    def _rules_text(rules: list) -> str:
+        return "\n".join([
+            f"- {rule.get('short_name', 'Rule')}: {rule.get('description', '')}"
+            for rule in rules
+        ]) if rules else "No rules provided"
+    
+    @staticmethod
+    def _describe(subreddit_name: str, description: str, rules_text: str, subscribers: int) -> str:
+        """The per-subreddit section shared by single and batched prompts."""
         subs_str = f"{subscribers:,}" if subscribers else "Unknown"
         
-        return f"""Analyze this NSFW subreddit and extract key information:
-
-**Subreddit:** r/{subreddit_name}
+        return f"""**Subreddit:** r/{subreddit_name}
 **Subscribers:** {subs_str}
 **Description:** {description or "No description"}
 
 **Rules:**
-{rules_text}
-
-Determine:
-
-1. **Verification Required**: Does this subreddit require users to verify their identity?
-
-2. **Sellers Allowed**: Are OnlyFans creators, sellers, or self-promotion allowed?
-   - Return "allowed" if creators/sellers are explicitly welcome OR no restrictions mentioned
-   - Return "not_allowed" if there are explicit bans on OnlyFans, sellers, or "amateur only" rules
-   - Return "unknown" if unclear
+{rules_text}"""
+    
+    def _build_prompt(self, subreddit_name: str, description: str, rules_text: str, subscribers: int) -> str:
+        """Build the analysis prompt."""
+        return f"""Analyze this NSFW subreddit and extract key information:
 
-3. **Niche Categories**: Main content themes (e.g., amateur, petite, asian, milf, etc.)
+{self._describe(subreddit_name, description, rules_text, subscribers)}
 
-4. **Confidence**: How confident are you? (high/medium/low)
+{ANALYSIS_CRITERIA}
 
 Return JSON:
 {{
@@ -183,6 +516,34 @@ Return JSON:
   "reasoning": "Brief explanation"
 }}"""
     
+    def _build_batch_prompt(self, subs: list[dict]) -> str:
+        """Build one prompt covering several subreddits - instructions once, then each sub."""
+        sections = "\n\n".join(
+            f"### Subreddit {number}\n" + self._describe(
+                sub["subreddit_name"], sub["description"], self._rules_text(sub["rules"]), sub.get("subscribers", 0)
+            )
+            for number, sub in enumerate(subs, 1)
+        )
+        return f"""Analyze each of these {len(subs)} NSFW subreddits and extract key information:
+
+{sections}
+
+For each subreddit, {ANALYSIS_CRITERIA[0].lower()}{ANALYSIS_CRITERIA[1:]}
+
+Return JSON with exactly one entry per subreddit, using the subreddit name without "r/":
+{{
+  "results": [
+    {{
+      "subreddit": "name",
+      "verification_required": true or false,
+      "sellers_allowed": "allowed" or "not_allowed" or "unknown",
+      "niche_categories": ["category1", "category2"],
+      "confidence": "high" or "medium" or "low",
+      "reasoning": "Brief explanation"
+    }}
+  ]
+}}"""
+    
     def _get_fallback_result(self) -> dict:
         """Return fallback result if LLM analysis fails."""
         return {
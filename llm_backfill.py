@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Bulk LLM backfill through the OpenAI Batch API.
+
+The online loop in crawler_llm.py works through the backlog at the account's
+rate limits and full price. This script clears the backlog in one go, at the
+Batch API's lower price:
+
+  1. export   page through every sub missing LLM analysis, fetch its rules,
+              answer what the result cache and the rule classifier can,
+              and write the rest as Batch API request lines
+              (LLM_SUBS_PER_PROMPT subs per line)
+  2. submit   upload each request file and create a batch job
+  3. poll     until the job is finished (24h completion window)
+  4. import   stream the output file, validate the entries and write them
+              back with buffered bulk upserts (LLM columns only)
+
+Submitted subs are claimed (llm_claimed_until, sql/003_llm_backfill_claims.sql)
+so the online loop doesn't analyze them again while the job runs. Without
+the column the script refuses to submit unless --without-claims says
+crawler_llm.py is stopped. Import releases the claims: entries the model
+left out and failed request lines are not retried here, those subs go back
+to the online loop. So do the subs of a job that ended (failed, expired,
+cancelled) without any output; the job is marked finished.
+
+Request files, custom_id -> subs manifests and batch ids are kept in
+LLM_BACKFILL_DIR, so an interrupted run continues with --resume instead of
+paying for the same requests again.
+
+Usage:
+    python llm_backfill.py [--limit N] [--dry-run] [--without-claims]
+    python llm_backfill.py --resume
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from llm_analyzer import SubredditLLMAnalyzer, token_cost
+from supabase_client import SupabaseClient
+from config import (
+    LLM_SUBS_PER_PROMPT,
+    LLM_BACKFILL_DIR,
+    LLM_BACKFILL_PAGE_SIZE,
+    LLM_BACKFILL_FETCH_CONCURRENCY,
+    LLM_BACKFILL_MAX_REQUESTS,
+    LLM_BACKFILL_MAX_BYTES,
+    LLM_BACKFILL_POLL_SECONDS,
+    LLM_BACKFILL_CLAIM_SECONDS,
+    LLM_BATCH_PRICE_FACTOR,
+    LOG_LEVEL,
+    LOG_FORMAT,
+)
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class LLMBackfill:
+    """Exports the LLM backlog to Batch API jobs and imports their results."""
+
+    def __init__(self, supabase: Optional[SupabaseClient] = None,
+                 analyzer: Optional[SubredditLLMAnalyzer] = None, work_dir: Optional[str] = None):
+        self.supabase = supabase or SupabaseClient()
+        self.analyzer = analyzer or SubredditLLMAnalyzer()
+        self.work_dir = work_dir or LLM_BACKFILL_DIR
+        self.poll_seconds = LLM_BACKFILL_POLL_SECONDS
+        self.stats = {
+            "exported": 0, "cached": 0, "requests": 0, "written": 0, "missing": 0,
+            "failed_requests": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        }
+
+    def _path(self, job: str, kind: str) -> str:
+        return os.path.join(self.work_dir, f"{job}.{kind}")
+
+    def _save_state(self, job: str, state: dict):
+        with open(self._path(job, "batch.json"), "w") as f:
+            json.dump(state, f)
+
+    def _load_state(self, job: str) -> Optional[dict]:
+        path = self._path(job, "batch.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _job_subs(self, job: str) -> list[str]:
+        with open(self._path(job, "manifest.json")) as f:
+            manifest = json.load(f)
+        return [sub["subreddit_name"] for subs in manifest.values() for sub in subs]
+
+    async def _claim(self, job: str, claim: bool):
+        """Hide the job's subs from the online loop, or hand them back."""
+        if not await self.supabase.has_llm_claims():
+            return
+        names = self._job_subs(job)
+        until = datetime.now(timezone.utc) + timedelta(seconds=LLM_BACKFILL_CLAIM_SECONDS) if claim else None
+        await self.supabase.set_llm_claims(names, until)
+        logger.info(f"{job}: {'claimed' if claim else 'released'} {len(names):,} subs")
+
+    # ------------------------------------------------------------------ export
+
+    async def export(self, limit: Optional[int] = None) -> list[str]:
+        """
+        Write request files for the whole backlog (or its first `limit` subs).
+        Returns the job names, one per request file.
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        prefix = f"backfill-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}"
+        jobs: list[str] = []
+        writer = None
+        manifest: dict[str, list] = {}
+        lines = size = 0
+        cached_results: dict[str, dict] = {}
+
+        def close_job():
+            writer.close()
+            with open(self._path(jobs[-1], "manifest.json"), "w") as f:
+                json.dump(manifest, f)
+
+        offset = 0
+        while limit is None or offset < limit:
+            page_size = LLM_BACKFILL_PAGE_SIZE if limit is None else min(LLM_BACKFILL_PAGE_SIZE, limit - offset)
+            rows = await self.supabase.get_subs_missing_llm(limit=page_size, offset=offset)
+            if not rows:
+                break
+            offset += len(rows)
+
+            for start in range(0, len(rows), LLM_BACKFILL_FETCH_CONCURRENCY):
+                cached, uncached = await self.analyzer.prepare(rows[start:start + LLM_BACKFILL_FETCH_CONCURRENCY])
+                cached_results.update(cached)
+                for i in range(0, len(uncached), LLM_SUBS_PER_PROMPT):
+                    group = uncached[i:i + LLM_SUBS_PER_PROMPT]
+                    custom_id = f"req-{self.stats['requests']}"
+                    line = json.dumps({
+                        "custom_id": custom_id,
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": self.analyzer.batch_request_body(group),
+                    }) + "\n"
+
+                    if writer is None or lines >= LLM_BACKFILL_MAX_REQUESTS or size + len(line) > LLM_BACKFILL_MAX_BYTES:
+                        if writer is not None:
+                            close_job()
+                        jobs.append(f"{prefix}-{len(jobs) + 1}")
+                        writer = open(self._path(jobs[-1], "requests.jsonl"), "w")
+                        manifest, lines, size = {}, 0, 0
+
+                    writer.write(line)
+                    manifest[custom_id] = [
+                        {"subreddit_name": sub["subreddit_name"], "description": sub["description"], "rules": sub["rules"]}
+                        for sub in group
+                    ]
+                    lines += 1
+                    size += len(line)
+                    self.stats["requests"] += 1
+                    self.stats["exported"] += len(group)
+
+            logger.info(f"Exported {offset:,} subs ({self.stats['requests']:,} requests, {len(cached_results):,} answered locally)")
+            if len(rows) < page_size:
+                break
+
+        if writer is not None:
+            close_job()
+
+        # Written only now - rows leaving the backlog mid-export would shift the pages
+        for name, result in cached_results.items():
+            await self.supabase.update_llm_analysis(name, result)
+        await self.supabase.flush()
+        self.stats["cached"] += len(cached_results)
+        self.stats["written"] += len(cached_results)
+        return jobs
+
+    # ------------------------------------------------------------ submit / poll
+
+    async def submit(self, job: str) -> dict:
+        # Before the job exists - a failed claim must not leave an unclaimed job running
+        await self._claim(job, claim=True)
+        with open(self._path(job, "requests.jsonl"), "rb") as f:
+            upload = await self.analyzer.client.files.create(file=f, purpose="batch")
+        batch = await self.analyzer.client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={"job": job},
+        )
+        state = {"batch_id": batch.id, "input_file_id": upload.id, "status": batch.status, "imported": False}
+        self._save_state(job, state)
+        logger.info(f"Submitted {job} as {batch.id}")
+        return state
+
+    async def poll(self, job: str, state: dict):
+        """Wait for the batch to reach a final status; returns the batch object."""
+        while True:
+            batch = await self.analyzer.client.batches.retrieve(state["batch_id"])
+            counts = batch.request_counts
+            if counts:
+                logger.info(f"{job}: {batch.status} - {counts.completed}/{counts.total} done, {counts.failed} failed")
+            state["status"] = batch.status
+            self._save_state(job, state)
+            if batch.status in FINAL_STATUSES:
+                return batch
+            await asyncio.sleep(self.poll_seconds)
+
+    # ------------------------------------------------------------------ import
+
+    async def import_results(self, job: str, state: dict, batch) -> int:
+        """Stream the output file into the intel table. Returns subs written."""
+        if not batch.output_file_id:
+            # Nothing to import and nothing to wait for - finish the job so --resume doesn't poll it forever
+            logger.error(f"{job}: batch {batch.status} without output, subs go back to the online loop")
+            await self._claim(job, claim=False)
+            state["imported"] = True
+            self._save_state(job, state)
+            return 0
+
+        with open(self._path(job, "manifest.json")) as f:
+            manifest = json.load(f)
+
+        written = 0
+        async with self.analyzer.client.files.with_streaming_response.content(batch.output_file_id) as response:
+            async for line in response.iter_lines():
+                if line.strip():
+                    written += await self._apply_line(json.loads(line), manifest)
+        await self.supabase.flush()
+        # Written subs have left the backlog; the rest go back to the online loop
+        await self._claim(job, claim=False)
+
+        state["imported"] = True
+        self._save_state(job, state)
+        logger.info(f"{job}: imported {written:,} results")
+        return written
+
+    async def _apply_line(self, line: dict, manifest: dict) -> int:
+        subs = manifest.get(line.get("custom_id"))
+        response = line.get("response") or {}
+        if not subs:
+            return 0
+        if response.get("status_code") != 200:
+            self.stats["failed_requests"] += 1
+            self.stats["missing"] += len(subs)
+            logger.debug(f"{line.get('custom_id')} failed: {line.get('error') or response.get('status_code')}")
+            return 0
+
+        body = response["body"]
+        usage = body.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        self.stats["prompt_tokens"] += prompt_tokens
+        self.stats["completion_tokens"] += completion_tokens
+        try:
+            results = self.analyzer.collect_results(
+                subs, body["choices"][0]["message"]["content"], prompt_tokens, completion_tokens
+            )
+        except Exception as e:
+            logger.warning(f"Unparseable answer for {line.get('custom_id')}: {e}")
+            results = {}
+
+        for name, result in results.items():
+            await self.supabase.update_llm_analysis(name, result)
+        self.stats["written"] += len(results)
+        self.stats["missing"] += len(subs) - len(results)
+        return len(results)
+
+    # --------------------------------------------------------------------- run
+
+    def pending_jobs(self) -> list[str]:
+        """Jobs in the work dir whose results were not imported yet."""
+        if not os.path.isdir(self.work_dir):
+            return []
+        jobs = sorted(name[:-len(".requests.jsonl")] for name in os.listdir(self.work_dir)
+                      if name.endswith(".requests.jsonl"))
+        return [job for job in jobs if not (self._load_state(job) or {}).get("imported")]
+
+    async def process(self, job: str):
+        state = self._load_state(job) or await self.submit(job)
+        batch = await self.poll(job, state)
+        await self.import_results(job, state, batch)
+
+    async def run(self, limit: Optional[int] = None, dry_run: bool = False, resume: bool = False,
+                  without_claims: bool = False):
+        start = time.monotonic()
+        if not dry_run and not without_claims and not await self.supabase.has_llm_claims():
+            logger.error(
+                "Can't claim the exported subs, so crawler_llm.py would analyze them again at full price. "
+                "Run sql/003_llm_backfill_claims.sql, or stop crawler_llm.py and pass --without-claims."
+            )
+            return
+        jobs = self.pending_jobs() if resume else await self.export(limit)
+        logger.info(
+            f"{len(jobs)} batch job(s): {self.stats['exported']:,} subs in {self.stats['requests']:,} requests, "
+            f"{self.stats['cached']:,} answered locally (cache / rule classifier)"
+        )
+        if not dry_run:
+            # Jobs run concurrently on OpenAI's side - submit all, then wait for each
+            await asyncio.gather(*(self.process(job) for job in jobs))
+        self.log_stats(time.monotonic() - start)
+
+    def log_stats(self, seconds: float):
+        cost = token_cost(self.stats["prompt_tokens"], self.stats["completion_tokens"]) * LLM_BATCH_PRICE_FACTOR
+        logger.info(f"\n{'='*80}")
+        logger.info("LLM BACKFILL")
+        logger.info(f"  Written:  {self.stats['written']:,} ({self.stats['cached']:,} from the cache / rule classifier)")
+        logger.info(
+            f"  Missing:  {self.stats['missing']:,} ({self.stats['failed_requests']:,} failed requests) "
+            f"- left for the online loop"
+        )
+        logger.info(
+            f"  Tokens:   {self.stats['prompt_tokens']:,} in / {self.stats['completion_tokens']:,} out, "
+            f"${cost:.2f} at batch prices"
+        )
+        logger.info(f"  Runtime:  {seconds / 60:.1f} min")
+        logger.info(f"{'='*80}\n")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill LLM analysis through the OpenAI Batch API")
+    parser.add_argument("--limit", type=int, help="Export at most this many subs")
+    parser.add_argument("--dry-run", action="store_true", help="Write the request files but don't submit them")
+    parser.add_argument("--resume", action="store_true", help="Submit/poll/import unfinished jobs in the work dir")
+    parser.add_argument("--without-claims", action="store_true",
+                        help="Run without sql/003_llm_backfill_claims.sql (crawler_llm.py must be stopped)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL),
+        format=LOG_FORMAT,
+        handlers=[logging.StreamHandler(sys.stdout), logging.FileHandler("logs/llm_backfill.log")],
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    backfill = LLMBackfill()
+    try:
+        await backfill.run(
+            limit=args.limit, dry_run=args.dry_run, resume=args.resume, without_claims=args.without_claims
+        )
+    finally:
+        await backfill.supabase.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
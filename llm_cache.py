@@ -0,0 +1,147 @@
+"""
+Content-hash cache for LLM subreddit analysis.
+
+Results are keyed by a hash of what the model actually judged - model name,
+prompt version, description and normalized rules - so a sub whose row was
+reset, or a different sub with identical rules, is answered from the cache
+instead of a new OpenAI call. Only the verdict is stored (verification,
+sellers, confidence): the prompt also names the sub, so its niches and
+reasoning are not shared. Each entry keeps the tokens it cost, which is
+what a later hit saves.
+
+The cache is a local SQLite file (WAL), read and written on every lookup
+rather than held in memory, so several worker processes on the host share
+it. A per-day table counts hits, misses and the tokens saved across all of
+them.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens_saved INTEGER NOT NULL DEFAULT 0,
+    completion_tokens_saved INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def cache_key(model: str, prompt_version: int, description: Optional[str], rules: Optional[list]) -> str:
+    """Hash of the analysis inputs; rule order, case and whitespace don't matter."""
+    normalized_rules = sorted(
+        (_normalize(rule.get("short_name")), _normalize(rule.get("description")))
+        for rule in rules or []
+    )
+    payload = json.dumps([model, prompt_version, _normalize(description), normalized_rules])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResultCache:
+    """Parsed LLM results by input hash, with per-day savings counters."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats = {"hits": 0, "misses": 0, "prompt_tokens_saved": 0, "completion_tokens_saved": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Other processes write too - wait for their transactions instead of failing
+            self._conn = sqlite3.connect(self.path, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _count(self, conn: sqlite3.Connection, hit: bool, prompt_tokens: int = 0, completion_tokens: int = 0):
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        conn.execute(
+            "INSERT INTO daily (day, hits, misses, prompt_tokens_saved, completion_tokens_saved) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(day) DO UPDATE SET "
+            "hits = hits + excluded.hits, misses = misses + excluded.misses, "
+            "prompt_tokens_saved = prompt_tokens_saved + excluded.prompt_tokens_saved, "
+            "completion_tokens_saved = completion_tokens_saved + excluded.completion_tokens_saved",
+            (day, int(hit), int(not hit), prompt_tokens, completion_tokens),
+        )
+
+    def get(self, key: str) -> Optional[dict]:
+        """Cached result for these inputs, or None. Counts the lookup either way."""
+        try:
+            conn = self._connect()
+            with conn:
+                row = conn.execute(
+                    "SELECT result, prompt_tokens, completion_tokens FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.stats["misses"] += 1
+                    self._count(conn, hit=False)
+                    return None
+                result, prompt_tokens, completion_tokens = row
+                self.stats["hits"] += 1
+                self.stats["prompt_tokens_saved"] += prompt_tokens
+                self.stats["completion_tokens_saved"] += completion_tokens
+                self._count(conn, hit=True, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+                return json.loads(result)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read LLM cache {self.path}: {e}")
+            return None
+
+    def put(self, key: str, result: dict, prompt_tokens: int, completion_tokens: int):
+        """Store a validated result with the tokens it cost."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, result, prompt_tokens, completion_tokens, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(result), prompt_tokens, completion_tokens, time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write LLM cache {self.path}: {e}")
+
+    def hit_ratio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def daily(self, days: int = 7) -> list[dict]:
+        """Per-day counters from all processes sharing the file, newest first."""
+        try:
+            rows = self._connect().execute(
+                "SELECT day, hits, misses, prompt_tokens_saved, completion_tokens_saved "
+                "FROM daily ORDER BY day DESC LIMIT ?", (days,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read LLM cache stats {self.path}: {e}")
+            return []
+        return [
+            {"day": day, "hits": hits, "misses": misses,
+             "prompt_tokens_saved": prompt_saved, "completion_tokens_saved": completion_saved}
+            for day, hits, misses, prompt_saved, completion_saved in rows
+        ]
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,249 @@
+"""
+Continuous LLM analysis scheduler.
+
+Keeps a local queue of subs missing LLM analysis topped up from the DB and
+dispatches requests of LLM_SUBS_PER_PROMPT subs as fast as the OpenAI limits
+allow, instead of sleeping a fixed interval between small batches:
+
+- spacing and holds come from OpenAIRateLimits (the x-ratelimit-* headers),
+- the number of requests in flight is sized from the backlog and from the
+  request budget times the observed request latency, capped at
+  LLM_MAX_CONCURRENT,
+- the loop only idles when the backlog is empty.
+
+With a prepare callback, refills run in the background and rows go through
+it before they are queued (rules fetched, cache and rule classifier
+answered), so requests are packed with subs that really need the model.
+
+Subs handed to the LLM are not queued again for LLM_REQUEUE_SECONDS: their
+results sit in the write buffer for a moment, and failures should not be
+retried in a tight loop.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from openai_limits import OpenAIRateLimits
+from config import (
+    LLM_BATCH_SIZE,
+    LLM_MAX_CONCURRENT,
+    LLM_SUBS_PER_PROMPT,
+    LLM_IDLE_SECONDS,
+    LLM_REQUEUE_SECONDS,
+    LLM_BACKLOG_REFRESH_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Token estimate per sub until responses have been seen
+DEFAULT_TOKENS_PER_SUB = 500
+# Most rows fetched in one refill, however many subs are being skipped
+MAX_FETCH = 1000
+
+
+class LLMScheduler:
+    """Backlog- and rate-limit-driven dispatcher for LLM analysis requests."""
+
+    def __init__(self, supabase, analyze: Callable[[list[dict]], Awaitable[None]], limits: OpenAIRateLimits,
+                 subs_per_request: Optional[int] = None, max_in_flight: Optional[int] = None,
+                 prepare: Optional[Callable[[list[dict]], Awaitable[list[dict]]]] = None):
+        self.supabase = supabase
+        self.analyze = analyze  # Analyzes and stores one group of rows; must not raise
+        self.prepare = prepare  # Handles what it can locally, returns the rows that still need the model
+        self.limits = limits
+        self.subs_per_request = max(subs_per_request or LLM_SUBS_PER_PROMPT, 1)
+        self.max_in_flight = max_in_flight or LLM_MAX_CONCURRENT
+        self.idle_seconds = LLM_IDLE_SECONDS
+        self.requeue_seconds = LLM_REQUEUE_SECONDS
+        self.backlog_refresh_seconds = LLM_BACKLOG_REFRESH_SECONDS
+
+        self.queue: deque = deque()
+        self.handed_out: dict[str, float] = {}  # lowercase name -> when it was queued
+        self.in_flight = 0
+        self.backlog: Optional[int] = None
+        self._backlog_checked = 0.0
+        self._latency = 0.0  # Moving average of seconds per request
+        self._wakeup = asyncio.Event()  # Set when a request finishes or a refill lands
+        self._refill_task: Optional[asyncio.Task] = None
+        self._drained = False  # The last refill found nothing new in the DB
+        self._tasks: set = set()
+        self.stats = {"requests": 0, "subs": 0, "idle_waits": 0, "answered_locally": 0}
+
+    def estimated_tokens(self) -> float:
+        """Expected tokens for the next request."""
+        return self.limits.tokens_per_request(default=DEFAULT_TOKENS_PER_SUB * self.subs_per_request)
+
+    def target_in_flight(self) -> int:
+        """How many requests to keep in flight right now."""
+        target = self.max_in_flight
+        budget = self.limits.request_budget(self.estimated_tokens())
+        if budget and self._latency:
+            # Enough to use the per-minute budget at the observed latency (Little's law), plus one
+            target = min(target, math.ceil(budget / self.limits.period * self._latency) + 1)
+        backlog = max(self.backlog or 0, len(self.queue))
+        if backlog:
+            target = min(target, math.ceil(backlog / self.subs_per_request))
+        return max(target, 1)
+
+    async def _refresh_backlog(self):
+        if time.monotonic() - self._backlog_checked < self.backlog_refresh_seconds:
+            return
+        self._backlog_checked = time.monotonic()
+        count = await self.supabase.count_subs_missing_llm()
+        if count is not None:
+            self.backlog = count
+
+    async def refill(self) -> int:
+        """Queue more subs from the DB. Returns how many were added."""
+        want = max(LLM_BATCH_SIZE, self.subs_per_request * self.target_in_flight() * 2) - len(self.queue)
+        if want <= 0:
+            return 0
+
+        cutoff = time.monotonic() - self.requeue_seconds
+        self.handed_out = {name: at for name, at in self.handed_out.items() if at > cutoff}
+
+        # Rows still being analyzed (or just written) come back too - over-fetch and skip them,
+        # paging on if more than MAX_FETCH of them sit at the top of the backlog
+        limit = min(want + len(self.handed_out), MAX_FETCH)
+        now = time.monotonic()
+        new = []
+        offset = 0
+        while len(new) < want:
+            rows = await self.supabase.get_subs_missing_llm(limit=limit, offset=offset)
+            for row in rows:
+                name = row["subreddit_name"].lower()
+                if name in self.handed_out:
+                    continue
+                self.handed_out[name] = now
+                new.append(row)
+                if len(new) >= want:
+                    break
+            if len(rows) < limit:
+                break
+            offset += len(rows)
+        self._drained = not new
+
+        if not self.prepare:
+            self.queue.extend(new)
+            return len(new)
+
+        # A few requests' worth at a time, so dispatching can start on the first ones
+        added = 0
+        step = self.subs_per_request * 4
+        for start in range(0, len(new), step):
+            chunk = new[start:start + step]
+            remaining = await self.prepare(chunk)
+            answered = len(chunk) - len(remaining)
+            self.stats["answered_locally"] += answered
+            if self.backlog:
+                self.backlog = max(self.backlog - answered, 0)
+            self.queue.extend(remaining)
+            added += len(remaining)
+            self._wakeup.set()
+        return added
+
+    async def _background_refill(self):
+        try:
+            await self.refill()
+        except Exception as e:
+            logger.error(f"Error refilling LLM queue: {e}")
+        finally:
+            self._wakeup.set()
+
+    def _refilling(self) -> bool:
+        return self._refill_task is not None and not self._refill_task.done()
+
+    async def _wait(self, timeout: float):
+        self._wakeup.clear()
+        # Not wait_for: on 3.11 it can swallow a cancel that lands as the event is set
+        try:
+            async with asyncio.timeout(timeout):
+                await self._wakeup.wait()
+        except TimeoutError:
+            pass
+
+    def _dispatch(self, group: list[dict]):
+        self.in_flight += 1
+        self.limits.started()  # Marked here, not per HTTP call: the next delay() runs before this task does
+        self.stats["requests"] += 1
+        self.stats["subs"] += len(group)
+        task = asyncio.create_task(self._run_group(group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_group(self, group: list[dict]):
+        started = time.monotonic()
+        try:
+            await self.analyze(group)
+        except Exception as e:
+            logger.error(f"Error analyzing {len(group)} subreddits: {e}")
+        finally:
+            elapsed = time.monotonic() - started
+            self._latency = elapsed if not self._latency else 0.8 * self._latency + 0.2 * elapsed
+            self.in_flight -= 1
+            if self.backlog:
+                self.backlog = max(self.backlog - len(group), 0)
+            self._wakeup.set()
+
+    async def run(self):
+        """Dispatch until cancelled."""
+        logger.info("Starting LLM scheduler...")
+        while True:
+            try:
+                await self._refresh_backlog()
+                if len(self.queue) < self.subs_per_request * self.target_in_flight() and not self._refilling():
+                    if self.prepare:
+                        # Preparing fetches rules from Reddit - keep dispatching meanwhile
+                        self._refill_task = asyncio.create_task(self._background_refill())
+                    else:
+                        await self.refill()
+
+                if not self.queue:
+                    if self.in_flight or self._refilling():
+                        await self._wait(timeout=5)
+                    elif self._drained:
+                        self.stats["idle_waits"] += 1
+                        logger.info(f"No subreddits need LLM analysis. Waiting {self.idle_seconds}s...")
+                        await asyncio.sleep(self.idle_seconds)
+                        self._backlog_checked = 0.0
+                    continue
+
+                if self.in_flight >= self.target_in_flight():
+                    await self._wait(timeout=5)
+                    continue
+
+                delay = self.limits.delay(self.estimated_tokens())
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                group = [self.queue.popleft() for _ in range(min(self.subs_per_request, len(self.queue)))]
+                self._dispatch(group)
+
+            except Exception as e:
+                logger.error(f"LLM scheduler error: {e}")
+                await asyncio.sleep(5)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "backlog": self.backlog,
+            "queued": len(self.queue),
+            "in_flight": self.in_flight,
+            "target_in_flight": self.target_in_flight(),
+            "rpm": self.limits.rpm(),
+            "tpm": self.limits.tpm(),
+            "limit_requests": self.limits.limit_requests,
+            "limit_tokens": self.limits.limit_tokens,
+            "throttled": self.limits.throttled,
+        }
+
+    def close(self):
+        """Cancel requests still in flight (their subs stay in the backlog)."""
+        if self._refill_task:
+            self._refill_task.cancel()
+        for task in list(self._tasks):
+            task.cancel()
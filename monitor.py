@@ -89,25 +89,25 @@ class Monitor:
         
         # Recent scraping activity
         try:
-            recent_1h = self.supabase.client.table("nsfw_subreddit_intel").select(
+            recent_1h = await self.supabase.execute(self.supabase.client.table("nsfw_subreddit_intel").select(
                 "*", count="exact", head=True
-            ).eq("scrape_status", "completed").gte("last_scraped_at", one_hour_ago).execute()
+            ).eq("scrape_status", "completed").gte("last_scraped_at", one_hour_ago))
             recent_1h_count = recent_1h.count or 0
         except:
             recent_1h_count = 0
         
         try:
-            recent_6h = self.supabase.client.table("nsfw_subreddit_intel").select(
+            recent_6h = await self.supabase.execute(self.supabase.client.table("nsfw_subreddit_intel").select(
                 "*", count="exact", head=True
-            ).eq("scrape_status", "completed").gte("last_scraped_at", six_hours_ago).execute()
+            ).eq("scrape_status", "completed").gte("last_scraped_at", six_hours_ago))
             recent_6h_count = recent_6h.count or 0
         except:
             recent_6h_count = 0
         
         try:
-            recent_24h = self.supabase.client.table("nsfw_subreddit_intel").select(
+            recent_24h = await self.supabase.execute(self.supabase.client.table("nsfw_subreddit_intel").select(
                 "*", count="exact", head=True
-            ).eq("scrape_status", "completed").gte("last_scraped_at", twenty_four_hours_ago).execute()
+            ).eq("scrape_status", "completed").gte("last_scraped_at", twenty_four_hours_ago))
             recent_24h_count = recent_24h.count or 0
         except:
             recent_24h_count = 0
@@ -0,0 +1,148 @@
+"""
+OpenAI rate-limit tracking from response headers.
+
+Every chat completion response carries the account's limits and what is
+left of them:
+
+  x-ratelimit-limit-requests / x-ratelimit-limit-tokens          per minute
+  x-ratelimit-remaining-requests / x-ratelimit-remaining-tokens
+  x-ratelimit-reset-requests / x-ratelimit-reset-tokens          e.g. "1s", "6m0s", "20ms"
+
+OpenAIRateLimits keeps the latest values and the requests/tokens actually
+used over the last minute (`period`, shortened only in benchmarks), and tells the LLM scheduler how long to wait
+before the next request: requests are spaced to stay within headroom of both
+per-minute limits, and held until the reset when the remaining budget is
+nearly gone. Until the first response arrives there is no pacing beyond the
+scheduler's concurrency cap.
+"""
+import re
+import time
+from collections import deque
+from typing import Mapping, Optional
+
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in an OpenAI reset header ("6m0s", "1.5s", "20ms"), None if absent."""
+    if not value:
+        return None
+    parts = DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds from a 429's retry-after-ms / retry-after header, None if absent."""
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers[name]) * scale
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class OpenAIRateLimits:
+    """Latest x-ratelimit-* values plus achieved request/token rates."""
+
+    def __init__(self, headroom: float = 0.9, period: float = 60.0):
+        self.headroom = headroom
+        self.period = period  # Seconds the per-minute limits refer to
+        self.limit_requests: Optional[int] = None
+        self.limit_tokens: Optional[int] = None
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.requests_reset_at = 0.0
+        self.tokens_reset_at = 0.0
+        self._last_start = 0.0
+        self.hold_until = 0.0  # After a 429: no requests before this
+        self._events: deque = deque()  # (monotonic, tokens) per completed request
+        self.throttled = 0  # Responses that came back 429
+
+    def update(self, headers: Mapping[str, str]):
+        """Take the limits from a response's headers."""
+        now = time.monotonic()
+        self.limit_requests = _int(headers.get("x-ratelimit-limit-requests")) or self.limit_requests
+        self.limit_tokens = _int(headers.get("x-ratelimit-limit-tokens")) or self.limit_tokens
+        remaining_requests = _int(headers.get("x-ratelimit-remaining-requests"))
+        remaining_tokens = _int(headers.get("x-ratelimit-remaining-tokens"))
+        if remaining_requests is not None:
+            self.remaining_requests = remaining_requests
+            self.requests_reset_at = now + (parse_duration(headers.get("x-ratelimit-reset-requests")) or 0)
+        if remaining_tokens is not None:
+            self.remaining_tokens = remaining_tokens
+            self.tokens_reset_at = now + (parse_duration(headers.get("x-ratelimit-reset-tokens")) or 0)
+
+    def throttle(self, headers: Mapping[str, str]):
+        """A request came back 429 - hold all requests for its retry-after."""
+        self.throttled += 1
+        self.update(headers)
+        retry_after = retry_after_seconds(headers)
+        self.hold_until = max(self.hold_until, time.monotonic() + (retry_after if retry_after is not None else 1.0))
+
+    def record(self, tokens: int):
+        """A request finished and used this many tokens."""
+        self._events.append((time.monotonic(), tokens))
+        self._trim()
+
+    def started(self):
+        """A request is being sent now."""
+        self._last_start = time.monotonic()
+
+    def _trim(self):
+        cutoff = time.monotonic() - self.period
+        while self._events and self._events[0][0] < cutoff:
+            self._events.popleft()
+
+    def rpm(self) -> float:
+        """Requests completed over the last minute."""
+        self._trim()
+        return len(self._events)
+
+    def tpm(self) -> float:
+        """Tokens used over the last minute."""
+        self._trim()
+        return sum(tokens for _, tokens in self._events)
+
+    def tokens_per_request(self, default: float) -> float:
+        self._trim()
+        if not self._events:
+            return default
+        return sum(tokens for _, tokens in self._events) / len(self._events)
+
+    def request_budget(self, tokens: float) -> Optional[float]:
+        """Requests per minute allowed by both limits at `tokens` per request, None while unknown."""
+        budgets = []
+        if self.limit_requests:
+            budgets.append(self.limit_requests * self.headroom)
+        if self.limit_tokens and tokens:
+            budgets.append(self.limit_tokens * self.headroom / tokens)
+        return min(budgets) if budgets else None
+
+    def delay(self, tokens: float) -> float:
+        """Seconds to wait before sending a request expected to use `tokens`."""
+        now = time.monotonic()
+
+        # Spread requests evenly over the minute instead of bursting into the limit
+        interval = 0.0
+        if self.limit_requests:
+            interval = max(interval, self.period / (self.limit_requests * self.headroom))
+        if self.limit_tokens:
+            interval = max(interval, tokens * self.period / (self.limit_tokens * self.headroom))
+        wait = max(self._last_start + interval, self.hold_until) - now
+
+        # Nearly out of budget - hold until the window resets
+        if self.remaining_requests is not None and self.remaining_requests <= 1:
+            wait = max(wait, self.requests_reset_at - now)
+        if self.remaining_tokens is not None and self.remaining_tokens < tokens:
+            wait = max(wait, self.tokens_reset_at - now)
+        return max(wait, 0.0)
@@ -0,0 +1,187 @@
+"""
+Proxy pool for Reddit HTTP requests.
+
+Tracks each proxy's health (EWMA of request outcomes) and latency, routes
+requests to the proxy with the most headroom, and rotates IPs single-flight:
+however many requests fail together, a proxy rotates at most once per
+PROXY_ROTATION_COOLDOWN, and only the proxy being rotated sits out while the
+new IP comes up.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, List
+from urllib.parse import urlparse
+
+import httpx
+
+from reddit_http import reddit_http, is_sub_answer
+from config import (
+    PROXYEMPIRE_URL,
+    PROXYEMPIRE_ROTATION_URL,
+    PROXIDIZE_PROXY_URL,
+    PROXIDIZE_ROTATION_URL,
+    EXTRA_PROXIES,
+    PROXY_ROTATION_COOLDOWN,
+    PROXY_ROTATION_SETTLE_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Status codes that count against a proxy's health (429 is left to the rate limiter).
+# about.json callers pass sub_answers=True so a private/quarantined sub's 403 doesn't count.
+BLOCKED_STATUSES = (403,)
+HEALTH_ALPHA = 0.2  # Weight of the newest outcome in the health/latency EWMAs
+
+
+class Proxy:
+    """One proxy endpoint and its running health."""
+
+    def __init__(self, name: str, url: Optional[str], rotation_url: Optional[str] = None):
+        self.name = name
+        self.url = url
+        self.rotation_url = rotation_url
+        self.health = 1.0  # EWMA of successes, 0..1
+        self.latency = 0.0  # EWMA of seconds per request
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.rotations = 0
+        self.last_rotation = 0.0
+        self.rotating: Optional[asyncio.Task] = None
+
+    @property
+    def available(self) -> bool:
+        return self.rotating is None
+
+    def score(self) -> float:
+        """Spare capacity: healthy, fast-allowed proxies with few requests in flight win."""
+        return self.health * reddit_http.rate(self.url) / (1 + self.in_flight)
+
+
+class ProxyPool:
+    """Routes requests across proxies and coordinates their IP rotations."""
+
+    def __init__(self, proxies: List[Proxy], cooldown: float = PROXY_ROTATION_COOLDOWN,
+                 settle_seconds: float = PROXY_ROTATION_SETTLE_SECONDS):
+        if not proxies:
+            raise ValueError("ProxyPool needs at least one proxy")
+        self.proxies = proxies
+        self.cooldown = cooldown
+        self.settle_seconds = settle_seconds
+        self.rotation_done = asyncio.Event()
+
+    @classmethod
+    def from_config(cls) -> "ProxyPool":
+        proxies = [Proxy("proxyempire", PROXYEMPIRE_URL, PROXYEMPIRE_ROTATION_URL)]
+        if PROXIDIZE_PROXY_URL:
+            proxies.append(Proxy("proxidize", PROXIDIZE_PROXY_URL, PROXIDIZE_ROTATION_URL))
+        for entry in EXTRA_PROXIES:
+            url, _, rotation_url = entry.partition("|")
+            proxies.append(Proxy(urlparse(url).hostname or url, url, rotation_url or None))
+        return cls(proxies)
+
+    def get(self, url: Optional[str]) -> Optional[Proxy]:
+        return next((proxy for proxy in self.proxies if proxy.url == url), None)
+
+    async def acquire(self) -> Proxy:
+        """Best available proxy. Waits only if every proxy is mid-rotation."""
+        while True:
+            available = [proxy for proxy in self.proxies if proxy.available]
+            if available:
+                proxy = max(available, key=Proxy.score)
+                proxy.in_flight += 1
+                return proxy
+            self.rotation_done.clear()
+            await self.rotation_done.wait()
+
+    def release(self, proxy: Proxy, status_code: Optional[int], seconds: float):
+        """
+        Record a request's outcome; a blocked or failed request asks for a
+        rotation. status_code None means the request raised (timeout,
+        connection error).
+        """
+        proxy.in_flight -= 1
+        proxy.requests += 1
+        if status_code == 429:
+            return
+        ok = status_code is not None and status_code not in BLOCKED_STATUSES
+        proxy.health += HEALTH_ALPHA * ((1.0 if ok else 0.0) - proxy.health)
+        proxy.latency += HEALTH_ALPHA * (seconds - proxy.latency)
+        if not ok:
+            proxy.failures += 1
+            self.rotate(proxy, f"HTTP {status_code}" if status_code else "request error")
+
+    async def get_url(self, url: str, timeout: float = 15.0,
+                      sub_answers: bool = False) -> tuple[Proxy, httpx.Response]:
+        """
+        GET via the best proxy, recording the outcome. Raises like reddit_http.get().
+        sub_answers: about.json - a 403 with a JSON reason counts as a success,
+        not a block (see reddit_http.is_sub_answer).
+        """
+        proxy = await self.acquire()
+        start = time.monotonic()
+        status_code = None
+        try:
+            response = await reddit_http.get(url, proxy=proxy.url, timeout=timeout, sub_answers=sub_answers)
+            status_code = 200 if sub_answers and is_sub_answer(response) else response.status_code
+            return proxy, response
+        finally:
+            self.release(proxy, status_code, time.monotonic() - start)
+
+    def rotate(self, proxy: Proxy, reason: str = "") -> bool:
+        """
+        Ask for a new IP on this proxy. Doesn't wait - the proxy just stops
+        receiving requests until the rotation settles. Returns False if a
+        rotation is already running or happened within the cooldown.
+        """
+        if not proxy.rotation_url or proxy.rotating:
+            return False
+        if time.monotonic() - proxy.last_rotation < self.cooldown:
+            return False
+        proxy.last_rotation = time.monotonic()
+        proxy.rotating = asyncio.create_task(self._rotate(proxy, reason))
+        return True
+
+    async def _rotate(self, proxy: Proxy, reason: str):
+        try:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                response = await client.get(proxy.rotation_url)
+            if response.status_code == 200:
+                proxy.rotations += 1
+                logger.info(f"🔄 {proxy.name} IP rotated (rotation #{proxy.rotations}){f' - {reason}' if reason else ''}")
+            else:
+                logger.warning(f"Failed to rotate {proxy.name} IP: HTTP {response.status_code}")
+            
+            # Pooled connections (and their user agent) belong to the old IP
+            await reddit_http.reset(proxy.url)
+            await asyncio.sleep(self.settle_seconds)  # Wait for IP to change
+            proxy.health = max(proxy.health, 0.5)  # Fresh IP gets a fair chance
+        except Exception as e:
+            logger.warning(f"Error rotating {proxy.name} IP: {e}")
+        finally:
+            proxy.rotating = None
+            self.rotation_done.set()
+
+    def total_rate(self) -> float:
+        """Sum of the proxies' current allowed requests/sec."""
+        return sum(reddit_http.rate(proxy.url) for proxy in self.proxies)
+
+    def get_stats(self) -> List[Dict]:
+        return [
+            {
+                "name": proxy.name,
+                "health": proxy.health,
+                "latency_ms": proxy.latency * 1000,
+                "rate": reddit_http.rate(proxy.url),
+                "requests": proxy.requests,
+                "failures": proxy.failures,
+                "rotations": proxy.rotations,
+                "rotating": proxy.rotating is not None,
+            }
+            for proxy in self.proxies
+        ]
+
+
+# Process-wide pool shared by the crawler, LLM analyzer and intel worker
+proxy_pool = ProxyPool.from_config()
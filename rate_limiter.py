@@ -0,0 +1,81 @@
+"""
+Token-bucket rate limiting for Reddit requests.
+Callers await acquire() before each request instead of sleeping fixed
+amounts; bursts up to `burst` requests go out immediately, then requests are
+spaced at `rate` per second.
+
+AdaptiveRateLimiter searches for the fastest rate an IP can sustain (AIMD):
+the rate creeps up while Reddit answers normally and halves on 429/403.
+"""
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens/second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.acquired = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait for a token. Waiters are served in arrival order."""
+        async with self.lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+            self.acquired += 1
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    Token bucket whose rate adapts to responses (additive increase,
+    multiplicative decrease).
+
+    Each OK response adds increase/rate, i.e. roughly `increase` req/s per
+    second of clean traffic. A throttle (429/403) multiplies the rate by
+    `decrease`; further throttles within the cooldown are from requests
+    already in flight at the old rate and are not cut again.
+    """
+
+    THROTTLE_STATUSES = (403, 429)
+
+    def __init__(self, rate: float, min_rate: float, max_rate: float, increase: float = 0.5,
+                 decrease: float = 0.5, burst: float = 1.0, cooldown: float = 2.0):
+        super().__init__(rate, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.last_cut = 0.0
+        self.stats = {"ok": 0, "throttled": 0, "cuts": 0}
+
+    def record(self, status_code: int):
+        """Feed back one response's status code."""
+        if status_code in self.THROTTLE_STATUSES:
+            self.stats["throttled"] += 1
+            now = time.monotonic()
+            if now - self.last_cut >= self.cooldown:
+                self.last_cut = now
+                self.stats["cuts"] += 1
+                self._refill()
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.tokens = min(self.tokens, 0)  # Stop the queued burst, too
+        elif status_code < 500:
+            self.stats["ok"] += 1
+            self._refill()
+            # Only probe upwards while the limit is what's holding callers back
+            if self.tokens < self.burst:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
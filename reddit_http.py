@@ -0,0 +1,157 @@
+"""
+Shared HTTP client for Reddit.
+One keep-alive connection pool per proxy, reused across requests so only the
+first request pays for TCP + TLS + proxy CONNECT. HTTP/2 is used when the h2
+package is installed. Pools are reset when their proxy rotates its IP - the
+old connections point at the old exit IP.
+
+Every request also goes through its proxy's AdaptiveRateLimiter, so the
+crawler, LLM analyzer and intel worker share one request budget per IP.
+"""
+import asyncio
+import logging
+from typing import Optional, Dict
+
+import httpx
+
+from rate_limiter import AdaptiveRateLimiter
+from user_agents import get_reddit_headers, get_reddit_cookies
+from config import (
+    REDDIT_HTTP_MAX_CONNECTIONS,
+    REDDIT_HTTP_KEEPALIVE_SECONDS,
+    REDDIT_RATE_INITIAL,
+    REDDIT_RATE_MIN,
+    REDDIT_RATE_MAX,
+    REDDIT_RATE_INCREASE,
+    REDDIT_RATE_DECREASE,
+    REDDIT_RATE_BURST,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection-level headers are managed by the pool (and are illegal in HTTP/2)
+HOP_BY_HOP_HEADERS = {"Connection", "Keep-Alive"}
+
+
+def is_sub_answer(response: httpx.Response) -> bool:
+    """
+    A 403 that is Reddit's answer about the sub - JSON with a "reason"
+    (private, quarantined, gold only) - rather than a block of this IP, which
+    comes back as HTML or with no body.
+    """
+    if response.status_code != 403 or "json" not in response.headers.get("content-type", ""):
+        return False
+    try:
+        data = response.json()
+    except ValueError:
+        return False
+    return isinstance(data, dict) and bool(data.get("reason"))
+
+
+class RedditHTTP:
+    """Pooled httpx clients keyed by proxy URL."""
+
+    def __init__(self, verify=False, http2: Optional[bool] = None):
+        self.verify = verify
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2
+        self.clients: Dict[Optional[str], httpx.AsyncClient] = {}
+        self.headers: Dict[Optional[str], Dict] = {}
+        self.limiters: Dict[Optional[str], AdaptiveRateLimiter] = {}
+        self.stats = {"requests": 0, "pools_opened": 0, "resets": 0}
+
+    def client(self, proxy: Optional[str] = None) -> httpx.AsyncClient:
+        """The pooled client for this proxy, created on first use."""
+        client = self.clients.get(proxy)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                proxy=proxy,
+                verify=self.verify,
+                http2=self.http2,
+                follow_redirects=True,
+                cookies=get_reddit_cookies(),
+                limits=httpx.Limits(
+                    max_connections=REDDIT_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=REDDIT_HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=REDDIT_HTTP_KEEPALIVE_SECONDS,
+                ),
+            )
+            self.clients[proxy] = client
+            self.stats["pools_opened"] += 1
+        return client
+
+    def limiter(self, proxy: Optional[str] = None) -> AdaptiveRateLimiter:
+        """The proxy's rate limiter. Outlives pool resets - it's the per-IP budget."""
+        if proxy not in self.limiters:
+            self.limiters[proxy] = AdaptiveRateLimiter(
+                REDDIT_RATE_INITIAL,
+                min_rate=REDDIT_RATE_MIN,
+                max_rate=REDDIT_RATE_MAX,
+                increase=REDDIT_RATE_INCREASE,
+                decrease=REDDIT_RATE_DECREASE,
+                burst=REDDIT_RATE_BURST,
+            )
+        return self.limiters[proxy]
+
+    def rate(self, proxy: Optional[str] = None) -> float:
+        """Current allowed requests/sec for this proxy."""
+        return self.limiter(proxy).rate
+
+    def identity(self, proxy: Optional[str] = None) -> Dict:
+        """
+        Browser headers for this proxy. One user agent per exit IP, so a
+        connection doesn't change browsers mid-stream; re-rolled on reset().
+        """
+        if proxy not in self.headers:
+            headers = get_reddit_headers()
+            for name in HOP_BY_HOP_HEADERS:
+                headers.pop(name, None)
+            self.headers[proxy] = headers
+        return self.headers[proxy]
+
+    async def get(self, url: str, proxy: Optional[str] = None, timeout: float = 15.0,
+                  headers: Optional[Dict] = None, sub_answers: bool = False) -> httpx.Response:
+        """
+        GET through the proxy's pool, paced by its rate limiter.
+        Raises httpx errors like client.get().
+        sub_answers: about.json - a 403 with a JSON reason is an answer
+        (see is_sub_answer) and doesn't slow the proxy down.
+        """
+        limiter = self.limiter(proxy)
+        await limiter.acquire()
+
+        request_headers = self.identity(proxy)
+        if headers:
+            request_headers = {**request_headers, **headers}
+        self.stats["requests"] += 1
+        response = await self.client(proxy).get(url, headers=request_headers, timeout=timeout)
+        limiter.record(200 if sub_answers and is_sub_answer(response) else response.status_code)
+        return response
+
+    def rotate_identity(self, proxy: Optional[str] = None):
+        """Pick a new user agent for this proxy, keeping its connections."""
+        self.headers.pop(proxy, None)
+
+    async def reset(self, proxy: Optional[str] = None):
+        """Drop the proxy's pooled connections and user agent (call after an IP rotation)."""
+        client = self.clients.pop(proxy, None)
+        self.headers.pop(proxy, None)
+        if client is not None:
+            self.stats["resets"] += 1
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing pooled client: {e}")
+
+    async def close(self):
+        """Close every pool."""
+        await asyncio.gather(*(self.reset(proxy) for proxy in list(self.clients)))
+
+
+# Process-wide instance - import this rather than building clients per request
+reddit_http = RedditHTTP()
@@ -0,0 +1,113 @@
+"""
+Negative cache for crawler about.json lookups.
+
+Subs rejected for being SFW or under CRAWLER_MIN_SUBSCRIBERS are remembered
+with the reason, subscriber count and check time, so the same small/SFW subs
+mentioned by different authors are not re-fetched. Entries expire after a
+per-reason TTL and the sub is checked again.
+
+Entries live in memory and are persisted to a local SQLite file in batches
+(save() at the crawler's sync points).
+"""
+import logging
+import os
+import sqlite3
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SFW = "sfw"
+TOO_SMALL = "too_small"
+
+
+class RejectedSubreddits:
+    """TTL'd name -> (reason, subscribers, checked_at) map with hit counters."""
+
+    def __init__(self, path: Optional[str] = None, ttls: Optional[dict] = None):
+        self.path = path
+        self.ttls = ttls or {}  # reason -> seconds
+        self.entries: dict[str, tuple[str, int, float]] = {}
+        self._dirty: set[str] = set()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "added": 0}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _fresh(self, entry: tuple[str, int, float], now: float) -> bool:
+        reason, _, checked_at = entry
+        return now - checked_at < self.ttls.get(reason, 0)
+
+    def get(self, name: str) -> Optional[tuple[str, int, float]]:
+        """Entry for a sub that is still rejected, else None. Counts hits/misses."""
+        name = name.lower()
+        entry = self.entries.get(name)
+        if entry is not None and not self._fresh(entry, time.time()):
+            # Due for re-evaluation
+            del self.entries[name]
+            self.stats["expired"] += 1
+            entry = None
+        self.stats["hits" if entry else "misses"] += 1
+        return entry
+
+    def add(self, name: str, reason: str, subscribers: int):
+        name = name.lower()
+        self.entries[name] = (reason, subscribers or 0, time.time())
+        self._dirty.add(name)
+        self.stats["added"] += 1
+
+    def hit_ratio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rejected ("
+            "subreddit_name TEXT PRIMARY KEY, reason TEXT NOT NULL, "
+            "subscribers INTEGER NOT NULL, checked_at REAL NOT NULL)"
+        )
+        return conn
+
+    def load(self):
+        """Read unexpired entries from the local file and drop expired ones."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            conn = self._connect()
+            now = time.time()
+            expired = []
+            with conn:
+                for name, reason, subscribers, checked_at in conn.execute(
+                    "SELECT subreddit_name, reason, subscribers, checked_at FROM rejected"
+                ):
+                    entry = (reason, subscribers, checked_at)
+                    if self._fresh(entry, now):
+                        self.entries[name] = entry
+                    else:
+                        expired.append((name,))
+                conn.executemany("DELETE FROM rejected WHERE subreddit_name = ?", expired)
+            conn.close()
+            logger.info(f"Loaded {len(self.entries):,} rejected subs ({len(expired):,} expired)")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read rejected subs {self.path}: {e}")
+
+    def save(self):
+        """Write entries added since the last save."""
+        if not self.path or not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        rows = [(name, *self.entries[name]) for name in dirty if name in self.entries]
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rejected (subreddit_name, reason, subscribers, checked_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            conn.close()
+        except sqlite3.Error as e:
+            self._dirty |= dirty
+            logger.warning(f"Could not write rejected subs {self.path}: {e}")
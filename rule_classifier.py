@@ -0,0 +1,188 @@
+"""
+Deterministic pre-classifier for subreddit rules.
+
+Many rule sets state their policies in so many words ("verified users only",
+"no OF", "sellers welcome"). classify() reads the description and
+community_rules with a handful of compiled patterns and answers those subs
+directly, in the same result shape as SubredditLLMAnalyzer; anything it is
+not sure about returns None and goes to the LLM:
+
+- verification: an explicit requirement -> True, an explicit "no
+  verification needed" or no mention of verification at all -> False, any
+  other mention -> escalate
+- sellers: exactly one of "not allowed" (no OnlyFans/sellers/promotion,
+  amateur only) or "allowed" (creators welcome, promotion allowed) -> that,
+  both or neither -> escalate; so does a ban that only restricts placement
+  ("no OF links in titles", "no OF watermarks")
+
+Negated phrases are blanked out before the positive patterns run, so "no
+self-promotion allowed" is a ban and "no verification required" is not a
+requirement. Niche categories come from a fixed vocabulary matched as whole
+words against the name (split on case, digits and underscores) and the
+description.
+
+evaluate() compares classify() with stored LLM results; see
+eval_rule_classifier.py.
+"""
+import re
+from itertools import chain
+from typing import Optional
+
+# Explicit "verification is not needed" - decides False, and is removed before VERIFIED runs
+NOT_VERIFIED = re.compile(
+    r"\b(?:no|without) verification(?: is)?(?: required| needed| necessary)?\b"
+    r"|\bverification (?:is )?(?:not required|not needed|optional)\b"
+    r"|\b(?:you )?(?:do not|don't) need to (?:be |get )?verif(?:y|ied)\b"
+)
+
+VERIFIED = re.compile(
+    r"\bverified (?:users?|members?|posters?|creators?|sellers?|accounts?)?\s*only\b"
+    r"|\bonly verified\b"
+    r"|\b(?:must|need to|have to) (?:be|get) verified\b"
+    r"|\bverification (?:is )?(?:required|mandatory|needed)\b"
+    r"|\b(?:must|need to|have to|required to) (?:complete|pass|do|finish) (?:the )?verification\b"
+    r"|\bunverified (?:posts?|users?|accounts?|content) (?:are|is|will be) (?:removed|banned|deleted)\b"
+    r"|\bget verified before\b"
+)
+
+# Any mention at all - present without a decisive phrase means escalate
+VERIFICATION_MENTION = re.compile(r"verif")
+
+# Seller bans - also removed before SELLERS_ALLOWED runs. "OF" is only OnlyFans in capitals.
+SELLERS_BANNED = re.compile(
+    r"\bno (?:onlyfans|fansly|sellers?|selling|self[- ]?promo(?:tion)?|promotion|paid content|advertising|menus?)\b"
+    r"|(?i:\bno) OF\b"
+    r"|\b(?:sellers?|onlyfans|selling|self[- ]?promo(?:tion)?|promotion|paid content) (?:is |are |will be )?"
+    r"(?:banned|not allowed|not permitted|prohibited|forbidden)\b"
+    r"|\bamateurs? (?:content |posters? |accounts? )?only\b"
+    r"|\bnon[- ]commercial (?:community|sub(?:reddit)?)\b"
+)
+
+# A ban followed by one of these restricts where promotion goes ("no OF links in titles", "no OF
+# watermarks"), not whether sellers may post - escalate
+BAN_QUALIFIER = re.compile(
+    r"[ \t]+(?:[\w-]+[ \t]+){0,2}?"
+    r"(?:links?|urls?|titles?|comments?|watermarks?|spam(?:ming)?|usernames?|handles?|captions?|flairs?)\b"
+)
+
+SELLERS_ALLOWED = re.compile(
+    r"\b(?:sellers?|creators?|onlyfans creators?|content creators?|of creators?) (?:are )?welcome\b"
+    r"|\b(?:self[- ]?promo(?:tion)?|promotion|onlyfans links?|of links?|selling) (?:is |are )?"
+    r"(?:allowed|welcome|permitted|ok)\b"
+    r"|\bsellers?[- ]friendly\b"
+)
+
+NICHES = [
+    "amateur", "petite", "asian", "milf", "curvy", "fitness", "cosplay", "latina", "goth", "redhead",
+    "ebony", "blonde", "brunette", "thick", "bbw", "mature", "teen", "college", "lingerie", "feet",
+    "tattoo", "couple", "gay", "lesbian", "trans", "femboy", "hentai", "bdsm", "fetish", "outdoor",
+]
+NICHE_WORDS = re.compile(r"\b(" + "|".join(NICHES) + r")s?\b")
+# Words of a sub name: "Petite_Goth", "PetiteGoth" and "petite4goth" -> petite, goth; "MILFs" -> milfs
+NAME_WORDS = re.compile(r"[A-Z]+s?(?![a-z])|[A-Z]?[a-z]+")
+MAX_NICHES = 5
+
+
+def rules_text(description: str, rules: list) -> str:
+    """Description and every rule's title and text, lowercase except for OF."""
+    parts = [description or ""]
+    for rule in rules or []:
+        parts.append(rule.get("short_name", ""))
+        parts.append(rule.get("description", ""))
+    text = "\n".join(parts)
+    # Keep "OF" distinguishable from the word "of"
+    return re.sub(r"\bOF\b", "\0", text).lower().replace("\0", "OF")
+
+
+def niches(subreddit_name: str, text: str) -> list[str]:
+    # Whole words only - a substring test finds "teen" in "canteen"
+    name = " ".join(NAME_WORDS.findall(subreddit_name or "")).lower()
+    found = []
+    for match in chain(NICHE_WORDS.finditer(name), NICHE_WORDS.finditer(text)):
+        if match.group(1) not in found:
+            found.append(match.group(1))
+    return found[:MAX_NICHES]
+
+
+def verification(text: str) -> tuple[Optional[bool], str]:
+    """(decision, matched phrase); decision None means ambiguous."""
+    negated = NOT_VERIFIED.search(text)
+    positive = VERIFIED.search(NOT_VERIFIED.sub(" ", text))
+    if positive and not negated:
+        return True, positive.group(0)
+    if negated and not positive:
+        return False, negated.group(0)
+    if not positive and not VERIFICATION_MENTION.search(text):
+        return False, ""
+    return None, ""
+
+
+def sellers(text: str) -> tuple[Optional[str], str]:
+    """(sellers_allowed, matched phrase); None means ambiguous."""
+    banned = SELLERS_BANNED.search(text)
+    if any(BAN_QUALIFIER.match(text, match.end()) for match in SELLERS_BANNED.finditer(text)):
+        return None, ""
+    allowed = SELLERS_ALLOWED.search(SELLERS_BANNED.sub(" ", text))
+    if banned and not allowed:
+        return "not_allowed", banned.group(0)
+    if allowed and not banned:
+        return "allowed", allowed.group(0)
+    return None, ""
+
+
+def classify(subreddit_name: str, description: str, rules: list) -> Optional[dict]:
+    """
+    Result dict (same keys as the LLM's) for an unambiguous rule set,
+    None when the sub should go to the LLM.
+    """
+    text = rules_text(description, rules)
+    verification_required, verification_phrase = verification(text)
+    sellers_allowed, sellers_phrase = sellers(text)
+    if verification_required is None or sellers_allowed is None:
+        return None
+
+    verification_reason = f"'{verification_phrase}'" if verification_phrase else "no verification rule"
+    return {
+        "verification_required": verification_required,
+        "sellers_allowed": sellers_allowed,
+        "niche_categories": niches(subreddit_name, text),
+        "confidence": "high",
+        "reasoning": (
+            f"Rule classifier: {verification_reason} -> verification "
+            f"{'required' if verification_required else 'not required'}, "
+            f"'{sellers_phrase}' -> sellers {sellers_allowed.replace('_', ' ')}."
+        ),
+    }
+
+
+def evaluate(examples: list[dict]) -> dict:
+    """
+    Compare classify() with stored LLM results.
+
+    examples are {"subreddit_name", "description", "rules", "result"} dicts,
+    result being the LLM's answer. Returns counts of decided subs and of
+    agreement on each field among them, plus up to 20 disagreements.
+    """
+    report = {
+        "total": len(examples), "decided": 0, "verification_agree": 0, "sellers_agree": 0,
+        "both_agree": 0, "disagreements": [],
+    }
+    for example in examples:
+        local = classify(example["subreddit_name"], example.get("description", ""), example.get("rules", []))
+        if not local:
+            continue
+        report["decided"] += 1
+        stored = example["result"]
+        verification_ok = local["verification_required"] == stored.get("verification_required")
+        sellers_ok = local["sellers_allowed"] == stored.get("sellers_allowed")
+        report["verification_agree"] += verification_ok
+        report["sellers_agree"] += sellers_ok
+        report["both_agree"] += verification_ok and sellers_ok
+        if not (verification_ok and sellers_ok) and len(report["disagreements"]) < 20:
+            report["disagreements"].append({
+                "subreddit_name": example["subreddit_name"],
+                "local": {key: local[key] for key in ("verification_required", "sellers_allowed")},
+                "llm": {key: stored.get(key) for key in ("verification_required", "sellers_allowed")},
+                "reasoning": local["reasoning"],
+            })
+    return report
@@ -0,0 +1,131 @@
+-- =============================================================================
+-- Lease-based work claiming for intel workers
+--
+-- Lets several intel worker processes / boxes share one queue without
+-- scraping the same subreddit twice. A worker claims a batch with
+-- claim_intel_batch(); each claimed sub gets a lease row that expires after
+-- p_lease_seconds unless renewed. If a worker dies mid-batch its leases
+-- simply expire and the subs become claimable again.
+--
+-- Apply in the Supabase SQL editor (or psql) once per project.
+-- =============================================================================
+
+create table if not exists intel_scrape_leases (
+    subreddit_name text primary key,
+    worker_id      text        not null,
+    leased_until   timestamptz not null,
+    claimed_at     timestamptz not null default now()
+);
+
+create index if not exists intel_scrape_leases_leased_until_idx
+    on intel_scrape_leases (leased_until);
+create index if not exists intel_scrape_leases_worker_idx
+    on intel_scrape_leases (worker_id);
+
+
+-- Claim up to p_limit subs that are not scraped yet (or marked for retry)
+-- and not currently leased by anyone. Returns the claimed rows.
+--
+-- Duplicate-free under concurrency: the lease insert only wins when there is
+-- no row or the existing lease has expired, and only rows this call actually
+-- inserted/updated are returned. SKIP LOCKED keeps concurrent claimers from
+-- queueing behind each other on the same candidates.
+create or replace function claim_intel_batch(
+    p_worker_id       text,
+    p_limit           int default 4,
+    p_lease_seconds   int default 600,
+    p_min_subscribers int default 5000
+)
+returns table (subreddit_name text, subscribers int, error_message text)
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    -- Housekeeping: drop leases that expired a long time ago
+    delete from intel_scrape_leases l
+    where l.leased_until < now() - interval '1 day';
+
+    return query
+    with candidates as (
+        select lower(q.subreddit_name) as name, q.subscribers::int as subs, i.error_message as err
+        from subreddit_queue q
+        left join nsfw_subreddit_intel i on i.subreddit_name = lower(q.subreddit_name)
+        left join intel_scrape_leases l on l.subreddit_name = lower(q.subreddit_name)
+        where q.subscribers >= p_min_subscribers
+          and (
+              i.subreddit_name is null
+              or (
+                  i.scrape_status in ('pending', 'failed')
+                  and coalesce(lower(i.error_message), '') !~ '(banned|private|deleted|unavailable)'
+              )
+          )
+          and (l.subreddit_name is null or l.leased_until < now())
+        order by q.subscribers desc
+        limit p_limit
+        for update of q skip locked
+    ),
+    claimed as (
+        insert into intel_scrape_leases as l (subreddit_name, worker_id, leased_until, claimed_at)
+        select c.name, p_worker_id, now() + make_interval(secs => p_lease_seconds), now()
+        from candidates c
+        on conflict on constraint intel_scrape_leases_pkey do update
+            set worker_id = excluded.worker_id,
+                leased_until = excluded.leased_until,
+                claimed_at = excluded.claimed_at
+            where l.leased_until < now()
+        returning l.subreddit_name
+    )
+    select c.name, c.subs, c.err
+    from candidates c
+    join claimed cl on cl.subreddit_name = c.name
+    order by c.subs desc;
+end;
+$$;
+
+
+-- Extend leases still held by p_worker_id. Returns how many were renewed;
+-- a lease that already expired and was re-claimed by another worker is lost.
+create or replace function renew_intel_leases(
+    p_worker_id     text,
+    p_names         text[],
+    p_lease_seconds int default 600
+)
+returns int
+language sql
+security definer
+set search_path = public
+as $$
+    with renewed as (
+        update intel_scrape_leases
+        set leased_until = now() + make_interval(secs => p_lease_seconds)
+        where worker_id = p_worker_id
+          and subreddit_name = any(p_names)
+        returning 1
+    )
+    select count(*)::int from renewed;
+$$;
+
+
+-- Give leases back early (e.g. on shutdown) so other workers can claim them.
+create or replace function release_intel_leases(
+    p_worker_id text,
+    p_names     text[]
+)
+returns int
+language sql
+security definer
+set search_path = public
+as $$
+    with released as (
+        delete from intel_scrape_leases
+        where worker_id = p_worker_id
+          and subreddit_name = any(p_names)
+        returning 1
+    )
+    select count(*)::int from released;
+$$;
+
+grant execute on function claim_intel_batch(text, int, int, int) to anon, authenticated;
+grant execute on function renew_intel_leases(text, text[], int) to anon, authenticated;
+grant execute on function release_intel_leases(text, text[]) to anon, authenticated;
@@ -0,0 +1,97 @@
+-- =============================================================================
+-- Retry history as columns on nsfw_subreddit_intel
+--
+-- The intel worker used to read error_message before every scrape and count
+-- "No metrics" occurrences in it to decide when to give up on a sub. Retry
+-- history now lives in two columns that are written with each retry mark and
+-- returned with the candidate rows, so the scrape path needs no extra read:
+--
+--   retry_count      consecutive retries with the same last_error_kind
+--   last_error_kind  no_data | timeout | blocked | error
+--
+-- claim_intel_batch() is redefined to return both columns.
+--
+-- Apply after 001_intel_leases.sql, in the Supabase SQL editor (or psql).
+-- =============================================================================
+
+alter table nsfw_subreddit_intel
+    add column if not exists retry_count int not null default 0,
+    add column if not exists last_error_kind text;
+
+-- Backfill from the free-text error of subs currently marked for retry
+update nsfw_subreddit_intel
+set retry_count = greatest(
+        1,
+        (length(error_message) - length(replace(error_message, 'No metrics', ''))) / length('No metrics')
+      + (length(error_message) - length(replace(error_message, 'Scrape returned no data', ''))) / length('Scrape returned no data')
+    ),
+    last_error_kind = case
+        when error_message ilike '%no metrics%' or error_message ilike '%scrape returned no data%' then 'no_data'
+        when error_message ilike '%timeout%' then 'timeout'
+        when error_message ilike '%blocked%' then 'blocked'
+        else 'error'
+    end
+where scrape_status = 'pending'
+  and error_message is not null
+  and last_error_kind is null;
+
+
+-- Same as 001, plus the retry columns. The return type changes, so the old
+-- function has to be dropped first.
+drop function if exists claim_intel_batch(text, int, int, int);
+
+create or replace function claim_intel_batch(
+    p_worker_id       text,
+    p_limit           int default 4,
+    p_lease_seconds   int default 600,
+    p_min_subscribers int default 5000
+)
+returns table (subreddit_name text, subscribers int, error_message text, retry_count int, last_error_kind text)
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    -- Housekeeping: drop leases that expired a long time ago
+    delete from intel_scrape_leases l
+    where l.leased_until < now() - interval '1 day';
+
+    return query
+    with candidates as (
+        select lower(q.subreddit_name) as name, q.subscribers::int as subs, i.error_message as err,
+               coalesce(i.retry_count, 0) as retries, i.last_error_kind as kind
+        from subreddit_queue q
+        left join nsfw_subreddit_intel i on i.subreddit_name = lower(q.subreddit_name)
+        left join intel_scrape_leases l on l.subreddit_name = lower(q.subreddit_name)
+        where q.subscribers >= p_min_subscribers
+          and (
+              i.subreddit_name is null
+              or (
+                  i.scrape_status in ('pending', 'failed')
+                  and coalesce(lower(i.error_message), '') !~ '(banned|private|deleted|unavailable)'
+              )
+          )
+          and (l.subreddit_name is null or l.leased_until < now())
+        order by q.subscribers desc
+        limit p_limit
+        for update of q skip locked
+    ),
+    claimed as (
+        insert into intel_scrape_leases as l (subreddit_name, worker_id, leased_until, claimed_at)
+        select c.name, p_worker_id, now() + make_interval(secs => p_lease_seconds), now()
+        from candidates c
+        on conflict on constraint intel_scrape_leases_pkey do update
+            set worker_id = excluded.worker_id,
+                leased_until = excluded.leased_until,
+                claimed_at = excluded.claimed_at
+            where l.leased_until < now()
+        returning l.subreddit_name
+    )
+    select c.name, c.subs, c.err, c.retries, c.kind
+    from candidates c
+    join claimed cl on cl.subreddit_name = c.name
+    order by c.subs desc;
+end;
+$$;
+
+grant execute on function claim_intel_batch(text, int, int, int) to anon, authenticated;
@@ -0,0 +1,23 @@
+-- =============================================================================
+-- Claims for subs exported to an OpenAI Batch API backfill
+--
+-- llm_backfill.py sends the LLM backlog to batch jobs that can take up to
+-- 24 hours. Until their results are imported the subs still have no
+-- verification_required, so the online loop in crawler_llm.py would pick
+-- them up and pay full price for them as well. On submit the backfill sets
+-- llm_claimed_until on every sub of the job; the online loop skips rows
+-- whose claim has not expired. Import (or a job that ended without output)
+-- clears the claim again, and a crashed backfill's claims simply expire.
+--
+-- llm_backfill.py refuses to submit without this column unless it is told
+-- crawler_llm.py is stopped (--without-claims).
+--
+-- Apply in the Supabase SQL editor (or psql) once per project.
+-- =============================================================================
+
+alter table nsfw_subreddit_intel
+    add column if not exists llm_claimed_until timestamptz;
+
+create index if not exists nsfw_subreddit_intel_llm_claimed_until_idx
+    on nsfw_subreddit_intel (llm_claimed_until)
+    where verification_required is null;
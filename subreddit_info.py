@@ -0,0 +1,111 @@
+"""
+Batched subreddit metadata lookups.
+
+Instead of one /r/<name>/about.json per sub, callers ask for a name and wait
+briefly while other lookups accumulate; up to SUBREDDIT_INFO_BATCH_SIZE names
+are then resolved with a single /api/info.json?sr_name=a,b,c request. The
+listing holds the same t5 "data" objects about.json returns. Subs Reddit
+leaves out of the answer (banned, deleted, misspelled) resolve to None, as do
+names whose batch request failed.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from proxy_pool import ProxyPool, proxy_pool
+from config import SUBREDDIT_INFO_BATCH_SIZE, SUBREDDIT_INFO_WINDOW_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class SubredditInfoBatcher:
+    """Coalesces concurrent metadata lookups into /api/info.json requests."""
+
+    def __init__(self, base_url: str = "https://www.reddit.com",
+                 fetch_json: Optional[Callable[[str], Awaitable[Optional[dict]]]] = None,
+                 proxies: Optional[ProxyPool] = None, batch_size: int = None, window: float = None):
+        self.base_url = base_url
+        self.proxies = proxies or proxy_pool
+        self.fetch_json = fetch_json or self._fetch_json
+        self.batch_size = batch_size or SUBREDDIT_INFO_BATCH_SIZE
+        self.window = SUBREDDIT_INFO_WINDOW_SECONDS if window is None else window
+
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._full = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._batches: set = set()
+        self.stats = {"names": 0, "requests": 0, "found": 0, "missing": 0, "failed": 0}
+
+    async def _fetch_json(self, url: str) -> Optional[dict]:
+        """Default fetch: one attempt through the proxy pool."""
+        try:
+            _, response = await self.proxies.get_url(url, timeout=15.0)
+            if response.status_code == 200:
+                return response.json()
+            logger.debug(f"HTTP {response.status_code} for {url}")
+        except Exception as e:
+            logger.debug(f"Info request failed: {e}")
+        return None
+
+    async def get(self, subreddit_name: str) -> Optional[dict]:
+        """Metadata ("data" of the t5) for one sub, or None if Reddit didn't return it."""
+        name = subreddit_name.lower()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(name, []).append(future)
+        self.stats["names"] += 1
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        return await future
+
+    async def _flush_loop(self):
+        """Send a batch once it is full or the window has passed; exit when idle."""
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.window)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+
+            names = list(self._pending)[:self.batch_size]
+            waiters = {name: self._pending.pop(name) for name in names}
+            if len(self._pending) >= self.batch_size:
+                self._full.set()
+
+            # Batches run concurrently; the next one starts filling right away
+            task = asyncio.create_task(self._resolve(waiters))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _resolve(self, waiters: Dict[str, List[asyncio.Future]]):
+        found = {}
+        try:
+            self.stats["requests"] += 1
+            data = await self.fetch_json(f"{self.base_url}/api/info.json?sr_name={','.join(waiters)}&raw_json=1")
+            if data is None:
+                self.stats["failed"] += len(waiters)
+            else:
+                for child in data.get("data", {}).get("children", []):
+                    info = child.get("data", {})
+                    name = (info.get("display_name") or "").lower()
+                    if name in waiters:
+                        found[name] = info
+                self.stats["found"] += len(found)
+                self.stats["missing"] += len(waiters) - len(found)
+        except Exception as e:
+            logger.warning(f"Error resolving {len(waiters)} subreddits: {e}")
+        finally:
+            for name, futures in waiters.items():
+                for future in futures:
+                    if not future.done():
+                        future.set_result(found.get(name))
+
+    def close(self):
+        """Cancel the flusher and in-flight batches (their callers are going away too)."""
+        for task in [self._flusher, *self._batches]:
+            if task and not task.done():
+                task.cancel()
+
+    def names_per_request(self) -> float:
+        return self.stats["names"] / self.stats["requests"] if self.stats["requests"] else 0.0
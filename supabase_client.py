@@ -2,29 +2,552 @@
 Supabase client for Hetzner Worker.
 Handles reading from subreddit_queue and writing to nsfw_subreddit_intel.
 Includes retry logic and non-blocking error handling.
+
+The supabase-py client is synchronous, so every query is run on a bounded
+thread pool via execute(). The underlying httpx client is shared across
+threads (HTTP/2, pooled connections), so concurrent DB calls overlap instead
+of blocking the event loop.
+
+Intel writes (scrape results, retry/failed marks) go through a write-behind
+buffer that coalesces rows into multi-row upserts.
 """
+import asyncio
+import heapq
 import logging
-from datetime import datetime, timezone
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
 
-from config import SUPABASE_URL, SUPABASE_ANON_KEY
+from config import (
+    SUPABASE_URL,
+    SUPABASE_ANON_KEY,
+    DB_MAX_WORKERS,
+    INTEL_WRITE_BATCH_SIZE,
+    INTEL_WRITE_FLUSH_SECONDS,
+    INTEL_WRITE_MAX_ATTEMPTS,
+    INTEL_LEASE_SECONDS,
+    INTEL_INDEX_REFRESH_SECONDS,
+    INTEL_INDEX_SNAPSHOT,
+)
+from intel_snapshot import IntelSnapshot
 
 logger = logging.getLogger(__name__)
 
+# error_message terms that mean a sub should never be retried
+PERMANENT_FAILURE_TERMS = ["banned", "private", "deleted", "unavailable"]
+
+# last_error_kind values (sql/002_intel_retry_count.sql)
+ERROR_NO_DATA = "no_data"  # Page loaded, no metrics
+ERROR_TIMEOUT = "timeout"
+ERROR_BLOCKED = "blocked"
+ERROR_OTHER = "error"
+
+RETRY_COLUMNS = ("retry_count", "last_error_kind")
+# Postgres error classes caused by the rows themselves: data exceptions, constraint violations
+ROW_ERROR_CLASSES = ("22", "23")
+INVALID_BODY = "PGRST102"  # PostgREST could not parse the request body (e.g. NaN)
+
+# Set on subs exported to an OpenAI batch job (sql/003_llm_backfill_claims.sql) - the online LLM loop skips them
+LLM_CLAIM_COLUMN = "llm_claimed_until"
+LLM_CLAIM_CHUNK = 200  # Names per claim update (they go into the URL)
+UNDEFINED_COLUMN = "42703"  # Postgres error code PostgREST passes through for a missing column
+
+
+class IntelWriteBuffer:
+    """
+    Write-behind buffer for nsfw_subreddit_intel upserts.
+    
+    Rows are keyed by subreddit_name, so repeated writes to the same sub
+    merge into one row, later values winning. The buffer is flushed when it reaches
+    batch_size rows or every flush_interval seconds, whichever comes first.
+    
+    A group rejected because of its rows (a bad value, a constraint) is split
+    in halves until the bad rows are isolated; a row that fails on its own
+    INTEL_WRITE_MAX_ATTEMPTS times is dropped. Other failures (connection,
+    timeouts) put the rows back as they are.
+    """
+    
+    def __init__(self, supabase: "SupabaseClient", table: str = "nsfw_subreddit_intel",
+                 batch_size: int = None, flush_interval: float = None):
+        self.supabase = supabase
+        self.table = table
+        self.batch_size = batch_size or INTEL_WRITE_BATCH_SIZE
+        self.flush_interval = flush_interval or INTEL_WRITE_FLUSH_SECONDS
+        
+        self._pending: dict[str, dict] = {}
+        self._writing: set[str] = set()  # Lowercase names taken out of _pending by the flush in progress
+        self._attempts: dict[str, int] = {}  # name -> single-row writes rejected so far
+        self._lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self._closing = asyncio.Event()
+        
+        # Counters for tuning batch size / interval
+        self.stats = {
+            "queued": 0,
+            "coalesced": 0,
+            "flushes": 0,
+            "rows_flushed": 0,
+            "rows_failed": 0,
+            "rows_dropped": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "flush_seconds_total": 0.0,
+            "flush_seconds_max": 0.0,
+        }
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def __contains__(self, subreddit_name: str) -> bool:
+        # Rows being written count too - until the upsert commits the DB doesn't have them
+        name = subreddit_name.lower()
+        return name in self._pending or name in self._writing
+    
+    async def add(self, row: dict):
+        """Queue a row; flushes inline once the batch is full."""
+        name = row["subreddit_name"]
+        if name in self._pending:
+            self.stats["coalesced"] += 1
+        # Merge - a later partial write (e.g. a retry mark) must not drop earlier columns
+        self._pending[name] = {**self._pending.get(name, {}), **row}
+        self.stats["queued"] += 1
+        
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+        elif self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+    
+    async def _flush_loop(self):
+        """Time-based flush - runs while there is something buffered."""
+        while self._pending and not self._closing.is_set():
+            try:
+                async with asyncio.timeout(self.flush_interval):
+                    await self._closing.wait()
+            except TimeoutError:
+                pass
+            await self.flush()
+    
+    @staticmethod
+    def _row_error(error: Exception) -> bool:
+        """True when the rows caused the failure, so splitting the group can isolate them."""
+        if isinstance(error, (ValueError, TypeError)):  # Not serialisable, e.g. NaN
+            return True
+        code = str(getattr(error, "code", None) or "") if isinstance(error, APIError) else ""
+        return code == INVALID_BODY or code[:2] in ROW_ERROR_CLASSES
+    
+    async def _upsert(self, rows: list[dict]) -> list[tuple[dict, Exception]]:
+        """Upsert rows, halving on row errors. Returns the rows that were not written."""
+        try:
+            await self.supabase.execute(self.supabase.client.table(self.table).upsert(
+                rows,
+                on_conflict="subreddit_name",
+                returning=ReturnMethod.minimal,
+            ))
+            return []
+        except Exception as e:
+            if len(rows) == 1 or not self._row_error(e):
+                return [(row, e) for row in rows]
+            middle = len(rows) // 2
+            first, second = await asyncio.gather(self._upsert(rows[:middle]), self._upsert(rows[middle:]))
+            return first + second
+    
+    def _requeue(self, row: dict, error: Exception):
+        """Put a failed row back under any newer write, or drop it after too many rejections."""
+        name = row["subreddit_name"]
+        # _upsert only returns a row error for a row written on its own
+        if self._row_error(error):
+            self._attempts[name] = self._attempts.get(name, 0) + 1
+            if self._attempts[name] >= INTEL_WRITE_MAX_ATTEMPTS:
+                logger.error(f"Dropping intel row for r/{name} after {self._attempts.pop(name)} attempts: {error}")
+                self.stats["rows_dropped"] += 1
+                return
+        self._pending[name] = {**row, **self._pending.get(name, {})}
+    
+    async def flush(self) -> int:
+        """
+        Write all buffered rows. Returns number of rows written.
+        Failed rows go back into the buffer, under any newer writes to the same sub.
+        """
+        async with self._lock:
+            if not self._pending:
+                return 0
+            
+            rows = list(self._pending.values())
+            self._pending = {}
+            self._writing = {row["subreddit_name"].lower() for row in rows}
+            
+            # PostgREST bulk upserts need a uniform column set, otherwise
+            # missing columns would be written as NULL. Group by shape.
+            groups: dict[tuple, list[dict]] = {}
+            for row in rows:
+                groups.setdefault(tuple(sorted(row)), []).append(row)
+            
+            start = time.monotonic()
+            try:
+                results = await asyncio.gather(*(self._upsert(group) for group in groups.values()))
+            finally:
+                self._writing = set()
+            elapsed = time.monotonic() - start
+            
+            failed = [failure for result in results for failure in result]
+            for row, error in failed:
+                self._requeue(row, error)
+            if failed:
+                logger.error(f"Error flushing {len(failed)}/{len(rows)} intel rows: {failed[0][1]}")
+            failed_names = {row["subreddit_name"] for row, _ in failed}
+            for row in rows:
+                if row["subreddit_name"] not in failed_names:
+                    self._attempts.pop(row["subreddit_name"], None)
+            written = len(rows) - len(failed)
+            
+            self.stats["flushes"] += 1
+            self.stats["rows_flushed"] += written
+            self.stats["rows_failed"] += len(failed)
+            self.stats["last_batch_size"] = len(rows)
+            self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(rows))
+            self.stats["flush_seconds_total"] += elapsed
+            self.stats["flush_seconds_max"] = max(self.stats["flush_seconds_max"], elapsed)
+            
+            logger.debug(f"Flushed {written}/{len(rows)} intel rows in {elapsed * 1000:.0f}ms")
+            return written
+    
+    async def close(self):
+        """Stop the timer and flush whatever is left."""
+        # Not cancel(): that could interrupt a flush after it took the rows out of _pending
+        self._closing.set()
+        if self._flusher:
+            await self._flusher
+        await self.flush()
+        if self._pending:
+            logger.error(f"{len(self._pending)} intel rows could not be written on shutdown")
+    
+    def get_stats(self) -> dict:
+        """Counters plus derived averages."""
+        flushes = self.stats["flushes"]
+        return {
+            **self.stats,
+            "buffered": len(self._pending),
+            "avg_batch_size": self.stats["rows_flushed"] / flushes if flushes else 0,
+            "avg_flush_ms": self.stats["flush_seconds_total"] / flushes * 1000 if flushes else 0,
+        }
+
+
+class IntelCandidateIndex:
+    """
+    Local index of subs still needing an intel scrape.
+    
+    Used when the get_subreddits_not_in_intel RPC is unavailable. Instead of
+    paging through both tables on every batch, the queue and intel tables are
+    loaded once and then kept current by fetching only rows newer than the
+    last seen created_at (queue) / updated_at (intel). Candidates are served
+    from a max-heap on subscribers, so each selection costs O(batch log n).
+    
+    Each sync re-reads OVERLAP_SECONDS behind the watermark, so rows committed
+    late or stamped by a lagging clock are not skipped; rows the previous sync
+    already applied are dropped before they touch the heap.
+    
+    Rows and watermarks are mirrored to a local SQLite snapshot, so a restart
+    only fetches what changed since the last run.
+    """
+    
+    PAGE_SIZE = 1000
+    OVERLAP_SECONDS = 120
+    
+    def __init__(self, supabase: "SupabaseClient", min_subscribers: int,
+                 refresh_interval: float = None, snapshot_path: Optional[str] = None):
+        self.supabase = supabase
+        self.min_subscribers = min_subscribers
+        self.refresh_interval = INTEL_INDEX_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        
+        self.subscribers: dict[str, int] = {}  # queue subs >= min_subscribers
+        self.done: set[str] = set()  # completed or permanently failed
+        self.errors: dict[str, dict] = {}  # retry history (error_message, retry_count, ...) for retryable subs
+        self._heap: list[tuple[int, str]] = []  # (-subscribers, name)
+        self._in_heap: set[str] = set()
+        
+        self.queue_watermark: Optional[str] = None  # max subreddit_queue.created_at seen
+        self.intel_watermark: Optional[str] = None  # max nsfw_subreddit_intel.updated_at seen
+        self._overlap: dict[str, dict[str, str]] = {}  # table -> {name: ts} applied inside the overlap window
+        self._last_refresh = 0.0
+        self._rebuild = False
+        self.loaded = False
+        
+        snapshot_path = INTEL_INDEX_SNAPSHOT if snapshot_path is None else snapshot_path
+        self.snapshot = IntelSnapshot(snapshot_path) if snapshot_path else None
+    
+    async def _fetch_since(self, table: str, columns: str, ts_column: str, since: Optional[str], **filters) -> list[dict]:
+        """
+        Page through rows with ts_column > since - OVERLAP_SECONDS (all rows
+        when since is None), minus those the previous fetch already returned.
+        """
+        rows = []
+        offset = 0
+        while True:
+            query = self.supabase.client.table(table).select(columns)
+            for column, value in filters.items():
+                query = query.gte(column, value)
+            if since:
+                query = query.gt(ts_column, self._overlap_start(since))
+            result = await self.supabase.execute(
+                query.order(ts_column).range(offset, offset + self.PAGE_SIZE - 1)
+            )
+            if not result.data:
+                break
+            rows.extend(result.data)
+            if len(result.data) < self.PAGE_SIZE:
+                break
+            offset += self.PAGE_SIZE
+        
+        # Re-applying an unchanged row would put a sub that was already handed out back on the heap
+        seen = self._overlap.get(table, {})
+        return [row for row in rows if seen.get(row["subreddit_name"].lower()) != row.get(ts_column)]
+    
+    def _overlap_start(self, watermark: str) -> str:
+        return (datetime.fromisoformat(watermark) - timedelta(seconds=self.OVERLAP_SECONDS)).isoformat()
+    
+    def _remember_overlap(self, table: str, rows: list[dict], column: str, watermark: Optional[str]):
+        """Keep the rows the next fetch will return again, so it can skip them."""
+        seen = self._overlap.get(table, {})
+        if watermark:
+            start = datetime.fromisoformat(self._overlap_start(watermark))
+            seen = {name: ts for name, ts in seen.items() if datetime.fromisoformat(ts) > start}
+            for row in rows:
+                ts = row.get(column)
+                if ts and datetime.fromisoformat(ts) > start:
+                    seen[row["subreddit_name"].lower()] = ts
+        self._overlap[table] = seen
+    
+    @staticmethod
+    def _advance(watermark: Optional[str], rows: list[dict], column: str) -> Optional[str]:
+        """Return the newest timestamp among watermark and rows."""
+        newest = watermark
+        for row in rows:
+            ts = row.get(column)
+            if ts and (newest is None or datetime.fromisoformat(ts) > datetime.fromisoformat(newest)):
+                newest = ts
+        return newest
+    
+    def _push(self, name: str):
+        if name in self._in_heap or name in self.done or name not in self.subscribers:
+            return
+        heapq.heappush(self._heap, (-self.subscribers[name], name))
+        self._in_heap.add(name)
+    
+    def _apply_intel(self, name: str, status: Optional[str], error_message: Optional[str],
+                     retry_count: Optional[int] = None, last_error_kind: Optional[str] = None):
+        error_msg = (error_message or "").lower()
+        if status == "completed" or (
+            status == "failed" and any(term in error_msg for term in PERMANENT_FAILURE_TERMS)
+        ):
+            self.done.add(name)
+            self.errors.pop(name, None)
+        else:
+            # Marked for retry - eligible again
+            self.done.discard(name)
+            history = {"error_message": error_message or ""}
+            if retry_count is not None:
+                history["retry_count"] = retry_count
+                history["last_error_kind"] = last_error_kind
+            self.errors[name] = history
+            self._push(name)
+    
+    def _apply_queue(self, name: str, subscribers: Optional[int]):
+        self.subscribers[name] = subscribers or 0
+        self._push(name)
+    
+    async def _load_snapshot(self) -> int:
+        """Seed the index from the local snapshot. Returns the number of rows loaded."""
+        if not self.snapshot:
+            return 0
+        state = await asyncio.to_thread(self.snapshot.load, self.min_subscribers)
+        if not state:
+            return 0
+        for name, status, error_message, retry_count, last_error_kind in state["intel"]:
+            self._apply_intel(name, status, error_message, retry_count, last_error_kind)
+        for name, subscribers in state["queue"]:
+            self._apply_queue(name, subscribers)
+        self.queue_watermark = state["queue_watermark"]
+        self.intel_watermark = state["intel_watermark"]
+        return len(state["queue"]) + len(state["intel"])
+    
+    async def refresh(self, force: bool = False):
+        """Apply queue/intel rows changed since the watermarks."""
+        if not force and self.loaded and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        
+        start = time.monotonic()
+        from_snapshot = 0 if self.loaded else await self._load_snapshot()
+        
+        intel_columns = "subreddit_name, scrape_status, error_message, updated_at"
+        if await self.supabase.has_retry_columns():
+            intel_columns += ", " + ", ".join(RETRY_COLUMNS)
+        
+        queue_rows, intel_rows = await asyncio.gather(
+            self._fetch_since(
+                "subreddit_queue", "subreddit_name, subscribers, created_at", "created_at",
+                self.queue_watermark, subscribers=self.min_subscribers,
+            ),
+            self._fetch_since(
+                "nsfw_subreddit_intel", intel_columns, "updated_at",
+                self.intel_watermark,
+            ),
+        )
+        
+        # Intel first, so completed subs never enter the heap
+        for row in intel_rows:
+            self._apply_intel(
+                row["subreddit_name"].lower(), row.get("scrape_status"), row.get("error_message"),
+                row.get("retry_count"), row.get("last_error_kind"),
+            )
+        
+        for row in queue_rows:
+            self._apply_queue(row["subreddit_name"].lower(), row.get("subscribers"))
+        
+        self.queue_watermark = self._advance(self.queue_watermark, queue_rows, "created_at")
+        self.intel_watermark = self._advance(self.intel_watermark, intel_rows, "updated_at")
+        self._remember_overlap("subreddit_queue", queue_rows, "created_at", self.queue_watermark)
+        self._remember_overlap("nsfw_subreddit_intel", intel_rows, "updated_at", self.intel_watermark)
+        self._last_refresh = time.monotonic()
+        
+        if self.snapshot and (queue_rows or intel_rows):
+            await asyncio.to_thread(
+                self.snapshot.save, self.min_subscribers, queue_rows, intel_rows,
+                self.queue_watermark, self.intel_watermark,
+            )
+        
+        if not self.loaded:
+            source = f"snapshot {from_snapshot:,} rows + {len(queue_rows) + len(intel_rows):,} fetched" if from_snapshot \
+                else f"{len(queue_rows) + len(intel_rows):,} rows fetched"
+            logger.info(
+                f"Candidate index loaded: {len(self.subscribers):,} queue subs, {len(self.done):,} done "
+                f"({source}, {time.monotonic() - start:.2f}s)"
+            )
+            self.loaded = True
+        elif queue_rows or intel_rows:
+            logger.debug(f"Candidate index: +{len(queue_rows)} queue, {len(intel_rows)} intel changes")
+    
+    async def take(self, limit: int, skip=()) -> list[dict]:
+        """
+        Pop the top `limit` candidates by subscribers.
+        Popped subs are not offered again until their intel row changes
+        (e.g. marked for retry); subs in `skip` are left in the index.
+        """
+        await self.refresh()
+        
+        if self._rebuild:
+            for name in self.subscribers:
+                self._push(name)
+            self._rebuild = False
+        
+        pending = []
+        skipped = []
+        while self._heap and len(pending) < limit:
+            neg_subs, name = heapq.heappop(self._heap)
+            self._in_heap.discard(name)
+            if name in self.done:
+                continue
+            if name in skip:
+                skipped.append(name)
+                continue
+            row = {"subreddit_name": name, "subscribers": -neg_subs}
+            row.update(self.errors.get(name, {}))
+            pending.append(row)
+        
+        for name in skipped:
+            self._push(name)
+        
+        # Everything handed out - re-offer whatever is still not done next time
+        # (rebuilt from local state, no re-download)
+        if not self._heap:
+            self._rebuild = True
+            self._last_refresh = 0.0
+        
+        return pending
+
 
 class SupabaseClient:
     """Supabase client with robust retry logic."""
     
-    def __init__(self):
-        if not SUPABASE_URL or not SUPABASE_ANON_KEY:
+    def __init__(self, url: Optional[str] = None, key: Optional[str] = None, max_workers: int = None):
+        url = url or SUPABASE_URL
+        key = key or SUPABASE_ANON_KEY
+        if not url or not key:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set")
-        self.client: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+        self.client: Client = create_client(url, key)
+        
+        # Bounded pool for the blocking .execute() calls
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or DB_MAX_WORKERS,
+            thread_name_prefix="supabase",
+        )
+        
+        # Batches intel upserts and status marks
+        self.intel_writes = IntelWriteBuffer(self)
+        
+        # Fallback candidate selection when the RPC is unavailable (built lazily)
+        self.candidate_index: Optional[IntelCandidateIndex] = None
+        
+        # Whether sql/002_intel_retry_count.sql / 003_llm_backfill_claims.sql are applied (probed once)
+        self.retry_columns: Optional[bool] = None
+        self.llm_claims: Optional[bool] = None
+    
+    async def execute(self, query) -> Any:
+        """
+        Run a query builder's blocking .execute() off the event loop.
+        
+        Usage: result = await supabase.execute(supabase.client.table("x").select("*"))
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, query.execute)
+    
+    async def _probe_columns(self, columns: tuple) -> Optional[bool]:
+        """Whether nsfw_subreddit_intel has the columns; None when the check itself failed."""
+        try:
+            await self.execute(self.client.table("nsfw_subreddit_intel").select(", ".join(columns)).limit(1))
+            return True
+        except Exception as e:
+            if isinstance(e, APIError) and (e.code == UNDEFINED_COLUMN or "does not exist" in (e.message or "")):
+                return False
+            # Timeouts, connection errors - not an answer, probe again next time
+            logger.warning(f"Could not check for columns {', '.join(columns)}, will check again: {e}")
+            return None
+    
+    async def has_retry_columns(self) -> bool:
+        """Whether nsfw_subreddit_intel has retry_count/last_error_kind; probes until it gets an answer."""
+        if self.retry_columns is None:
+            self.retry_columns = await self._probe_columns(RETRY_COLUMNS)
+            if self.retry_columns is False:
+                logger.warning("Retry columns unavailable - run sql/002_intel_retry_count.sql")
+        return bool(self.retry_columns)
+    
+    async def has_llm_claims(self) -> bool:
+        """Whether nsfw_subreddit_intel has llm_claimed_until; probes until it gets an answer."""
+        if self.llm_claims is None:
+            self.llm_claims = await self._probe_columns((LLM_CLAIM_COLUMN,))
+            if self.llm_claims is False:
+                logger.warning("LLM claim column unavailable - run sql/003_llm_backfill_claims.sql")
+        return bool(self.llm_claims)
+    
+    async def flush(self) -> int:
+        """Force buffered intel writes out now."""
+        return await self.intel_writes.flush()
+    
+    async def close(self):
+        """Flush buffered writes and shut down the DB thread pool."""
+        await self.intel_writes.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
     
     # ==================== Subreddit Intel ====================
 
     async def upsert_subreddit_intel(self, data: dict) -> Optional[dict]:
-        """Insert or update subreddit intelligence data."""
+        """
+        Insert or update subreddit intelligence data.
+        Write-behind: the row is queued and flushed in a batch. Returns the queued row.
+        """
         try:
             intel_data = {
                 "subreddit_name": data["subreddit_name"].lower(),
@@ -56,29 +579,35 @@ class SupabaseClient:
                 "llm_analysis_confidence": data.get("llm_analysis_confidence"),
                 "llm_analysis_reasoning": data.get("llm_analysis_reasoning"),
             }
+            if await self.has_retry_columns():
+                # A successful write ends the retry streak
+                intel_data["retry_count"] = 0
+                intel_data["last_error_kind"] = None
             
-            result = self.client.table("nsfw_subreddit_intel").upsert(
-                intel_data,
-                on_conflict="subreddit_name"
-            ).execute()
-            
-            return result.data[0] if result.data else None
+            await self.intel_writes.add(intel_data)
+            return intel_data
         except Exception as e:
             logger.error(f"Error upserting subreddit intel {data.get('subreddit_name')}: {e}")
             return None
 
-    async def mark_for_retry(self, subreddit_name: str, error_message: str) -> bool:
+    async def mark_for_retry(self, subreddit_name: str, error_message: str,
+                             error_kind: str = ERROR_OTHER, retry_count: int = 1) -> bool:
         """
         Mark a subreddit for retry.
         Sets scrape_status to 'pending' so it will be picked up again.
+        retry_count is the number of consecutive retries of error_kind, this one included.
         """
         try:
-            self.client.table("nsfw_subreddit_intel").upsert({
+            row = {
                 "subreddit_name": subreddit_name.lower(),
                 "scrape_status": "pending",
                 "error_message": error_message,
                 "updated_at": datetime.now(timezone.utc).isoformat(),
-            }, on_conflict="subreddit_name").execute()
+            }
+            if await self.has_retry_columns():
+                row["retry_count"] = retry_count
+                row["last_error_kind"] = error_kind
+            await self.intel_writes.add(row)
             
             logger.debug(f"Marked {subreddit_name} for retry: {error_message}")
             return True
@@ -86,15 +615,35 @@ class SupabaseClient:
             logger.error(f"Error marking for retry {subreddit_name}: {e}")
             return False
 
+    async def update_llm_analysis(self, subreddit_name: str, result: dict) -> bool:
+        """
+        Write LLM analysis fields only (buffered), leaving the scraped
+        metrics and scrape status of the row as they are.
+        """
+        try:
+            await self.intel_writes.add({
+                "subreddit_name": subreddit_name.lower(),
+                "verification_required": result.get("verification_required"),
+                "sellers_allowed": result.get("sellers_allowed"),
+                "niche_categories": result.get("niche_categories"),
+                "llm_analysis_confidence": result.get("confidence"),
+                "llm_analysis_reasoning": result.get("reasoning"),
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            })
+            return True
+        except Exception as e:
+            logger.error(f"Error updating LLM analysis for {subreddit_name}: {e}")
+            return False
+
     async def mark_intel_failed(self, subreddit_name: str, error_message: str) -> bool:
         """Mark a subreddit intel scrape as failed permanently."""
         try:
-            self.client.table("nsfw_subreddit_intel").upsert({
+            await self.intel_writes.add({
                 "subreddit_name": subreddit_name.lower(),
                 "scrape_status": "failed",
                 "error_message": error_message,
                 "updated_at": datetime.now(timezone.utc).isoformat(),
-            }, on_conflict="subreddit_name").execute()
+            })
             return True
         except Exception as e:
             logger.error(f"Error marking intel failed {subreddit_name}: {e}")
@@ -108,33 +657,39 @@ class SupabaseClient:
         try:
             # First try RPC function (faster but may have type issues in some DB versions)
             # If RPC fails, fallback method below will handle it
-            result = self.client.rpc(
+            result = await self.execute(self.client.rpc(
                 "get_subreddits_not_in_intel",
                 {
                     "p_limit": limit,
                     "p_min_subscribers": min_subscribers
                 }
-            ).execute()
+            ))
             
-            pending = result.data or []
+            # Skip subs with a buffered (not yet flushed) write - they were just processed
+            pending = [row for row in (result.data or []) if row["subreddit_name"] not in self.intel_writes]
             
             # If we have fewer than limit, also get pending/failed ones (retries)
             # BUT exclude permanently banned/private subs
             if len(pending) < limit:
-                retry_result = self.client.table("nsfw_subreddit_intel").select(
-                    "subreddit_name, subscribers, error_message"
+                columns = "subreddit_name, subscribers, error_message"
+                if await self.has_retry_columns():
+                    columns += ", " + ", ".join(RETRY_COLUMNS)
+                retry_result = await self.execute(self.client.table("nsfw_subreddit_intel").select(
+                    columns
                 ).in_(
                     "scrape_status", ["pending", "failed"]
                 ).order(
                     "subscribers", desc=True
-                ).limit(limit - len(pending)).execute()
+                ).limit(limit - len(pending)))
                 
                 if retry_result.data:
                     # Filter out permanently banned/private subs
                     for sub in retry_result.data:
                         error_msg = sub.get("error_message", "").lower()
                         # Skip if error indicates permanent failure
-                        if any(term in error_msg for term in ["banned", "private", "deleted", "unavailable"]):
+                        if any(term in error_msg for term in PERMANENT_FAILURE_TERMS):
+                            continue
+                        if sub["subreddit_name"] in self.intel_writes:
                             continue
                         pending.append(sub)
             
@@ -142,104 +697,179 @@ class SupabaseClient:
             
         except Exception as e:
             logger.debug(f"RPC unavailable, using fallback query")
-            # Fallback to client-side filtering
+            # Fallback to the locally cached candidate index
             try:
-                all_queue_subs = []
-                page_size = 1000
-                offset = 0
-                
-                while True:
-                    queue_result = self.client.table("subreddit_queue").select(
-                        "subreddit_name, subscribers"
-                    ).gte(
-                        "subscribers", min_subscribers
-                    ).order(
-                        "subscribers", desc=True
-                    ).range(offset, offset + page_size - 1).execute()
-                    
-                    if not queue_result.data or len(queue_result.data) == 0:
-                        break
-                    
-                    all_queue_subs.extend(queue_result.data)
-                    
-                    if len(queue_result.data) < page_size:
-                        break
-                    
-                    offset += page_size
-                
-                logger.debug(f"Fetched {len(all_queue_subs)} subreddits from queue")
+                if self.candidate_index is None or self.candidate_index.min_subscribers != min_subscribers:
+                    self.candidate_index = IntelCandidateIndex(self, min_subscribers)
                 
-                # Get already scraped names
-                all_intel_names = []
-                intel_offset = 0
-                
-                while True:
-                    intel_result = self.client.table("nsfw_subreddit_intel").select(
-                        "subreddit_name, scrape_status, error_message"
-                    ).range(intel_offset, intel_offset + page_size - 1).execute()
-                    
-                    if not intel_result.data or len(intel_result.data) == 0:
-                        break
-                    
-                    all_intel_names.extend(intel_result.data)
-                    
-                    if len(intel_result.data) < page_size:
-                        break
-                    
-                    intel_offset += page_size
-                
-                # Filter: not scraped OR pending/failed (for retry)
-                # BUT exclude permanently banned/private subs
-                scraped_names = set()
-                for row in all_intel_names:
-                    status = row.get("scrape_status")
-                    error_msg = (row.get("error_message") or "").lower()
-                    
-                    # Exclude if completed
-                    if status == "completed":
-                        scraped_names.add(row["subreddit_name"].lower())
-                    # Exclude if permanently failed (banned/private/deleted)
-                    elif status == "failed" and any(term in error_msg for term in ["banned", "private", "deleted", "unavailable"]):
-                        scraped_names.add(row["subreddit_name"].lower())
-                
-                pending = []
-                for row in all_queue_subs:
-                    if row["subreddit_name"].lower() not in scraped_names:
-                        pending.append(row)
-                        if len(pending) >= limit:
-                            break
-                
-                return pending
+                return await self.candidate_index.take(limit, skip=self.intel_writes)
             except Exception as e2:
                 logger.error(f"Error getting pending intel scrapes: {e2}")
                 return []
 
-    async def get_subs_missing_llm(self, limit: int = 50) -> list[dict]:
-        """Get subreddits missing LLM analysis."""
+    # ==================== Work Leases ====================
+    # Backed by the SQL functions in sql/001_intel_leases.sql
+    # (claim_intel_batch returns retry history once sql/002 is applied)
+
+    async def claim_intel_batch(
+        self,
+        worker_id: str,
+        limit: int = 4,
+        lease_seconds: int = None,
+        min_subscribers: int = 5000,
+    ) -> Optional[list[dict]]:
+        """
+        Atomically claim up to `limit` subreddits for this worker.
+        Claimed subs are leased for `lease_seconds`; no other worker gets them
+        until the lease expires or is released.
+        
+        Returns None if the RPC is unavailable (caller should fall back to
+        get_pending_intel_scrapes), otherwise the list of claimed rows.
+        """
         try:
-            result = self.client.table("nsfw_subreddit_intel").select(
+            result = await self.execute(self.client.rpc(
+                "claim_intel_batch",
+                {
+                    "p_worker_id": worker_id,
+                    "p_limit": limit,
+                    "p_lease_seconds": lease_seconds or INTEL_LEASE_SECONDS,
+                    "p_min_subscribers": min_subscribers,
+                }
+            ))
+            # Same guard as get_pending_intel_scrapes - don't rescrape unflushed subs
+            return [row for row in (result.data or []) if row["subreddit_name"] not in self.intel_writes]
+        except Exception as e:
+            logger.warning(f"claim_intel_batch RPC failed: {e}")
+            return None
+
+    async def renew_intel_leases(self, worker_id: str, subreddit_names: list[str], lease_seconds: int = None) -> int:
+        """Extend leases held by this worker. Returns number renewed."""
+        if not subreddit_names:
+            return 0
+        try:
+            result = await self.execute(self.client.rpc(
+                "renew_intel_leases",
+                {
+                    "p_worker_id": worker_id,
+                    "p_names": [name.lower() for name in subreddit_names],
+                    "p_lease_seconds": lease_seconds or INTEL_LEASE_SECONDS,
+                }
+            ))
+            return result.data or 0
+        except Exception as e:
+            logger.warning(f"Error renewing {len(subreddit_names)} leases: {e}")
+            return 0
+
+    async def release_intel_leases(self, worker_id: str, subreddit_names: list[str]) -> int:
+        """Release leases held by this worker so others can claim them. Returns number released."""
+        if not subreddit_names:
+            return 0
+        try:
+            result = await self.execute(self.client.rpc(
+                "release_intel_leases",
+                {
+                    "p_worker_id": worker_id,
+                    "p_names": [name.lower() for name in subreddit_names],
+                }
+            ))
+            return result.data or 0
+        except Exception as e:
+            logger.warning(f"Error releasing {len(subreddit_names)} leases: {e}")
+            return 0
+
+    async def _unclaimed(self, query):
+        """Leave out subs claimed by a running LLM backfill (when the claim column exists)."""
+        if not await self.has_llm_claims():
+            return query
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return query.or_(f"{LLM_CLAIM_COLUMN}.is.null,{LLM_CLAIM_COLUMN}.lt.{now}")
+    
+    async def set_llm_claims(self, subreddit_names: list[str], until: Optional[datetime]) -> int:
+        """
+        Claim subs for an LLM backfill until `until` (None releases the claim).
+        Returns the number of rows updated; raises on errors, since an
+        unclaimed export would be paid for twice.
+        """
+        value = until.isoformat() if until else None
+        updated = 0
+        for start in range(0, len(subreddit_names), LLM_CLAIM_CHUNK):
+            chunk = [name.lower() for name in subreddit_names[start:start + LLM_CLAIM_CHUNK]]
+            result = await self.execute(
+                self.client.table("nsfw_subreddit_intel").update({LLM_CLAIM_COLUMN: value}).in_("subreddit_name", chunk)
+            )
+            updated += len(result.data or [])
+        return updated
+    
+    async def get_subs_missing_llm(self, limit: int = 50, offset: int = 0) -> list[dict]:
+        """Get subreddits missing LLM analysis (offset pages through the whole backlog)."""
+        try:
+            query = self.client.table("nsfw_subreddit_intel").select(
                 "subreddit_name, description, subscribers"
             ).is_(
                 "verification_required", "null"
             ).not_.is_(
                 "description", "null"
-            ).order(
+            )
+            result = await self.execute((await self._unclaimed(query)).order(
                 "subscribers", desc=True
-            ).limit(limit).execute()
+            ).order(
+                "subreddit_name"
+            ).range(offset, offset + limit - 1))
             
             return result.data or []
         except Exception as e:
             logger.error(f"Error getting subs missing LLM: {e}")
             return []
 
+    async def get_llm_analyzed_subs(self, limit: int = 500, offset: int = 0) -> list[dict]:
+        """
+        Subreddits with a real LLM analysis (not a fallback, not decided by
+        the rule classifier) - labelled examples for eval_rule_classifier.py.
+        """
+        try:
+            result = await self.execute(self.client.table("nsfw_subreddit_intel").select(
+                "subreddit_name, description, verification_required, sellers_allowed, niche_categories, "
+                "llm_analysis_confidence, llm_analysis_reasoning"
+            ).not_.is_(
+                "verification_required", "null"
+            ).in_(
+                "llm_analysis_confidence", ["high", "medium"]
+            ).not_.like(
+                "llm_analysis_reasoning", "Rule classifier:%"
+            ).order(
+                "subreddit_name"
+            ).range(offset, offset + limit - 1))
+            
+            return result.data or []
+        except Exception as e:
+            logger.error(f"Error getting LLM-analyzed subs: {e}")
+            return []
+
+    async def count_subs_missing_llm(self) -> Optional[int]:
+        """Size of the LLM analysis backlog (same filter as get_subs_missing_llm), None on error."""
+        try:
+            query = self.client.table("nsfw_subreddit_intel").select(
+                "*", count="exact", head=True
+            ).is_(
+                "verification_required", "null"
+            ).not_.is_(
+                "description", "null"
+            )
+            result = await self.execute(await self._unclaimed(query))
+            
+            return result.count or 0
+        except Exception as e:
+            logger.error(f"Error counting subs missing LLM: {e}")
+            return None
+
     async def add_subreddit_to_queue(self, subreddit_name: str, subscribers: int = 0) -> bool:
         """Add a new subreddit to the queue."""
         try:
-            self.client.table("subreddit_queue").upsert({
+            await self.execute(self.client.table("subreddit_queue").upsert({
                 "subreddit_name": subreddit_name.lower(),
                 "subscribers": subscribers,
                 "status": "pending",
-            }, on_conflict="subreddit_name").execute()
+            }, on_conflict="subreddit_name"))
             
             return True
         except Exception as e:
@@ -249,21 +879,21 @@ class SupabaseClient:
     async def get_intel_stats(self) -> dict:
         """Get statistics about the intel table."""
         try:
-            total_result = self.client.table("nsfw_subreddit_intel").select(
-                "*", count="exact", head=True
-            ).execute()
-            
-            completed_result = self.client.table("nsfw_subreddit_intel").select(
-                "*", count="exact", head=True
-            ).eq("scrape_status", "completed").execute()
-            
-            pending_result = self.client.table("nsfw_subreddit_intel").select(
-                "*", count="exact", head=True
-            ).eq("scrape_status", "pending").execute()
-            
-            failed_result = self.client.table("nsfw_subreddit_intel").select(
-                "*", count="exact", head=True
-            ).eq("scrape_status", "failed").execute()
+            # Count queries are independent - run them concurrently
+            total_result, completed_result, pending_result, failed_result = await asyncio.gather(
+                self.execute(self.client.table("nsfw_subreddit_intel").select(
+                    "*", count="exact", head=True
+                )),
+                self.execute(self.client.table("nsfw_subreddit_intel").select(
+                    "*", count="exact", head=True
+                ).eq("scrape_status", "completed")),
+                self.execute(self.client.table("nsfw_subreddit_intel").select(
+                    "*", count="exact", head=True
+                ).eq("scrape_status", "pending")),
+                self.execute(self.client.table("nsfw_subreddit_intel").select(
+                    "*", count="exact", head=True
+                ).eq("scrape_status", "failed")),
+            )
             
             return {
                 "total": total_result.count or 0,
@@ -278,17 +908,17 @@ class SupabaseClient:
     async def get_queue_stats(self) -> dict:
         """Get statistics about the queue."""
         try:
-            total_result = self.client.table("subreddit_queue").select(
-                "*", count="exact", head=True
-            ).execute()
-            
-            pending_result = self.client.table("subreddit_queue").select(
-                "*", count="exact", head=True
-            ).eq("status", "pending").execute()
-            
-            completed_result = self.client.table("subreddit_queue").select(
-                "*", count="exact", head=True
-            ).eq("status", "completed").execute()
+            total_result, pending_result, completed_result = await asyncio.gather(
+                self.execute(self.client.table("subreddit_queue").select(
+                    "*", count="exact", head=True
+                )),
+                self.execute(self.client.table("subreddit_queue").select(
+                    "*", count="exact", head=True
+                ).eq("status", "pending")),
+                self.execute(self.client.table("subreddit_queue").select(
+                    "*", count="exact", head=True
+                ).eq("status", "completed")),
+            )
             
             return {
                 "total": total_result.count or 0,
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test Intel Parser
+Run the subreddit page parser over saved pages in fixtures/intel
+(no browser, no network): python test_intel_parser.py
+"""
+import logging
+import sys
+from pathlib import Path
+
+from intel_parser import build_result, fields_from_html, http_result, parse_metric
+
+logging.getLogger("intel_parser").setLevel(logging.ERROR)
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "intel"
+
+
+def load(fixture: str) -> str:
+    return (FIXTURES / fixture).read_text()
+
+
+def test_parse_metric():
+    assert parse_metric("212K") == 212000
+    assert parse_metric("8.4K") == 8400
+    assert parse_metric("1.2M") == 1200000
+    assert parse_metric("1,234") == 1234
+    assert parse_metric(" 56 ") == 56
+    assert parse_metric("") is None
+    assert parse_metric(None) is None
+    assert parse_metric("N/A") is None
+
+
+def test_metrics_page():
+    data = http_result("petitegonewild", 200, load("subreddit_ok.html"))
+    assert data["subreddit_name"] == "petitegonewild"
+    assert data["weekly_visitors"] == 212000
+    assert data["weekly_contributions"] == 8400
+    assert data["scrape_status"] == "completed"
+    assert data["competition_score"] == round(8400 / 212000, 6)
+
+
+def test_weekly_posts_slot():
+    data = http_result("gonewild30plus", 200, load("subreddit_posts_count.html"))
+    assert data["weekly_visitors"] == 1250000
+    assert data["weekly_contributions"] == 1234
+
+
+def test_banned_and_private():
+    for name, fixture in [("somebannedsub", "subreddit_banned.html"), ("someprivatesub", "subreddit_private.html")]:
+        data = http_result(name, 200, load(fixture))
+        assert data["permanently_failed"], fixture
+        # Reddit serves these with a 404 too
+        assert http_result(name, 404, load(fixture))["permanently_failed"], fixture
+
+
+def test_inconclusive_pages_escalate():
+    # Stats not rendered yet, blocked, or a generic page: let a browser decide
+    assert http_result("slowloadingsub", 200, load("subreddit_no_metrics.html")) is None
+    assert http_result("anysub", 200, load("reddit_blocked.html")) is None
+    assert http_result("anysub", 403, load("reddit_blocked.html")) is None
+    assert http_result("petitegonewild", 429, load("subreddit_ok.html")) is None
+    assert http_result("petitegonewild", 500, load("subreddit_ok.html")) is None
+    assert http_result("missingsub", 200, load("reddit_generic.html")) is None
+
+
+def test_browser_decisions():
+    # Same pages through the browser path's logic (fields_from_html + build_result)
+    def browser_result(name, fixture, title):
+        return build_result(name, fields_from_html(name, load(fixture), title))
+
+    assert browser_result("petitegonewild", "subreddit_ok.html", "r/petitegonewild")["weekly_visitors"] == 212000
+    assert browser_result("somebannedsub", "subreddit_banned.html", "r/somebannedsub")["permanently_failed"]
+    assert browser_result("missingsub", "reddit_generic.html", "Reddit - Dive into anything")["permanently_failed"]
+    assert browser_result("slowloadingsub", "subreddit_no_metrics.html", "r/slowloadingsub") is None
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items()) if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {name}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    sys.exit(1 if failed else 0)
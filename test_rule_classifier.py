@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test Rule Classifier
+Run rule_classifier.classify() over real rule phrasings - what it must decide
+and what it must leave to the LLM (no network): python test_rule_classifier.py
+"""
+import sys
+
+from rule_classifier import classify, niches
+
+
+def rules(*texts: str) -> list[dict]:
+    return [{"short_name": text, "description": ""} for text in texts]
+
+
+def decide(*texts: str, description: str = "") -> tuple:
+    result = classify("somesub", description, rules(*texts))
+    return (result["verification_required"], result["sellers_allowed"]) if result else None
+
+
+def test_seller_bans():
+    assert decide("No OnlyFans", "Verified users only") == (True, "not_allowed")
+    assert decide("No OF.", "Be respectful") == (False, "not_allowed")
+    assert decide("Sellers are banned") == (False, "not_allowed")
+    assert decide("No selling of any kind") == (False, "not_allowed")
+    assert decide("Amateur content only") == (False, "not_allowed")
+    assert decide("No self-promotion allowed") == (False, "not_allowed")
+
+
+def test_sellers_allowed():
+    assert decide("OnlyFans creators welcome", "You must be verified to post") == (True, "allowed")
+    assert decide("Self-promo is allowed") == (False, "allowed")
+    assert decide("Seller-friendly sub") == (False, "allowed")
+
+
+def test_placement_rules_escalate():
+    # These restrict where links go, not whether sellers may post
+    assert decide("No OF links in titles. Put links in comments") is None
+    assert decide("No OF watermarks on images.") is None
+    assert decide("No promotion in titles") is None
+    assert decide("No self-promo spam") is None
+    assert decide("No advertising in the comments") is None
+    assert decide("No OnlyFans usernames in your flair") is None
+
+
+def test_ambiguous_escalate():
+    assert decide("Be nice") is None  # No seller rule at all
+    assert decide("No OF", "Sellers welcome") is None  # Contradicts itself
+    assert decide("No sellers", "Verification posts go in the pinned thread") is None
+    assert decide("Content must be OC") is None
+
+
+def test_verification():
+    assert decide("No verification required", "No OF") == (False, "not_allowed")
+    assert decide("Verification is required before posting", "No OF") == (True, "not_allowed")
+    assert decide("Only verified users may post", "No OF") == (True, "not_allowed")
+    # "of" in lowercase is just a word
+    assert decide("Two of the mods review every post", "No OF") == (False, "not_allowed")
+
+
+def test_niches():
+    assert niches("PetiteGoth", "") == ["petite", "goth"]
+    assert niches("petite_goth4u", "") == ["petite", "goth"]
+    assert niches("MILFs", "") == ["milf"]
+    assert niches("canteen", "") == []
+    assert niches("somesub", "a sub for redheads and cosplay") == ["redhead", "cosplay"]
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items()) if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {name}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    sys.exit(1 if failed else 0)